@@ -1,10 +1,21 @@
 import csv
-from django.contrib import admin
-from django.http import HttpResponse
-from django.urls import reverse
+import time
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.db.models import OuterRef, Subquery
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import path, reverse
 from django.http import HttpResponseRedirect
+from django.utils.html import format_html
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
-from .models import Feedback, ShareFeedbackWith
+from . import exports, search
+from .feedback import DEFAULT_SCALETEXT
+from .forms import ShareFeedbackForm
+from .instrumentation import record_throughput
+from .models import Feedback, FeedbackExportJob, ShareFeedbackWith
+from .stats import DEFAULT_SCALE_LENGTH, rating_to_score
 
 
 class ShareFeedbackWithInline(admin.TabularInline):
@@ -25,6 +36,7 @@ class FeedbackAdmin(admin.ModelAdmin):
     """
 
     raw_id_fields = ["user"]
+    list_select_related = ["user__profile"]
     inlines = [ShareFeedbackWithInline]
     list_display = [
         "course_key",
@@ -36,16 +48,21 @@ class FeedbackAdmin(admin.ModelAdmin):
         "feedback",
         "consent_to_share",
         "is_approved",
+        "is_flagged",
         "created",
         "modified",
     ]
-    search_fields = [
-        "course_key",
-        "user__username",
-    ]
-    list_filter = ["consent_to_share", "is_approved", "course_key"]
+    # The background exports search the same fields.
+    search_fields = list(exports.SEARCH_FIELDS)
+    list_filter = ["consent_to_share", "is_approved", "is_flagged", "course_key"]
     list_editable = ["is_approved"]
-    actions = ["export_as_csv", "toggle_approval"]
+    actions = [
+        "export_as_csv",
+        "export_in_background_csv",
+        "export_in_background_jsonl",
+        "toggle_approval",
+        "share_with_courses",
+    ]
     readonly_fields = [
         "course_key",
         "user",
@@ -68,23 +85,50 @@ class FeedbackAdmin(admin.ModelAdmin):
                     "feedback",
                     "consent_to_share",
                     "is_approved",
+                    "is_flagged",
                 ),
                 "description": (
                     '<p><strong>Note:</strong> To toggle approval status, use the "is_approved" checkbox in the list view '
                     'or the "Toggle approval status" bulk action. Editing individual feedback here is only necessary for '
                     "specific updates to consent or approval. Ratings are displayed on a 1–5 scale (1=Poor, 5=Excellent) in "
-                    "the list view and CSV export, while the raw rating (0–4) is shown below for reference.</p>"
+                    "the list view and CSV export, while the raw rating (0–4, 0=Excellent) is shown below for "
+                    "reference.</p>"
                 ),
             },
         ),
     )
 
+    def get_queryset(self, request):
+        """
+        Annotate the feedback with the name of its course, to avoid one
+        CourseOverview query per row.
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                course_name=Subquery(
+                    CourseOverview.objects.filter(id=OuterRef("course_key")).values(
+                        "display_name"
+                    )[:1]
+                )
+            )
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Also match the feedback whose text contains every term searched.
+        """
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        matches = search.search_queryset(queryset, search_term)
+        if matches is not None:
+            results |= matches
+        return results, may_have_duplicates
+
     def get_course_name(self, instance):
-        try:
-            course_overview = CourseOverview.get_from_id(instance.course_key)
-            return course_overview.display_name
-        except Exception as e:
-            return ""
+        return getattr(instance, "course_name", None) or ""
 
     get_course_name.short_description = "Course Name"
 
@@ -98,17 +142,14 @@ class FeedbackAdmin(admin.ModelAdmin):
 
     def get_rating_display(self, instance):
         """
-        Display rating on a 1–5 scale (1=Poor, 5=Excellent) instead of 0–4.
-        """
-        if instance.rating is not None and 0 <= instance.rating <= 4:
-            rating_map = {
-                4: "5 (Excellent)",
-                3: "4 (Good)",
-                2: "3 (Average)",
-                1: "2 (Fair)",
-                0: "1 (Poor)",
-            }
-            return rating_map.get(instance.rating, str(instance.rating + 1))
+        Display rating on a 1–5 scale (1=Poor, 5=Excellent) instead of the
+        0–4 vote index (0=Excellent, 4=Poor).
+        """
+        if instance.rating is not None and 0 <= instance.rating < DEFAULT_SCALE_LENGTH:
+            return "{score} ({label})".format(
+                score=rating_to_score(instance.rating),
+                label=DEFAULT_SCALETEXT[instance.rating],
+            )
         return "-"
 
     get_rating_display.short_description = "Rating"
@@ -136,66 +177,134 @@ class FeedbackAdmin(admin.ModelAdmin):
 
     toggle_approval.short_description = "Toggle approval status for selected feedback"
 
+    def share_with_courses(self, request, queryset):
+        """
+        Share the selected feedback entries with other course versions.
+
+        Shows an intermediate page asking for the course keys, then shares
+        the feedback in batches.
+        """
+        form = ShareFeedbackForm(request.POST if "apply" in request.POST else None)
+        if form.is_valid():
+            count = ShareFeedbackWith.bulk_share(
+                queryset, form.cleaned_data["course_keys"]
+            )
+            self.message_user(
+                request,
+                f"Shared {count} feedback entries with "
+                f"{len(form.cleaned_data['course_keys'])} courses.",
+            )
+            return None
+
+        select_across = request.POST.get("select_across") == "1"
+        return render(
+            request,
+            "admin/feedback/share_feedback.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": "Share feedback with other courses",
+                "opts": self.model._meta,
+                "form": form,
+                "count": queryset.count(),
+                "select_across": select_across,
+                "selected": (
+                    [] if select_across else queryset.values_list("pk", flat=True)
+                ),
+                "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            },
+        )
+
+    share_with_courses.short_description = "Share selected feedback with other courses"
+
     def export_as_csv(self, request, queryset):
-        field_names = [
-            "Course ID",
-            "Course Name",
-            "User",
-            "Email",
-            "Mobile Number",
-            "Feedback Block",
-            "Rating",
-            "Feedback",
-            "Created",
-            "Modified",
-            "Consent to Share",
-            "Approved for Display",
-        ]
         response = HttpResponse(content_type="text/csv")
         response["Content-Disposition"] = "attachment; filename=Feedbacks.csv"
         writer = csv.writer(response)
-        writer.writerow(field_names)
-        for obj in queryset:
-            try:
-                fullname = (
-                    obj.user.profile.name
-                    or obj.user.get_full_name()
-                    or obj.user.username
-                )
-                mobile_number = obj.user.profile.mobile_number
-            except Exception as e:
-                fullname = obj.user.username
-                mobile_number = ""
-
-            try:
-                course_overview = CourseOverview.get_from_id(obj.course_key)
-                course_name = course_overview.display_name
-            except Exception as e:
-                course_name = ""
-
-            rating_display = (
-                str(obj.rating + 1)
-                if obj.rating is not None and 0 <= obj.rating <= 4
-                else "-"
-            )
-
-            data = [
-                obj.course_key,
-                course_name,
-                fullname,
-                obj.user.email,
-                mobile_number,
-                obj.block_name,
-                rating_display,
-                obj.feedback,
-                obj.created.strftime("%d-%m-%Y %H:%M"),
-                obj.modified.strftime("%d-%m-%Y %H:%M"),
-                "Yes" if obj.consent_to_share else "No",
-                "Yes" if obj.is_approved else "No",
-            ]
-            writer.writerow(data)
+        writer.writerow(exports.CSV_HEADER)
+        start = time.perf_counter()
+        rows = 0
+        # Course names and profiles are read once, not for every row.
+        course_names = dict(
+            CourseOverview.objects.filter(
+                id__in=queryset.values("course_key")
+            ).values_list("id", "display_name")
+        )
+        for obj in queryset.select_related("user__profile"):
+            course_name = course_names.get(obj.course_key) or ""
+            writer.writerow(exports.csv_values(exports.feedback_row(obj, course_name)))
+            rows += 1
+        record_throughput("export.csv", rows, time.perf_counter() - start)
         return response
 
+    def _get_export_filters(self, request, queryset):
+        """
+        Return the filters of the feedback to export in the background: the
+        search term and list filters of the changelist when all its
+        feedback is selected, or else the ids of the selected feedback.
+
+        Raises ValueError for a changelist parameter the export can't use.
+        """
+        if request.POST.get("select_across") != "1":
+            return {"id__in": list(queryset.values_list("pk", flat=True))}
+
+        filters = {}
+        for param, value in request.GET.items():
+            if param in ("o", "p"):
+                continue
+            if param == "q":
+                if value:
+                    filters[exports.SEARCH_FILTER] = value
+                continue
+            field, _, suffix = param.partition("__")
+            if (
+                field not in self.list_filter
+                or field not in exports.EXPORT_FILTER_FIELDS
+                or suffix not in ("", "exact", "isnull")
+            ):
+                raise ValueError("Unsupported export filter: {}".format(param))
+            if suffix == "isnull":
+                filters[param] = value.lower() in ("1", "true")
+            elif field == "course_key":
+                filters[field] = value
+            else:
+                filters[field] = Feedback._meta.get_field(field).to_python(value)
+        return filters
+
+    def _export_in_background(self, request, queryset, export_format):
+        """
+        Start the background export of the selected feedback, and link to
+        its job.
+        """
+        try:
+            filters = self._get_export_filters(request, queryset)
+        except ValueError as error:
+            self.message_user(request, str(error), messages.ERROR)
+            return
+        job = exports.create_job(filters, export_format, request.user)
+        self.message_user(
+            request,
+            format_html(
+                'The export has started. Download it from <a href="{}">{}</a> '
+                "when it is done.",
+                reverse("admin:feedback_feedbackexportjob_change", args=[job.pk]),
+                job,
+            ),
+        )
+
+    def export_in_background_csv(self, request, queryset):
+        self._export_in_background(request, queryset, FeedbackExportJob.CSV)
+
+    export_in_background_csv.short_description = (
+        "Export selected feedback as CSV in the background"
+    )
+
+    def export_in_background_jsonl(self, request, queryset):
+        self._export_in_background(request, queryset, FeedbackExportJob.JSONL)
+
+    export_in_background_jsonl.short_description = (
+        "Export selected feedback as JSON Lines in the background"
+    )
+
     def get_readonly_fields(self, request, obj=None):
         """
         Make most fields read-only in the change form to encourage list view editing.
@@ -203,3 +312,88 @@ class FeedbackAdmin(admin.ModelAdmin):
         if obj:  # Editing an existing object
             return self.readonly_fields
         return []
+
+
+@admin.register(FeedbackExportJob)
+class FeedbackExportJobAdmin(admin.ModelAdmin):
+    """
+    Admin interface for following and downloading the background exports.
+    """
+
+    list_display = [
+        "id",
+        "export_format",
+        "status",
+        "get_progress",
+        "created_by",
+        "created",
+        "modified",
+        "get_download_link",
+    ]
+    list_filter = ["status", "export_format"]
+    fields = [
+        "export_format",
+        "status",
+        "get_progress",
+        "created_by",
+        "created",
+        "modified",
+        "error",
+        "get_download_link",
+    ]
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        """
+        Requeue the stale jobs, e.g. those of a restarted web process,
+        before listing the jobs.
+        """
+        exports.requeue_stale_jobs()
+        return super().changelist_view(request, extra_context)
+
+    def get_progress(self, instance):
+        if instance.total_rows is None:
+            return "-"
+        return "{} / {}".format(instance.rows_written, instance.total_rows)
+
+    get_progress.short_description = "Rows written"
+
+    def get_download_link(self, instance):
+        if instance.status != FeedbackExportJob.SUCCEEDED or not instance.file:
+            return "-"
+        return format_html(
+            '<a href="{}">Download</a>',
+            reverse("admin:feedback_feedbackexportjob_download", args=[instance.pk]),
+        )
+
+    get_download_link.short_description = "File"
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:job_id>/download/",
+                self.admin_site.admin_view(self.download),
+                name="feedback_feedbackexportjob_download",
+            ),
+        ] + super().get_urls()
+
+    def download(self, request, job_id):
+        """
+        Send the file of a finished export.
+        """
+        job = get_object_or_404(FeedbackExportJob, pk=job_id)
+        if not self.has_view_permission(request, job):
+            raise PermissionDenied
+        if job.status != FeedbackExportJob.SUCCEEDED or not job.file:
+            raise Http404("The export is not finished.")
+        return FileResponse(
+            job.file.open("rb"),
+            as_attachment=True,
+            filename="feedback-export-{}.{}.gz".format(job.pk, job.export_format),
+        )
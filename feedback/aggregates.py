@@ -0,0 +1,88 @@
+"""
+Cache of the vote aggregates of the feedback blocks.
+
+The `vote_aggregate` of a block is stored in the user_state_summary table
+of the platform, shared by all the learners of the block. When the
+aggregate is shown to learners, every view would read that row: reads are
+served from the Django cache instead, and votes write the new aggregate
+through to the cache. Changes made outside of votes (e.g. by
+`reconcile_vote_aggregates --repair`) invalidate it.
+
+Cached aggregates are at most `FEEDBACK_AGGREGATE_CACHE_TIMEOUT` seconds
+old. Set it to 0 to disable the cache.
+
+Each block also has a version, changed whenever its aggregate changes,
+which is used as the ETag of the aggregate polled by the clients: polls of
+an unchanged aggregate are answered from the version alone.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+CACHE_KEY_PREFIX = "feedback.aggregate"
+DEFAULT_CACHE_TIMEOUT = 30
+VERSION_TIMEOUT = 24 * 60 * 60
+
+
+def _cache_key(usage_id, name="value"):
+    usage_hash = hashlib.md5(str(usage_id).encode("utf-8")).hexdigest()
+    return "{prefix}.{name}.{usage_hash}".format(
+        prefix=CACHE_KEY_PREFIX, name=name, usage_hash=usage_hash
+    )
+
+
+def _cache_timeout():
+    return getattr(settings, "FEEDBACK_AGGREGATE_CACHE_TIMEOUT", DEFAULT_CACHE_TIMEOUT)
+
+
+def get_cached_aggregate(usage_id):
+    """
+    Return the cached aggregate of a block, or None.
+    """
+    if not _cache_timeout():
+        return None
+    return cache.get(_cache_key(usage_id))
+
+
+def set_cached_aggregate(usage_id, aggregate):
+    """
+    Cache the aggregate of a block.
+    """
+    timeout = _cache_timeout()
+    if timeout:
+        cache.set(_cache_key(usage_id), list(aggregate), timeout)
+
+
+def update_cached_aggregate(usage_id, aggregate):
+    """
+    Cache the new aggregate of a block, and change its version.
+    """
+    set_cached_aggregate(usage_id, aggregate)
+    _bump_version(usage_id)
+
+
+def invalidate_aggregate(usage_id):
+    """
+    Remove the cached aggregate of a block, and change its version.
+    """
+    cache.delete(_cache_key(usage_id))
+    _bump_version(usage_id)
+
+
+def _bump_version(usage_id):
+    version = uuid.uuid4().hex
+    cache.set(_cache_key(usage_id, "version"), version, VERSION_TIMEOUT)
+    return version
+
+
+def get_aggregate_version(usage_id):
+    """
+    Return the current version of the aggregate of a block.
+    """
+    version = cache.get(_cache_key(usage_id, "version"))
+    if version is None:
+        version = _bump_version(usage_id)
+    return version
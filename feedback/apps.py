@@ -13,6 +13,13 @@ class FeedbackConfig(AppConfig):
     name = "feedback"
 
     plugin_app = {
+        "url_config": {
+            "lms.djangoapp": {
+                "namespace": "feedback",
+                "regex": r"^api/feedback/",
+                "relative_path": "urls",
+            },
+        },
         "settings_config": {
             "lms.djangoapp": {
                 "common": {"relative_path": "settings.common"},
@@ -26,3 +33,11 @@ class FeedbackConfig(AppConfig):
             },
         },
     }
+
+    def ready(self):
+        """
+        Connect the signal handlers of the app.
+        """
+        from feedback import (  # pylint: disable=import-outside-toplevel,unused-import
+            signals,
+        )
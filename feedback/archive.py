@@ -0,0 +1,183 @@
+"""
+Archival of the feedback of ended courses and of old feedback.
+
+The Feedback rows selected by the retention policy are moved to the
+FeedbackArchive table, in batches. Each batch is copied, its daily rollup
+buckets are recomputed (archived feedback stays counted), and it is
+deleted from the Feedback table, in one transaction, so an interrupted
+archival loses nothing and resumes with the next run.
+
+The policy archives the feedback:
+
+* of the courses given explicitly,
+* of the courses that ended more than `FEEDBACK_ARCHIVE_ENDED_COURSES_DAYS`
+  days ago, according to CourseOverview,
+* created more than `FEEDBACK_ARCHIVE_AFTER_YEARS` years ago, in courses
+  that ended: learners of a running course can answer again, and their new
+  answer would be counted with the archived one.
+
+Testimonials (approved feedback with consent to share) are never archived,
+as they are still shown in their course and in the courses they are
+shared with, e.g. its reruns.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from feedback.models import Feedback, FeedbackArchive, ShareFeedbackWith
+from feedback.rollups import get_buckets, refresh_buckets, suspend_refresh
+from feedback.utils import get_platform_model
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_AFTER_YEARS = 3
+DEFAULT_ENDED_COURSES_DAYS = 365
+ARCHIVED_FIELDS = [
+    "id",
+    "course_key",
+    "user_id",
+    "block_id",
+    "block_name",
+    "rating",
+    "feedback",
+    "consent_to_share",
+    "is_approved",
+    "created",
+    "modified",
+]
+
+
+def get_policy():
+    """
+    Return the (after_years, ended_courses_days) of the retention policy,
+    None to disable a criterion.
+    """
+    return (
+        getattr(settings, "FEEDBACK_ARCHIVE_AFTER_YEARS", DEFAULT_AFTER_YEARS),
+        getattr(
+            settings, "FEEDBACK_ARCHIVE_ENDED_COURSES_DAYS", DEFAULT_ENDED_COURSES_DAYS
+        ),
+    )
+
+
+def list_ended_courses(before):
+    """
+    Return the keys of the courses with feedback that ended before a date,
+    read from the CourseOverview model when installed.
+    """
+    try:
+        model = get_platform_model(
+            "FEEDBACK_COURSE_OVERVIEW_MODEL", "course_overviews.CourseOverview"
+        )
+    except LookupError:
+        return []
+    return list(
+        model.objects.filter(
+            end__lt=before,
+            id__in=Feedback.objects.order_by().values("course_key").distinct(),
+        ).values_list("id", flat=True)
+    )
+
+
+def get_archivable(course_keys=(), after_years=None, ended_courses_days=None):
+    """
+    Return the feedback to archive, except the testimonials.
+
+    Arguments:
+        course_keys (list): archive all the feedback of these courses.
+        after_years (int): archive the feedback of ended courses created
+            before this many years ago.
+        ended_courses_days (int): archive the feedback of the courses that
+            ended more than this many days ago.
+    """
+    now = timezone.now()
+    course_keys = list(course_keys)
+    if ended_courses_days is not None:
+        course_keys += list_ended_courses(now - timedelta(days=ended_courses_days))
+    condition = Q(pk__in=[])
+    if course_keys:
+        condition |= Q(course_key__in=course_keys)
+    if after_years is not None:
+        condition |= Q(
+            created__lt=now - timedelta(days=365 * after_years),
+            course_key__in=list_ended_courses(now),
+        )
+    return Feedback.objects.filter(condition).exclude(
+        is_approved=True, consent_to_share=True
+    )
+
+
+@transaction.atomic
+def archive_batch(feedback_ids):
+    """
+    Move a batch of feedback to the archive, and return its size.
+    """
+    batch = Feedback.objects.filter(pk__in=feedback_ids)
+    shared_with = {}
+    for feedback_id, course_key in (
+        ShareFeedbackWith.objects.filter(feedback__in=batch)
+        .order_by("course_key")
+        .values_list("feedback_id", "course_key")
+    ):
+        shared_with.setdefault(feedback_id, []).append(str(course_key))
+
+    archived = FeedbackArchive.objects.bulk_create(
+        [
+            FeedbackArchive(**row, shared_with=shared_with.get(row["id"], []))
+            for row in batch.values(*ARCHIVED_FIELDS)
+        ]
+    )
+    buckets = get_buckets(batch)
+    # Search terms and shared courses are deleted in cascade. The buckets
+    # are recomputed once for the batch, below.
+    with suspend_refresh():
+        batch.delete()
+    for course_key, course_buckets in buckets.items():
+        refresh_buckets(course_key, course_buckets)
+    return len(archived)
+
+
+def archive_feedback(
+    course_keys=(),
+    after_years=None,
+    ended_courses_days=None,
+    *,
+    batch_size=DEFAULT_BATCH_SIZE,
+    dry_run=False,
+    progress=None,
+):
+    """
+    Archive the feedback selected by the policy, see `get_archivable`.
+
+    `progress`, when given, is called after each batch with the number of
+    feedback archived so far. Returns the number of feedback archived, or
+    to archive with `dry_run`.
+    """
+    archivable = get_archivable(course_keys, after_years, ended_courses_days)
+    if dry_run:
+        return archivable.count()
+
+    archived = 0
+    last_pk = 0
+    while True:
+        # Batches are read after the previous one, so that each query
+        # starts from the primary key index instead of the first row.
+        feedback_ids = list(
+            archivable.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not feedback_ids:
+            break
+        last_pk = feedback_ids[-1]
+        archived += archive_batch(feedback_ids)
+        if progress:
+            progress(archived)
+    log.info("Archived %d feedback.", archived)
+    return archived
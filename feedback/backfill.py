@@ -0,0 +1,282 @@
+"""
+Backfill of the Feedback table from the XBlock user state.
+
+Submissions made before the Feedback model existed only live in the user
+state of the blocks (the `user_vote`, `user_freeform` and
+`consent_to_share` fields stored in StudentModule). StudentModule rows of
+feedback blocks are streamed in primary key order, in chunks, and upserted
+into the Feedback table in bulk. The last primary key processed is stored
+as a checkpoint after each chunk, so an interrupted backfill resumes where
+it stopped, and the completion of the backfill is recorded once it is done.
+"""
+
+import json
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from opaque_keys.edx.keys import UsageKey
+
+from feedback.models import Feedback, FeedbackCheckpoint
+from feedback.utils import get_platform_model
+
+log = logging.getLogger(__name__)
+
+BLOCK_TYPE = "feedback"
+CHECKPOINT_PREFIX = "backfill:"
+BACKFILLED_PREFIX = "backfilled:"
+DEFAULT_BATCH_SIZE = 1000
+# The block saves its user state just after the Feedback entry: entries are
+# only updated from user state modified well after them.
+UPDATE_TOLERANCE = timedelta(minutes=5)
+
+
+def get_student_module_model():
+    """
+    Return the StudentModule model, which can be replaced through the
+    `FEEDBACK_STUDENT_MODULE_MODEL` setting.
+    """
+    return get_platform_model(
+        "FEEDBACK_STUDENT_MODULE_MODEL", "courseware.StudentModule"
+    )
+
+
+def checkpoint_name(course_key=None, prefix=CHECKPOINT_PREFIX):
+    """
+    Return the checkpoint name of a backfill, for one course or all of them.
+    """
+    return "{prefix}{scope}".format(
+        prefix=prefix, scope=course_key if course_key else "*"
+    )
+
+
+def mark_backfilled(course_key=None):
+    """
+    Record that the Feedback table holds the submissions of a course, or of
+    all of them.
+    """
+    FeedbackCheckpoint.set_value(
+        checkpoint_name(course_key, BACKFILLED_PREFIX), timezone.now().isoformat()
+    )
+
+
+def is_backfilled(course_key):
+    """
+    Return whether the backfill of a course, or of all the courses, is done.
+    """
+    return FeedbackCheckpoint.objects.filter(
+        name__in=[
+            checkpoint_name(course_key, BACKFILLED_PREFIX),
+            checkpoint_name(prefix=BACKFILLED_PREFIX),
+        ]
+    ).exists()
+
+
+def parse_state(state):
+    """
+    Parse the user state of a feedback block.
+
+    Returns a (vote, freeform, consent_to_share) tuple, where the vote or
+    the freeform are None when the learner didn't provide them, or None
+    when the state holds no submission at all.
+    """
+    try:
+        state = json.loads(state or "{}")
+    except ValueError:
+        return None
+    if not isinstance(state, dict):
+        return None
+
+    vote = state.get("user_vote", -1)
+    vote = vote if isinstance(vote, int) and vote >= 0 else None
+    freeform = state.get("user_freeform") or None
+    if vote is None and freeform is None:
+        return None
+    consent_to_share = str(state.get("consent_to_share", "false")).lower() == "true"
+    return vote, freeform, consent_to_share
+
+
+def upsert_chunk(rows):
+    """
+    Upsert a chunk of StudentModule rows into the Feedback table.
+
+    Arguments:
+        rows (list): (student_id, course_id, module_state_key, state,
+            created, modified) tuples.
+
+    Existing Feedback entries are only updated when the user state differs
+    and is more recent by UPDATE_TOLERANCE, so that submissions saved by
+    the block itself always win. Returns a (created, updated) tuple of
+    counts.
+    """
+    submissions = {}
+    for student_id, course_key, block_id, state, created, modified in rows:
+        parsed = parse_state(state)
+        if parsed is not None:
+            submissions[(str(course_key), student_id, str(block_id))] = (
+                parsed,
+                created,
+                modified,
+            )
+    if not submissions:
+        return 0, 0
+
+    existing = {
+        (str(feedback.course_key), feedback.user_id, feedback.block_id): feedback
+        for feedback in Feedback.objects.filter(
+            course_key__in={key[0] for key in submissions},
+            user_id__in={key[1] for key in submissions},
+            block_id__in={key[2] for key in submissions},
+        )
+    }
+
+    now = timezone.now()
+    block_names = get_block_names(
+        {key[2] for key in submissions if key not in existing}
+    )
+    to_create = []
+    to_update = []
+    for key, (parsed, created, modified) in submissions.items():
+        vote, freeform, consent_to_share = parsed
+        feedback = existing.get(key)
+        if feedback is None:
+            feedback = Feedback(
+                course_key=key[0],
+                user_id=key[1],
+                block_id=key[2],
+                block_name=block_names.get(key[2]),
+                created=created,
+            )
+            to_create.append(feedback)
+        elif feedback.modified + UPDATE_TOLERANCE < modified and (
+            feedback.rating,
+            feedback.feedback,
+            feedback.consent_to_share,
+        ) != (vote, freeform, consent_to_share):
+            to_update.append(feedback)
+        else:
+            continue
+        feedback.rating = vote
+        feedback.feedback = freeform
+        feedback.consent_to_share = consent_to_share
+        # The rows are new to the table, so they must be picked by the jobs
+        # processing the rows modified since their last run.
+        feedback.modified = now
+
+    with transaction.atomic():
+        # Entries created by the block meanwhile are kept, so the entries
+        # inserted are counted from their modification date.
+        Feedback.objects.bulk_create(to_create, ignore_conflicts=True)
+        inserted = (
+            Feedback.objects.filter(
+                course_key__in={feedback.course_key for feedback in to_create},
+                user_id__in={feedback.user_id for feedback in to_create},
+                block_id__in={feedback.block_id for feedback in to_create},
+                modified=now,
+            ).count()
+            if to_create
+            else 0
+        )
+        Feedback.objects.bulk_update(
+            to_update, ["rating", "feedback", "consent_to_share", "modified"]
+        )
+    return inserted, len(to_update)
+
+
+def get_block_names(block_ids):
+    """
+    Return the display names of feedback blocks, by block id.
+
+    Names are copied from the Feedback entries of the blocks, or read from
+    the modulestore when running in the platform.
+    """
+    names = dict(
+        Feedback.objects.filter(block_id__in=block_ids, block_name__isnull=False)
+        .order_by()
+        .values_list("block_id", "block_name")
+        .distinct()
+    )
+    missing = set(block_ids) - set(names)
+    if not missing:
+        return names
+    try:
+        # pylint: disable=import-outside-toplevel
+        from xmodule.modulestore.django import modulestore
+    except ImportError:
+        return names
+    store = modulestore()
+    for block_id in missing:
+        try:
+            names[block_id] = store.get_item(
+                UsageKey.from_string(block_id)
+            ).display_name
+        except Exception:  # pylint: disable=broad-except
+            log.warning("No display name found for the feedback block %s", block_id)
+    return names
+
+
+def backfill(course_key=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Backfill the Feedback table for one course, or for all of them.
+
+    Resumes from the last checkpoint of the same scope. `progress`, when
+    given, is called after each chunk with the last primary key processed
+    and the running (created, updated) counts.
+
+    Returns the (created, updated) counts.
+    """
+    student_module = get_student_module_model()
+    name = checkpoint_name(course_key)
+    last_id = int(FeedbackCheckpoint.get_value(name, 0))
+
+    queryset = student_module.objects.filter(module_type=BLOCK_TYPE)
+    if course_key:
+        queryset = queryset.filter(course_id=course_key)
+
+    created = updated = 0
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list(
+                "id",
+                "student_id",
+                "course_id",
+                "module_state_key",
+                "state",
+                "created",
+                "modified",
+            )[:batch_size]
+        )
+        if not chunk:
+            break
+        chunk_created, chunk_updated = upsert_chunk([row[1:] for row in chunk])
+        created += chunk_created
+        updated += chunk_updated
+        last_id = chunk[-1][0]
+        FeedbackCheckpoint.set_value(name, last_id)
+        if progress:
+            progress(last_id, created, updated)
+
+    mark_backfilled(course_key)
+    log.info(
+        "Feedback backfill of %s done: %d created, %d updated.",
+        course_key or "all courses",
+        created,
+        updated,
+    )
+    return created, updated
+
+
+def list_courses():
+    """
+    Return the keys of the courses having feedback block user state.
+    """
+    return list(
+        get_student_module_model()
+        .objects.filter(module_type=BLOCK_TYPE)
+        .order_by()
+        .values_list("course_id", flat=True)
+        .distinct()
+    )
@@ -0,0 +1,223 @@
+"""
+Exports of all the feedback, one compressed file (a shard) per course.
+
+`export_course` writes the feedback of a course, with the courses it is
+shared with and the name of the course, to a gzipped JSON Lines or CSV
+shard. Courses are independent, so the `export_feedback` command exports
+them in parallel processes, then writes a manifest listing the shards.
+
+Rows are keyed by the `id` of the feedback, with the same columns in every
+shard, so that they load into a table as is. An incremental export only
+reads the rows modified (or shared) since the previous export (its
+watermark), a bit before it: consumers must upsert the rows by `id`.
+Deleted feedback is not exported.
+
+Archived feedback (FeedbackArchive) is exported on demand, to shards of
+its own. Incremental exports read the feedback archived since the previous
+export.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.exports import EXPORT_COLUMNS, feedback_row, write_export
+from feedback.models import (
+    Feedback,
+    FeedbackArchive,
+    FeedbackCheckpoint,
+    ShareFeedbackWith,
+)
+from feedback.utils import get_platform_model
+
+log = logging.getLogger(__name__)
+
+WATERMARK = "export:incremental"
+# Rows are re-read a bit before the watermark, so that rows committed by
+# transactions still running during the previous export are not missed.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+MANIFEST_NAME = "manifest.json"
+SHARD_COLUMNS = (
+    [("id", "ID")] + EXPORT_COLUMNS + [("shared_with", "Shared With Courses")]
+)
+
+
+def get_course_names(course_keys):
+    """
+    Return the names of courses, by course key, read from the
+    CourseOverview model (`FEEDBACK_COURSE_OVERVIEW_MODEL`) when installed.
+    """
+    try:
+        model = get_platform_model(
+            "FEEDBACK_COURSE_OVERVIEW_MODEL", "course_overviews.CourseOverview"
+        )
+    except LookupError:
+        return {}
+    return dict(
+        model.objects.filter(id__in=course_keys).values_list("id", "display_name")
+    )
+
+
+def get_window(incremental):
+    """
+    Return the (since, until) modification times of the rows to export.
+
+    `since` is None for a full export, or an incremental one that never ran.
+    """
+    until = timezone.now()
+    since = None
+    if incremental:
+        watermark = FeedbackCheckpoint.get_value(WATERMARK)
+        if watermark:
+            since = parse_datetime(watermark) - WATERMARK_OVERLAP
+    return since, until
+
+
+def get_queryset(since, until, course_key=None, archived=False):
+    """
+    Return the feedback modified, or shared, between `since` and `until`,
+    or the feedback archived between them.
+
+    Archived feedback keeps the `modified` date of the feedback, which can
+    be older than the watermark, so it is read by its `archived` date.
+    """
+    if archived:
+        queryset = FeedbackArchive.objects.filter(archived__lt=until)
+        if since is not None:
+            queryset = queryset.filter(archived__gte=since)
+    else:
+        queryset = Feedback.objects.filter(modified__lt=until)
+    if course_key is not None:
+        queryset = queryset.filter(course_key=course_key)
+    if not archived and since is not None:
+        queryset = queryset.filter(
+            Q(modified__gte=since)
+            | Q(
+                pk__in=ShareFeedbackWith.objects.filter(modified__gte=since).values(
+                    "feedback_id"
+                )
+            )
+        )
+    return queryset
+
+
+def list_courses(since, until, archived=False):
+    """
+    Return the keys of the courses with feedback, or archived feedback, to
+    export.
+    """
+    return list(
+        get_queryset(since, until, archived=archived)
+        .order_by()
+        .values_list("course_key", flat=True)
+        .distinct()
+    )
+
+
+def shard_name(course_key, export_format, archived=False):
+    return "feedback-{archive}{course}.{format}.gz".format(
+        archive="archive-" if archived else "",
+        course=re.sub(r"[^\w.+-]", "_", str(course_key)),
+        format=export_format,
+    )
+
+
+def export_course(
+    course_id, directory, export_format, *, since=None, until=None, archived=False
+):
+    """
+    Write the shard of the feedback, or of the archived feedback, of a
+    course to a directory.
+
+    Returns the manifest entry of the shard: its `course_id`, whether it is
+    `archived`, its `file` name, number of `rows`, size in `bytes` and
+    `sha256` digest.
+    """
+    course_key = CourseKey.from_string(course_id)
+    queryset = get_queryset(since, until or timezone.now(), course_key, archived)
+    course_name = get_course_names([course_key]).get(course_key) or ""
+    shared_with = {}
+    if not archived:
+        for feedback_id, shared_course_key in (
+            ShareFeedbackWith.objects.filter(feedback__in=queryset)
+            .order_by("course_key")
+            .values_list("feedback_id", "course_key")
+        ):
+            shared_with.setdefault(feedback_id, []).append(str(shared_course_key))
+
+    def make_row(feedback):
+        return {
+            "id": feedback.pk,
+            **feedback_row(feedback, course_name),
+            "shared_with": (
+                feedback.shared_with if archived else shared_with.get(feedback.pk, [])
+            ),
+        }
+
+    name = shard_name(course_key, export_format, archived)
+    path = os.path.join(directory, name)
+    # The gzip header has no file name nor time, so that identical shards
+    # have identical digests.
+    with open(path, "wb") as shard_file:
+        with gzip.GzipFile(fileobj=shard_file, mode="wb", filename="", mtime=0) as gz:
+            output = io.TextIOWrapper(gz, encoding="utf-8", newline="")
+            rows = write_export(
+                queryset,
+                export_format,
+                output,
+                columns=SHARD_COLUMNS,
+                make_row=make_row,
+            )
+            output.detach()
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as shard_file:
+        for chunk in iter(lambda: shard_file.read(1 << 20), b""):
+            digest.update(chunk)
+    log.info("Exported %d feedback rows of %s to %s", rows, course_id, path)
+    return {
+        "course_id": course_id,
+        "course_name": course_name,
+        "archived": archived,
+        "file": name,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "sha256": digest.hexdigest(),
+    }
+
+
+def write_manifest(directory, export_format, since, until, shards):
+    """
+    Write the manifest of an export, listing its shards, and return its
+    path.
+    """
+    path = os.path.join(directory, MANIFEST_NAME)
+    manifest = {
+        "format": export_format,
+        "compression": "gzip",
+        "columns": [key for key, _ in SHARD_COLUMNS],
+        "incremental": since is not None,
+        "modified_since": since.isoformat() if since else None,
+        "modified_until": until.isoformat(),
+        "total_rows": sum(shard["rows"] for shard in shards),
+        "shards": sorted(
+            shards, key=lambda shard: (shard["archived"], shard["course_id"])
+        ),
+    }
+    with open(path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return path
+
+
+def save_watermark(until):
+    FeedbackCheckpoint.set_value(WATERMARK, until.isoformat())
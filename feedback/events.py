@@ -0,0 +1,119 @@
+"""
+Payloads of the tracking events published by the feedback block.
+
+The `edx.feedbackxblock.freeform_provided` event carries the previous and
+the new feedback text. The `FEEDBACK_FREEFORM_EVENT_MODE` setting selects
+how:
+
+* "full" (default): both texts, unchanged.
+* "truncated": both texts cut to `FEEDBACK_FREEFORM_EVENT_MAX_LENGTH`
+  characters, with their full lengths.
+* "digest": a SHA-256 digest and the length of both texts, with a word
+  level summary of the change.
+
+The Feedback row of an event is identified by its context (user, course and
+block), and its text can be matched with the `new_freeform_digest` of the
+event (see `text_digest`).
+"""
+
+import hashlib
+from difflib import SequenceMatcher
+
+from django.conf import settings
+
+FREEFORM_EVENT_MODES = ("full", "truncated", "digest")
+DEFAULT_MAX_LENGTH = 200
+# Words of the changed parts of two texts beyond which they are counted as
+# replaced without diffing them, as the diff time grows quadratically: the
+# diff runs in the request of the submission.
+DIFF_MAX_WORDS = 200
+
+
+def text_digest(text):
+    """
+    Return the SHA-256 hex digest of a feedback text.
+    """
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def diff_summary(old, new):
+    """
+    Return the number of words added, removed and kept from `old` to `new`.
+
+    The common start and end of the texts are kept, and their changed parts
+    are diffed when shorter than `DIFF_MAX_WORDS` words, or else counted as
+    replaced.
+    """
+    old_words = (old or "").split()
+    new_words = (new or "").split()
+    start = 0
+    while (
+        start < min(len(old_words), len(new_words))
+        and old_words[start] == new_words[start]
+    ):
+        start += 1
+    end = 0
+    while (
+        end < min(len(old_words), len(new_words)) - start
+        and old_words[-1 - end] == new_words[-1 - end]
+    ):
+        end += 1
+    kept = start + end
+    old_end = len(old_words) - end
+    new_end = len(new_words) - end
+    old_changed = old_words[start:old_end]
+    new_changed = new_words[start:new_end]
+    if 0 < max(len(old_changed), len(new_changed)) <= DIFF_MAX_WORDS:
+        kept += sum(
+            block.size
+            for block in SequenceMatcher(
+                None, old_changed, new_changed, autojunk=False
+            ).get_matching_blocks()
+        )
+    return {
+        "words_added": len(new_words) - kept,
+        "words_removed": len(old_words) - kept,
+        "words_kept": kept,
+    }
+
+
+def get_freeform_event_mode():
+    mode = getattr(settings, "FEEDBACK_FREEFORM_EVENT_MODE", "full")
+    return mode if mode in FREEFORM_EVENT_MODES else "full"
+
+
+def freeform_event_payload(old_freeform, new_freeform, mode=None):
+    """
+    Return the payload of a freeform_provided event.
+    """
+    mode = mode or get_freeform_event_mode()
+    old_freeform = old_freeform or ""
+    new_freeform = new_freeform or ""
+    if mode == "full":
+        return {"old_freeform": old_freeform, "new_freeform": new_freeform}
+
+    payload = {
+        "mode": mode,
+        "old_freeform_length": len(old_freeform),
+        "new_freeform_length": len(new_freeform),
+    }
+    if mode == "truncated":
+        max_length = getattr(
+            settings, "FEEDBACK_FREEFORM_EVENT_MAX_LENGTH", DEFAULT_MAX_LENGTH
+        )
+        payload.update(
+            {
+                "old_freeform": old_freeform[:max_length],
+                "new_freeform": new_freeform[:max_length],
+                "truncated": max(len(old_freeform), len(new_freeform)) > max_length,
+            }
+        )
+    else:
+        payload.update(
+            {
+                "old_freeform_digest": text_digest(old_freeform),
+                "new_freeform_digest": text_digest(new_freeform),
+                **diff_summary(old_freeform, new_freeform),
+            }
+        )
+    return payload
@@ -0,0 +1,417 @@
+"""
+Exports of the feedback run in the background.
+
+`create_job` records the filters of the feedback to export in a
+FeedbackExportJob, and queues the job once the current transaction commits.
+The job rebuilds the queryset from these filters, which only use the
+fields of EXPORT_FILTER_FIELDS, and the admin search term under the
+SEARCH_FILTER key. The job writes a
+gzipped CSV or JSON Lines file, `CHUNK_SIZE` rows at a time, updating its
+progress as it goes, then saves the file to the private export storage
+(see `feedback.utils.get_export_storage`), under a name with a random
+token, from where staff download it in the admin.
+
+Jobs run in a pool of `FEEDBACK_EXPORT_WORKERS` threads of the web process,
+or as Celery tasks when `FEEDBACK_EXPORT_BACKEND` is "celery". Running jobs
+update their `modified` date with their progress, and from a heartbeat
+thread while they run: `requeue_stale_jobs` queues again the jobs without
+update for `FEEDBACK_EXPORT_STALE_TIMEOUT` seconds, e.g. those of a
+restarted process.
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import secrets
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import smart_split, unescape_string_literal
+
+from feedback import search
+from feedback.instrumentation import record_throughput
+from feedback.models import Feedback, FeedbackExportJob
+from feedback.stats import DEFAULT_SCALE_LENGTH, rating_to_score
+
+try:
+    from celery import current_app as celery_app
+except ImportError:
+    # Celery is only needed with the "celery" export backend.
+    celery_app = None
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+DEFAULT_WORKERS = 2
+DEFAULT_STALE_TIMEOUT = 60 * 60
+# Number of heartbeats of a running job within the stale timeout.
+HEARTBEATS_PER_TIMEOUT = 4
+# Name of the Celery task running the jobs, see feedback.tasks.
+RUN_EXPORT_TASK = "feedback.tasks.run_export_job"
+# Keys and CSV headers of the exported values.
+EXPORT_COLUMNS = [
+    ("course_id", "Course ID"),
+    ("course_name", "Course Name"),
+    ("user", "User"),
+    ("email", "Email"),
+    ("mobile_number", "Mobile Number"),
+    ("block_name", "Feedback Block"),
+    ("rating", "Rating"),
+    ("feedback", "Feedback"),
+    ("created", "Created"),
+    ("modified", "Modified"),
+    ("consent_to_share", "Consent to Share"),
+    ("is_approved", "Approved for Display"),
+]
+CSV_HEADER = [label for _, label in EXPORT_COLUMNS]
+# Fields the filters of the export jobs can use, as `<field>`,
+# `<field>__in` or `<field>__isnull` lookups.
+EXPORT_FILTER_FIELDS = (
+    "id",
+    "course_key",
+    "block_id",
+    "rating",
+    "is_approved",
+    "consent_to_share",
+    "is_flagged",
+)
+EXPORT_FILTER_SUFFIXES = ("", "in", "isnull")
+# Key of the admin search term in the filters of the export jobs.
+SEARCH_FILTER = "search"
+# Fields matched by the admin search, besides the feedback text.
+SEARCH_FIELDS = ("course_key", "user__username")
+
+_executor = None
+
+
+def feedback_row(feedback, course_name=None):
+    """
+    Return the exported values of a feedback, by key of EXPORT_COLUMNS, in
+    their order.
+
+    The course name is read from the `course_name` annotation of the
+    feedback when not given. Ratings are on the 1–5 scale. The user of
+    archived feedback can be deleted.
+    """
+    user = feedback.user
+    try:
+        fullname = user.profile.name or user.get_full_name() or user.username
+        mobile_number = user.profile.mobile_number
+    except Exception:  # pylint: disable=broad-except
+        fullname = user.username if user else ""
+        mobile_number = ""
+    if course_name is None:
+        course_name = getattr(feedback, "course_name", None) or ""
+    return {
+        "course_id": str(feedback.course_key),
+        "course_name": course_name,
+        "user": fullname,
+        "email": user.email if user else "",
+        "mobile_number": mobile_number,
+        "block_name": feedback.block_name,
+        "rating": (
+            rating_to_score(feedback.rating)
+            if feedback.rating is not None
+            and 0 <= feedback.rating < DEFAULT_SCALE_LENGTH
+            else None
+        ),
+        "feedback": feedback.feedback,
+        "created": feedback.created,
+        "modified": feedback.modified,
+        "consent_to_share": feedback.consent_to_share,
+        "is_approved": feedback.is_approved,
+    }
+
+
+def csv_value(key, value):
+    """
+    Return the CSV cell of an exported value.
+    """
+    if key == "rating":
+        return "-" if value is None else str(value)
+    if isinstance(value, datetime):
+        return value.strftime("%d-%m-%Y %H:%M")
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return value
+
+
+def csv_values(row):
+    """
+    Return the CSV cells of an exported row.
+    """
+    return [csv_value(key, value) for key, value in row.items()]
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def jsonl_line(row):
+    """
+    Return the JSON Lines line of an exported row, without the newline.
+    """
+    return json.dumps(row, default=_json_default, ensure_ascii=False)
+
+
+def write_export(
+    queryset,
+    export_format,
+    output,
+    *,
+    progress=None,
+    columns=None,
+    make_row=None,
+):
+    """
+    Write the feedback of a queryset to a text file, and return the number
+    of rows written.
+
+    Arguments:
+        progress (callable): called every CHUNK_SIZE rows with the number
+            of rows written so far.
+        columns (list): (key, CSV header) of the values of the rows,
+            EXPORT_COLUMNS by default.
+        make_row (callable): returns the values of a feedback, by key,
+            `feedback_row` by default.
+    """
+    columns = EXPORT_COLUMNS if columns is None else columns
+    make_row = make_row or feedback_row
+    related = ["user__profile"] if hasattr(get_user_model(), "profile") else ["user"]
+    if export_format == FeedbackExportJob.CSV:
+        writer = csv.writer(output)
+        writer.writerow([label for _, label in columns])
+
+        def write(row):
+            writer.writerow(csv_values(row))
+
+    else:
+
+        def write(row):
+            output.write(jsonl_line(row) + "\n")
+
+    rows = 0
+    for feedback in (
+        queryset.select_related(*related).order_by("pk").iterator(CHUNK_SIZE)
+    ):
+        write(make_row(feedback))
+        rows += 1
+        if progress and rows % CHUNK_SIZE == 0:
+            progress(rows)
+    return rows
+
+
+def search_queryset(queryset, term):
+    """
+    Filter feedback like the admin search does: every word of the term is
+    in one of the SEARCH_FIELDS, or every search term is in the feedback
+    text (see `feedback.search.search_queryset`).
+    """
+    matches = queryset
+    for word in smart_split(term):
+        if word[0] in "\"'" and word[-1] == word[0]:
+            word = unescape_string_literal(word)
+        matches = matches.filter(
+            reduce(or_, (Q(**{field + "__icontains": word}) for field in SEARCH_FIELDS))
+        )
+    text_matches = search.search_queryset(queryset, term)
+    return matches if text_matches is None else matches | text_matches
+
+
+def get_job_queryset(job):
+    """
+    Return the queryset of the feedback exported by a job, rebuilt from its
+    filters.
+
+    Raises ValueError for a lookup outside of EXPORT_FILTER_FIELDS.
+    """
+    filters = dict(job.filters)
+    term = filters.pop(SEARCH_FILTER, None)
+    for lookup in filters:
+        field, _, suffix = lookup.partition("__")
+        if field not in EXPORT_FILTER_FIELDS or suffix not in EXPORT_FILTER_SUFFIXES:
+            raise ValueError("Unsupported export filter: {}".format(lookup))
+    queryset = Feedback.objects.filter(**filters)
+    return search_queryset(queryset, term) if term else queryset
+
+
+@contextmanager
+def heartbeat(job_id):
+    """
+    Update the `modified` date of a running job from a thread, several
+    times within the stale timeout, so that a slow job without progress
+    (e.g. counting its rows) isn't requeued.
+    """
+    timeout = getattr(settings, "FEEDBACK_EXPORT_STALE_TIMEOUT", DEFAULT_STALE_TIMEOUT)
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(timeout / HEARTBEATS_PER_TIMEOUT):
+                FeedbackExportJob.objects.filter(
+                    pk=job_id, status=FeedbackExportJob.RUNNING
+                ).update(modified=timezone.now())
+        finally:
+            connection.close()
+
+    thread = threading.Thread(
+        target=beat, name="feedback-export-heartbeat", daemon=True
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job_id):
+    """
+    Run a pending export job, and return it.
+    """
+    # A job delivered twice (e.g. retried by Celery) only runs once.
+    claimed = FeedbackExportJob.objects.filter(
+        pk=job_id, status=FeedbackExportJob.PENDING
+    ).update(status=FeedbackExportJob.RUNNING, modified=timezone.now())
+    job = FeedbackExportJob.objects.get(pk=job_id)
+    if not claimed:
+        return job
+
+    start = time.perf_counter()
+    try:
+        with heartbeat(job.pk):
+            rows = _write_job_file(job)
+    except Exception as error:  # pylint: disable=broad-except
+        log.exception("Feedback export %s failed.", job.pk)
+        job.status = FeedbackExportJob.FAILED
+        job.error = str(error)
+        job.save(update_fields=["status", "error"])
+        return job
+
+    job.status = FeedbackExportJob.SUCCEEDED
+    job.rows_written = rows
+    job.save(update_fields=["status", "rows_written", "file"])
+    record_throughput(
+        "export.{}".format(job.export_format), rows, time.perf_counter() - start
+    )
+    return job
+
+
+def _write_job_file(job):
+    """
+    Write the file of a job, saved to the export storage but not on the
+    job, and return the number of rows written.
+    """
+    queryset = get_job_queryset(job)
+    job.total_rows = queryset.count()
+    job.save(update_fields=["total_rows"])
+
+    def progress(rows):
+        FeedbackExportJob.objects.filter(pk=job.pk).update(
+            rows_written=rows, modified=timezone.now()
+        )
+
+    with tempfile.TemporaryFile() as export_file:
+        with gzip.GzipFile(fileobj=export_file, mode="wb") as compressed:
+            output = io.TextIOWrapper(compressed, encoding="utf-8", newline="")
+            rows = write_export(queryset, job.export_format, output, progress=progress)
+            output.detach()
+        export_file.seek(0)
+        job.file.save(
+            "feedback-export-{}-{}.{}.gz".format(
+                job.pk, secrets.token_hex(16), job.export_format
+            ),
+            File(export_file),
+            save=False,
+        )
+    return rows
+
+
+def _get_executor():
+    """
+    Return the thread pool running the jobs, created on first use.
+    """
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "FEEDBACK_EXPORT_WORKERS", DEFAULT_WORKERS),
+            thread_name_prefix="feedback-export",
+        )
+    return _executor
+
+
+def _run_in_thread(job_id):
+    try:
+        return run_job(job_id)
+    finally:
+        connection.close()
+
+
+def submit_job(job_id):
+    """
+    Queue an export job on the configured backend.
+
+    Returns the Future of the job when it runs in a thread.
+    """
+    if getattr(settings, "FEEDBACK_EXPORT_BACKEND", "thread") == "celery":
+        # The task is sent by name, as feedback.tasks imports this module.
+        celery_app.send_task(RUN_EXPORT_TASK, args=[job_id])
+        return None
+    return _get_executor().submit(_run_in_thread, job_id)
+
+
+def create_job(filters, export_format, user=None):
+    """
+    Create the export job of the feedback matching some filters, e.g.
+    `{"course_key": "course-v1:edX+Demo+V1", "search": "quiz"}` or
+    `{"id__in": [1, 2]}`, queued when the current transaction commits.
+    """
+    job = FeedbackExportJob.objects.create(
+        created_by=user,
+        export_format=export_format,
+        filters=filters,
+    )
+    transaction.on_commit(lambda: submit_job(job.pk))
+    return job
+
+
+def requeue_stale_jobs(now=None):
+    """
+    Queue again the jobs pending, or running without progress nor
+    heartbeat, for more than `FEEDBACK_EXPORT_STALE_TIMEOUT` seconds, and
+    return their ids.
+    """
+    timeout = getattr(settings, "FEEDBACK_EXPORT_STALE_TIMEOUT", DEFAULT_STALE_TIMEOUT)
+    now = now or timezone.now()
+    stale = FeedbackExportJob.objects.filter(
+        status__in=[FeedbackExportJob.PENDING, FeedbackExportJob.RUNNING],
+        modified__lt=now - timedelta(seconds=timeout),
+    )
+    requeued = []
+    for job_id in stale.order_by("pk").values_list("pk", flat=True):
+        # Processes sweeping at once only requeue a job once.
+        if stale.filter(pk=job_id).update(
+            status=FeedbackExportJob.PENDING, modified=now
+        ):
+            log.warning("Requeuing the stale feedback export %s.", job_id)
+            transaction.on_commit(lambda job_id=job_id: submit_job(job_id))
+            requeued.append(job_id)
+    return requeued
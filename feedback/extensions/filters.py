@@ -9,6 +9,13 @@ from django.template import Context, Template
 from openedx_filters import PipelineStep
 from web_fragments.fragment import Fragment
 
+from feedback.backfill import is_backfilled
+from feedback.instrumentation import timer
+from feedback.models import Feedback
+from feedback.profiling import profiled
+from feedback.stats import summarize
+from feedback.themes import get_course_themes
+
 try:
     from cms.djangoapps.contentstore.utils import get_lms_link_for_item
     from lms.djangoapps.courseware.block_render import (
@@ -27,11 +34,24 @@ except ImportError:
 TEMPLATE_ABSOLUTE_PATH = "/instructor_dashboard/"
 BLOCK_CATEGORY = "feedback"
 TEMPLATE_CATEGORY = "feedback_instructor"
+# Number of answers shown for each block.
+ANSWERS_SHOWN = 10
+
+
+def _filter_target(step, context, template_name):  # pylint: disable=unused-argument
+    """
+    Return the user and course of an instructor dashboard request.
+    """
+    request = get_current_request()
+    user = getattr(request, "user", None)
+    course = context.get("course")
+    return getattr(user, "id", None), getattr(course, "id", None)
 
 
 class AddFeedbackTab(PipelineStep):
     """Add forum_notifier tab to instructor dashboard by adding a new context with feedback data."""
 
+    @profiled("run_filter", target=_filter_target)
     def run_filter(
         self, context, template_name
     ):  # pylint: disable=unused-argument, arguments-differ
@@ -55,6 +75,7 @@ class AddFeedbackTab(PipelineStep):
         context.update(
             {
                 "blocks": load_blocks(request, course),
+                "themes": get_course_themes(course.id),
             }
         )
 
@@ -85,6 +106,7 @@ class AddFeedbackTab(PipelineStep):
         )
 
 
+@timer("dashboard.build")
 def load_blocks(request, course):
     """
     Load feedback blocks for a given course for all enrolled students.
@@ -100,79 +122,116 @@ def load_blocks(request, course):
     )
 
     blocks = []
+    histograms = []
 
     if not feedback_blocks:
         return []
 
-    students = get_user_enrollments(course_id).values_list("user_id", "user__username")
-    for feedback_block in feedback_blocks:
-        block, _ = get_block_by_usage_id(
-            request,
-            str(course.id),
-            str(feedback_block.location),
-            disable_staff_debug_info=True,
-            course=course,
-        )
-        answers = load_xblock_answers(
-            request,
-            students,
-            str(course.location.course_key),
-            str(feedback_block.location),
-            course,
+    # Until the backfill of the course is done, the answers only stored in
+    # the user state of the blocks are read from there, learner by learner.
+    backfilled = is_backfilled(course.id)
+    if backfilled:
+        students = get_user_enrollments(course_id).values("user_id")
+    else:
+        students = get_user_enrollments(course_id).values_list(
+            "user_id", "user__username"
         )
+    for feedback_block in feedback_blocks:
+        with timer("dashboard.block"):
+            block, _ = get_block_by_usage_id(
+                request,
+                str(course.id),
+                str(feedback_block.location),
+                disable_staff_debug_info=True,
+                course=course,
+            )
+            scale_text = block.get_prompt()["scale_text"]
+            if backfilled:
+                answers = load_feedback_answers(
+                    course.id, students, str(feedback_block.location), scale_text
+                )
+            else:
+                answers = load_xblock_answers(
+                    request, students, course_id, str(feedback_block.location), course
+                )[-ANSWERS_SHOWN:]
+            if not block.vote_aggregate:
+                block.vote_aggregate = [0] * len(scale_text)
+            vote_aggregate = [
+                {"scale_text": scale_text[index], "count": vote}
+                for index, vote in enumerate(block.vote_aggregate)
+            ]
+            histograms.append(list(block.vote_aggregate))
 
-        vote_aggregate = []
-        total_votes = 0
-        total_answers = 0
+            unit = block.get_parent()
+            subsection = unit.get_parent()
+            section = subsection.get_parent()
 
-        if not block.vote_aggregate:
-            block.vote_aggregate = [0] * len(block.get_prompt()["scale_text"])
-        for index, vote in enumerate(block.vote_aggregate):
-            vote_aggregate.append(
+            blocks.append(
                 {
-                    "scale_text": block.get_prompt()["scale_text"][index],
-                    "count": vote,
+                    "display_name": block.display_name,
+                    "prompts": block.prompts,
+                    "vote_aggregate": vote_aggregate,
+                    "answers": answers,
+                    "unit_display_name": unit.display_name,
+                    "subsection_display_name": subsection.display_name,
+                    "section_display_name": section.display_name,
+                    "url": get_lms_link_for_item(block.location),
                 }
             )
-            total_answers += vote
-            # We have an inverted scale, so we need to invert the index
-            # to get the correct average rating.
-            # Excellent = 1, Very Good = 2, Good = 3, Fair = 4, Poor = 5
-            # So Excellent = 5, Very Good = 4, Good = 3, Fair = 2, Poor = 1
-            total_votes += vote * (5 - index)
-
-        try:
-            average_rating = round(total_votes / total_answers, 2)
-        except ZeroDivisionError:
-            average_rating = 0
-
-        unit = block.get_parent()
-        subsection = unit.get_parent()
-        section = subsection.get_parent()
-
-        blocks.append(
-            {
-                "display_name": block.display_name,
-                "prompts": block.prompts,
-                "vote_aggregate": vote_aggregate,
-                "answers": answers[-10:],
-                "unit_display_name": unit.display_name,
-                "subsection_display_name": subsection.display_name,
-                "section_display_name": section.display_name,
-                "average_rating": average_rating,
-                "url": get_lms_link_for_item(block.location),
-            }
-        )
+
+    # The statistics of all the blocks are computed in one batch.
+    for block_data, rating_stats in zip(blocks, summarize(histograms)):
+        block_data["average_rating"] = rating_stats["mean"]
+        block_data["rating_stats"] = rating_stats
     return blocks
 
 
+def load_feedback_answers(course_key, students, block_id, scale_text):
+    """
+    Load the latest answers with a comment of a feedback block.
+
+    The answers are read from the Feedback table in one query, whatever the
+    number of students. Answers only stored in the XBlock user state are
+    not read: the `backfill_feedback` command must have copied them first
+    (see `load_xblock_answers`).
+
+    Arguments:
+        course_key (CourseKey): Course of the block.
+        students (QuerySet): `user_id` values of the enrolled students.
+        block_id (str): Block ID.
+        scale_text (list): Text of the ratings, by vote index.
+    """
+    feedback = (
+        Feedback.objects.filter(
+            course_key=course_key, block_id=block_id, user_id__in=students
+        )
+        .exclude(feedback__isnull=True)
+        .exclude(feedback="")
+        .order_by("-modified", "-id")
+        .values_list("user__username", "rating", "feedback")[:ANSWERS_SHOWN]
+    )
+    return [
+        {
+            "username": username,
+            "user_vote": (
+                scale_text[rating]
+                if rating is not None and 0 <= rating < len(scale_text)
+                else "No vote"
+            ),
+            "user_freeform": text,
+        }
+        for username, rating, text in reversed(list(feedback))
+    ]
+
+
 def load_xblock_answers(request, students, course_id, block_id, course):
     """
-    Load answers for a given feedback xblock instance.
+    Load the answers with a comment of a feedback block from the user state
+    of each student, for the courses not backfilled yet.
 
     Arguments:
         request (HttpRequest): Django request object.
-        students (list): List of enrolled students.
+        students (list): (user_id, username) of the enrolled students.
         course_id (str): Course ID.
         block_id (str): Block ID.
         course (CourseDescriptor): Course descriptor.
@@ -12,10 +12,24 @@ import random
 import importlib.resources
 import six
 from web_fragments.fragment import Fragment
-from django.contrib.auth.models import User
-from xblock.core import XBlock
+from webob import Response
+from xblock.core import JsonHandlerError, XBlock
 from xblock.fields import Scope, Integer, String, List, Float, Boolean
 
+from feedback import instrumentation, moderation
+from feedback.aggregates import (
+    get_aggregate_version,
+    get_cached_aggregate,
+    set_cached_aggregate,
+    update_cached_aggregate,
+)
+from feedback.events import freeform_event_payload
+from feedback.profiling import profiled, xblock_target
+from feedback.ratelimit import (
+    allow_submission,
+    claim_submission,
+    release_submission,
+)
 from feedback.utils import _
 
 try:
@@ -55,6 +69,7 @@ ICON_SETS = {
 
 
 @XBlock.needs("i18n")
+@XBlock.wants("user")
 class FeedbackXBlock(XBlock):
     """
     This is an XBlock -- eventually, hopefully an aside -- which
@@ -192,17 +207,31 @@ class FeedbackXBlock(XBlock):
         prompt.update(self.prompts[index])
         return prompt
 
+    def init_prompt_choice(self):
+        """
+        Figure out which prompt we show. We set self.prompt_choice to
+        the index of the prompt. We set it if it is out of range (either
+        uninitiailized, or incorrect due to changing list length).
+        """
+        if self.prompt_choice < 0 or self.prompt_choice >= len(self.prompts):
+            self.prompt_choice = random.randint(0, len(self.prompts) - 1)
+
+    def is_shown(self):
+        """
+        Return whether the block is shown to the learner, initializing the
+        random number compared with `p` when needed.
+        """
+        if self.p_user == -1:
+            self.p_user = random.uniform(0, 100)
+        return self.p_user < self.p
+
+    @instrumentation.timer("student_view")
     def student_view(self, context=None):  # pylint: disable=unused-argument
         """
         The primary view of the FeedbackXBlock, shown to students
         when viewing courses.
         """
-        # Figure out which prompt we show. We set self.prompt_choice to
-        # the index of the prompt. We set it if it is out of range (either
-        # uninitiailized, or incorrect due to changing list length). Then,
-        # we grab the prompt, prepopulated with defaults.
-        if self.prompt_choice < 0 or self.prompt_choice >= len(self.prompts):
-            self.prompt_choice = random.randint(0, len(self.prompts) - 1)
+        self.init_prompt_choice()
         prompt = self.get_prompt()
 
         # Staff see vote totals, so we have slightly different HTML here.
@@ -215,10 +244,9 @@ class FeedbackXBlock(XBlock):
         # If the user voted before, we'd like to show that
         active_vote = ["checked" if i == self.user_vote else "" for i in indexes]
 
-        # Confirm that we do have vote totals (this may be uninitialized
-        # otherwise). This should probably go into __init__ or similar.
-        self.init_vote_aggregate()
-        votes = self.vote_aggregate
+        # Vote totals are only read when they are shown.
+        show_votes = self.show_aggregate_to_students or self.is_staff()
+        votes = self.get_vote_aggregate() if show_votes else [0] * len(indexes)
 
         # We grab the icons. This should move to a Filesystem field so
         # instructors can upload new ones
@@ -255,8 +283,7 @@ class FeedbackXBlock(XBlock):
                     "vote_cnt": vote_cnt,
                     "ina_icon": ina_icon,
                     "act_icon": act_icon,
-                    "is_display_vote_cnt": self.vote_aggregate
-                    and (self.show_aggregate_to_students or self.is_staff()),
+                    "is_display_vote_cnt": show_votes,
                 },
                 i18n_service=self.runtime.service(self, "i18n"),
             )
@@ -284,24 +311,12 @@ class FeedbackXBlock(XBlock):
         else:
             response = ""
 
-        user_name = "User"  # Default fallback
-        if hasattr(self, "xmodule_runtime") and hasattr(
-            self.xmodule_runtime, "user_id"
-        ):
-            try:
-                user = User.objects.get(id=self.xmodule_runtime.user_id)
-                user_name = user.profile.name or user.get_full_name() or user.username
-            except User.DoesNotExist:
-                user_name = "User"
-
         # We initialize self.p_user if not initialized -- this sets whether
         # or not we show it. From there, if it is less than odds of showing,
         # we set the fragment to the rendered XBlock. Otherwise, we return
         # empty HTML. There ought to be a way to return None, but XBlocks
         # doesn't support that.
-        if self.p_user == -1:
-            self.p_user = random.uniform(0, 100)
-        if self.p_user < self.p:
+        if self.is_shown():
             frag = Fragment()
             frag.add_content(
                 resource_loader.render_django_template(
@@ -313,7 +328,8 @@ class FeedbackXBlock(XBlock):
                         "likert_prompt": prompt["likert"],
                         "response": response,
                         "placeholder": prompt["placeholder"],
-                        "user_name": user_name,
+                        "user_name": self.get_user_name(),
+                        "consent_to_share": self.consent_to_share == "true",
                     },
                     i18n_service=self.runtime.service(self, "i18n"),
                 )
@@ -328,6 +344,49 @@ class FeedbackXBlock(XBlock):
         frag.initialize_js("FeedbackXBlock")
         return frag
 
+    def get_user_name(self):
+        """
+        Return the name the learner is greeted with.
+
+        The user service serves the user of the request, so that rendering
+        the block does not query the user and profile tables.
+        """
+        user_service = self.runtime.service(self, "user")
+        if user_service is None:
+            return "User"
+        try:
+            user = user_service.get_current_user()
+        except NotImplementedError:
+            return "User"
+        return user.full_name or user.opt_attrs.get("edx-platform.username") or "User"
+
+    def student_view_data(self, context=None):  # pylint: disable=unused-argument
+        """
+        Return the data of the student view as JSON, for mobile and
+        headless clients, without rendering any template.
+        """
+        self.init_prompt_choice()
+        prompt = self.get_prompt()
+        show_votes = self.show_aggregate_to_students or self.is_staff()
+        data = {
+            "display_name": self.display_name,
+            "shown": self.is_shown(),
+            "likert_prompt": prompt["likert"],
+            "freeform_prompt": prompt["freeform"],
+            "placeholder": prompt["placeholder"],
+            "scale_text": prompt["scale_text"],
+            "icon_set": prompt["icon_set"],
+            "user_vote": self.user_vote,
+            "user_freeform": self.user_freeform,
+            "consent_to_share": self.consent_to_share == "true",
+            "voting_message": self.voting_message,
+            "feedback_message": self.feedback_message,
+            "show_aggregate": show_votes,
+        }
+        if show_votes:
+            data["aggregate"] = self.get_vote_aggregate()
+        return data
+
     def studio_view(self, context):  # pylint: disable=unused-argument
         """
         Create a fragment used to display the edit view in the Studio.
@@ -358,6 +417,8 @@ class FeedbackXBlock(XBlock):
         return frag
 
     @XBlock.json_handler
+    @instrumentation.timer("handler.studio_submit")
+    @profiled("handler.studio_submit", target=xblock_target)
     def studio_submit(self, data, suffix=""):  # pylint: disable=unused-argument
         """
         Called when submitting the form in Studio.
@@ -389,6 +450,21 @@ class FeedbackXBlock(XBlock):
         if not self.vote_aggregate:
             self.vote_aggregate = [0] * (len(self.get_prompt()["scale_text"]))
 
+    def get_vote_aggregate(self):
+        """
+        Return the vote counts of the block, from the cache when possible.
+        """
+        aggregate = get_cached_aggregate(self.scope_ids.usage_id)
+        instrumentation.increment(
+            "cache.aggregate.{}".format("miss" if aggregate is None else "hit")
+        )
+        if aggregate is None:
+            aggregate = self.vote_aggregate or [0] * len(
+                self.get_prompt()["scale_text"]
+            )
+            set_cached_aggregate(self.scope_ids.usage_id, aggregate)
+        return aggregate
+
     def vote(self, data):
         """
         Handle voting
@@ -406,8 +482,40 @@ class FeedbackXBlock(XBlock):
 
         self.user_vote = data["vote"]
         self.vote_aggregate[self.user_vote] += 1
+        update_cached_aggregate(self.scope_ids.usage_id, self.vote_aggregate)
+
+    @XBlock.handler
+    @instrumentation.timer("handler.aggregate")
+    @profiled("handler.aggregate", target=xblock_target)
+    def aggregate(self, request, suffix=""):  # pylint: disable=unused-argument
+        """
+        Return the vote counts of the block, for live updates.
+
+        The response carries the version of the aggregate as its ETag:
+        polls sending it back in `If-None-Match` get a 304 response while
+        the aggregate is unchanged, without reading it.
+        """
+        if request.method != "GET":
+            return Response(status=405, allow=["GET"])
+        if not (self.show_aggregate_to_students or self.is_staff()):
+            return Response(status=403)
+
+        version = get_aggregate_version(self.scope_ids.usage_id)
+        if version in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = Response(
+                json_body={"aggregate": self.get_vote_aggregate()},
+                content_type="application/json",
+                charset="utf-8",
+            )
+        response.etag = version
+        response.cache_control = "private, no-cache"
+        return response
 
     @XBlock.json_handler
+    @instrumentation.timer("handler.feedback")
+    @profiled("handler.feedback", target=xblock_target)
     def feedback(self, data, suffix=""):  # pylint: disable=unused-argument
         """
         Allow students to submit feedback, both numerical and
@@ -418,39 +526,106 @@ class FeedbackXBlock(XBlock):
         client code, it is helpful for testing. For staff users, we
         also return the aggregate results.
         """
+        return self._submit(data)
+
+    @XBlock.json_handler
+    @instrumentation.timer("handler.submit")
+    @profiled("handler.submit", target=xblock_target)
+    def submit(self, data, suffix=""):  # pylint: disable=unused-argument
+        """
+        Submit the vote, the feedback text and the consent together.
+
+        The client generates a `submission_id` for each submission and
+        sends it again when retrying it: a retry of a submission already
+        received, even one still running, only returns the current state, so
+        that it cannot overwrite a newer one.
+        """
+        submission_id = data.get("submission_id")
+        user_id, usage_id = self.scope_ids.user_id, self.scope_ids.usage_id
+        if submission_id and not claim_submission(user_id, usage_id, submission_id):
+            response = {
+                "success": True,
+                "response": (
+                    self.feedback_message if "freeform" in data else self.voting_message
+                ),
+            }
+            return self._add_state(response)
+
+        try:
+            return self._submit(data)
+        except Exception:
+            if submission_id:
+                release_submission(user_id, usage_id, submission_id)
+            raise
+
+    def _add_state(self, response):
+        """
+        Add the current state of the learner, and the aggregate when it is
+        visible, to a handler response.
+        """
+        response.update(
+            {
+                "freeform": self.user_freeform,
+                "vote": self.user_vote,
+            }
+        )
+
+        if self.show_aggregate_to_students or self.is_staff():
+            response["aggregate"] = self.get_vote_aggregate()
+        return response
+
+    def _submit(self, data):
+        """
+        Store the vote, feedback text and consent of a submission, and
+        return the new state.
+
+        Raises a 429 JsonHandlerError when the learner submits too often.
+        """
         _ = self.runtime.service(self, "i18n").ugettext
 
+        if not allow_submission(self.scope_ids.user_id, self.scope_ids.usage_id):
+            raise JsonHandlerError(
+                429, _("Too many submissions, please try again later.")
+            )
+
+        # Submissions repeating the current state (e.g. the same vote sent
+        # again) are answered without writes or events.
+        vote_changed = "vote" in data and data["vote"] != self.user_vote
+        freeform_changed = "freeform" in data and data["freeform"] != self.user_freeform
+        consent = self.consent_to_share == "true"
+        consent_changed = (
+            "consent_to_share" in data
+            and (data["consent_to_share"] in (True, "true")) != consent
+        )
+
         if "freeform" not in data and "vote" not in data:
             response = {"success": False, "response": _("Please vote!")}
             self.runtime.publish(self, "edx.feedbackxblock.nothing_provided", {})
         if "vote" in data:
             response = {"success": True, "response": self.voting_message}
-            self.runtime.publish(
-                self,
-                "edx.feedbackxblock.likert_provided",
-                {"old_vote": self.user_vote, "new_vote": data["vote"]},
-            )
-            self.vote(data)
+            if vote_changed:
+                self.runtime.publish(
+                    self,
+                    "edx.feedbackxblock.likert_provided",
+                    {"old_vote": self.user_vote, "new_vote": data["vote"]},
+                )
+                self.vote(data)
         if "freeform" in data:
             response = {"success": True, "response": self.feedback_message}
-            self.runtime.publish(
-                self,
-                "edx.feedbackxblock.freeform_provided",
-                {"old_freeform": self.user_freeform, "new_freeform": data["freeform"]},
-            )
-            self.user_freeform = data["freeform"]
-
-        response.update(
-            {  # pylint: disable=possibly-used-before-assignment
-                "freeform": self.user_freeform,
-                "vote": self.user_vote,
-            }
-        )
+            if freeform_changed:
+                self.runtime.publish(
+                    self,
+                    "edx.feedbackxblock.freeform_provided",
+                    freeform_event_payload(self.user_freeform, data["freeform"]),
+                )
+                self.user_freeform = data["freeform"]
+        if consent_changed:
+            consent = data["consent_to_share"] in (True, "true")
+            self.consent_to_share = "true" if consent else "false"
 
-        if self.show_aggregate_to_students or self.is_staff():
-            response["aggregate"] = self.vote_aggregate
+        self._add_state(response)  # pylint: disable=possibly-used-before-assignment
 
-        if "freeform" in data or "vote" in data:
+        if vote_changed or freeform_changed or consent_changed:
             Feedback.create_or_update(
                 self.course_id,
                 self.xmodule_runtime.user_id,
@@ -458,7 +633,12 @@ class FeedbackXBlock(XBlock):
                 self.display_name,
                 data.get("vote"),
                 data.get("freeform"),
-                data.get("consent_to_share", False),
+                consent,
+                is_flagged=(
+                    moderation.is_flagged(data["freeform"])
+                    if freeform_changed
+                    else None
+                ),
             )
 
         return response
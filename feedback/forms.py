@@ -0,0 +1,38 @@
+"""
+Forms for the feedback app.
+"""
+
+from django import forms
+from django.core.exceptions import ValidationError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+
+class ShareFeedbackForm(forms.Form):
+    """
+    Form to pick the course versions feedback is shared with.
+    """
+
+    course_keys = forms.CharField(
+        label="Course keys",
+        widget=forms.Textarea(attrs={"rows": 5, "cols": 60}),
+        help_text="One course key per line.",
+    )
+
+    def clean_course_keys(self):
+        """
+        Parse the course keys, one per line.
+        """
+        course_keys = []
+        for line in self.cleaned_data["course_keys"].splitlines():
+            if not line.strip():
+                continue
+            try:
+                course_keys.append(CourseKey.from_string(line.strip()))
+            except InvalidKeyError as error:
+                raise ValidationError(
+                    "Invalid course key: {}".format(line.strip())
+                ) from error
+        if not course_keys:
+            raise ValidationError("Enter at least one course key.")
+        return course_keys
@@ -0,0 +1,244 @@
+"""
+Timings and counters of the feedback block and app.
+
+The `FEEDBACK_INSTRUMENTATION` setting selects where the metrics go:
+
+* None (default): nowhere, the instrumentation is disabled.
+* "logging": to the `feedback.instrumentation` logger, at the INFO level.
+* "statsd": to a StatsD server, over UDP, at `FEEDBACK_STATSD_HOST` and
+  `FEEDBACK_STATSD_PORT`.
+* "memory": to a MemorySink kept in the process, for the tests.
+* the dotted path of a sink class, taking the prefix as its argument.
+
+Metric names are prefixed with `FEEDBACK_INSTRUMENTATION_PREFIX`
+("feedback" by default). Times are in milliseconds. Cache hit rates are
+reported as `<name>.hit` and `<name>.miss` counters.
+
+Usage:
+
+    with timer("dashboard.block"):
+        ...
+
+    @timer("student_view")
+    def student_view(self, context=None):
+        ...
+
+    increment("cache.aggregate.hit")
+"""
+
+import logging
+import socket
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PREFIX = "feedback"
+DEFAULT_STATSD_HOST = "localhost"
+DEFAULT_STATSD_PORT = 8125
+
+_lock = threading.Lock()
+_sink = None
+_sink_source = None
+
+
+class LoggingSink:
+    """
+    Log the metrics.
+    """
+
+    def __init__(self, prefix=DEFAULT_PREFIX):
+        self.prefix = prefix
+
+    def timing(self, name, milliseconds):
+        log.info("%s.%s: %.3f ms", self.prefix, name, milliseconds)
+
+    def increment(self, name, value=1):
+        log.info("%s.%s: +%s", self.prefix, name, value)
+
+    def gauge(self, name, value):
+        log.info("%s.%s: %s", self.prefix, name, value)
+
+
+class StatsdSink:
+    """
+    Send the metrics to a StatsD server.
+
+    Metrics are sent in UDP datagrams, without waiting for the server:
+    send errors are ignored, and metrics are lost when the server is down.
+    """
+
+    def __init__(
+        self, prefix=DEFAULT_PREFIX, host=DEFAULT_STATSD_HOST, port=DEFAULT_STATSD_PORT
+    ):
+        self.prefix = prefix
+        self.address = None
+        self.socket = None
+        try:
+            family, _, _, _, address = socket.getaddrinfo(
+                host, port, type=socket.SOCK_DGRAM
+            )[0]
+        except OSError:
+            log.warning("The StatsD server %s:%s cannot be resolved.", host, port)
+            return
+        self.address = address
+        self.socket = socket.socket(family, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+    def _send(self, name, value, metric_type):
+        """
+        Send a metric in one datagram, ignoring the errors.
+        """
+        if self.socket is None:
+            return
+        data = "{prefix}.{name}:{value}|{type}".format(
+            prefix=self.prefix, name=name, value=value, type=metric_type
+        )
+        try:
+            self.socket.sendto(data.encode("utf-8"), self.address)
+        except OSError:
+            pass
+
+    def timing(self, name, milliseconds):
+        self._send(name, round(milliseconds, 3), "ms")
+
+    def increment(self, name, value=1):
+        self._send(name, value, "c")
+
+    def gauge(self, name, value):
+        self._send(name, value, "g")
+
+
+class MemorySink:
+    """
+    Keep the metrics in memory, for the tests.
+    """
+
+    def __init__(self, prefix=DEFAULT_PREFIX):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.timings = defaultdict(list)
+            self.counters = defaultdict(int)
+            self.gauges = {}
+
+    def timing(self, name, milliseconds):
+        with self._lock:
+            self.timings[name].append(milliseconds)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def hit_rate(self, name):
+        """
+        Return the share of hits of the `<name>.hit` and `<name>.miss`
+        counters, or None before the first lookup.
+        """
+        hits = self.counters.get(name + ".hit", 0)
+        lookups = hits + self.counters.get(name + ".miss", 0)
+        return hits / lookups if lookups else None
+
+
+SINKS = {
+    "logging": LoggingSink,
+    "statsd": StatsdSink,
+    "memory": MemorySink,
+}
+
+
+def _create_sink(backend, prefix, host, port):
+    """
+    Return a sink of a backend name or class path, or None when unknown.
+    """
+    if backend == "statsd":
+        return StatsdSink(prefix, host, port)
+    try:
+        sink_class = SINKS.get(backend) or import_string(backend)
+    except ImportError:
+        log.warning("Unknown feedback instrumentation sink %s.", backend)
+        return None
+    return sink_class(prefix)
+
+
+def get_sink():
+    """
+    Return the configured sink, or None when the instrumentation is
+    disabled.
+
+    The sink is created once per process, and again only when the settings
+    change.
+    """
+    global _sink, _sink_source  # pylint: disable=global-statement
+
+    backend = getattr(settings, "FEEDBACK_INSTRUMENTATION", None)
+    if not backend:
+        return None
+    source = (
+        backend,
+        getattr(settings, "FEEDBACK_INSTRUMENTATION_PREFIX", DEFAULT_PREFIX),
+        getattr(settings, "FEEDBACK_STATSD_HOST", DEFAULT_STATSD_HOST),
+        getattr(settings, "FEEDBACK_STATSD_PORT", DEFAULT_STATSD_PORT),
+    )
+    if source == _sink_source:
+        return _sink
+
+    with _lock:
+        if source != _sink_source:
+            _sink = _create_sink(*source)
+            _sink_source = source
+        return _sink
+
+
+@contextmanager
+def timer(name):
+    """
+    Time a block of code, or a function when used as a decorator.
+    """
+    sink = get_sink()
+    if sink is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        sink.timing(name, (time.perf_counter() - start) * 1000)
+
+
+def increment(name, value=1):
+    sink = get_sink()
+    if sink is not None:
+        sink.increment(name, value)
+
+
+def gauge(name, value):
+    sink = get_sink()
+    if sink is not None:
+        sink.gauge(name, value)
+
+
+def record_throughput(name, rows, seconds):
+    """
+    Record a batch of rows processed in a given time: the `<name>.rows`
+    counter, the `<name>` time and the `<name>.rows_per_second` gauge.
+    """
+    sink = get_sink()
+    if sink is None:
+        return
+    sink.increment(name + ".rows", rows)
+    sink.timing(name, seconds * 1000)
+    if seconds > 0:
+        sink.gauge(name + ".rows_per_second", round(rows / seconds, 1))
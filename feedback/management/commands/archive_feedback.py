@@ -0,0 +1,79 @@
+"""
+Move the feedback of ended courses, and old feedback, to the archive.
+
+Examples:
+
+    ./manage.py lms archive_feedback --dry-run
+    ./manage.py lms archive_feedback
+    ./manage.py lms archive_feedback --course course-v1:edX+Demo+V1 \
+        --after-years 0 --ended-courses-days 0
+"""
+
+from django.core.management.base import BaseCommand
+
+from feedback.archive import DEFAULT_BATCH_SIZE, archive_feedback, get_policy
+from feedback.management.utils import parse_course_key
+
+
+class Command(BaseCommand):
+    """
+    Move the feedback selected by the retention policy to FeedbackArchive.
+    """
+
+    help = "Move the feedback of ended courses, and old feedback, to the archive."
+
+    def add_arguments(self, parser):
+        after_years, ended_courses_days = get_policy()
+        parser.add_argument(
+            "--course",
+            action="append",
+            dest="courses",
+            default=[],
+            help="Archive all the feedback of this course. Can be repeated.",
+        )
+        parser.add_argument(
+            "--after-years",
+            type=int,
+            default=after_years,
+            help=(
+                "Archive the feedback of ended courses created more than this "
+                "many years ago (0: never)."
+            ),
+        )
+        parser.add_argument(
+            "--ended-courses-days",
+            type=int,
+            default=ended_courses_days,
+            help="Archive the feedback of the courses ended this many days ago (0: never).",
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the feedback to archive.",
+        )
+
+    def handle(self, *args, **options):
+        # An age of 0 years, or 0 days, disables its criterion.
+        count = archive_feedback(
+            course_keys=[
+                parse_course_key(course_id) for course_id in options["courses"]
+            ],
+            after_years=options["after_years"] or None,
+            ended_courses_days=options["ended_courses_days"] or None,
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            progress=self.progress,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{verb} {count} feedback.".format(
+                    verb="Would archive" if options["dry_run"] else "Archived",
+                    count=count,
+                )
+            )
+        )
+
+    def progress(self, archived):
+        """Report the progress after each batch."""
+        self.stdout.write("Archived {} feedback so far.".format(archived))
@@ -0,0 +1,126 @@
+"""
+Backfill the Feedback table from the user state of the feedback blocks.
+
+Examples:
+
+    ./manage.py lms backfill_feedback
+    ./manage.py lms backfill_feedback --workers 4
+    ./manage.py lms backfill_feedback --course course-v1:edX+Demo+V1 --reset
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from feedback.backfill import (
+    CHECKPOINT_PREFIX,
+    DEFAULT_BATCH_SIZE,
+    backfill,
+    checkpoint_name,
+    list_courses,
+)
+from feedback.management.utils import parse_course_key
+from feedback.models import FeedbackCheckpoint
+
+
+def init_worker():
+    """
+    Set up Django in a worker process, with its own database connections.
+    """
+    django.setup()
+    connections.close_all()
+
+
+def backfill_course(course_id, batch_size):
+    """
+    Backfill one course, in a worker process.
+    """
+    return course_id, backfill(course_id, batch_size)
+
+
+class Command(BaseCommand):
+    """
+    Backfill the Feedback table from StudentModule, resuming from the last
+    checkpoint.
+    """
+
+    help = "Backfill the Feedback table from the user state of the feedback blocks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            action="append",
+            dest="courses",
+            default=[],
+            help="Only backfill this course. Can be repeated.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Backfill the courses in this many parallel processes.",
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Ignore the checkpoints and start over.",
+        )
+
+    def handle(self, *args, **options):
+        course_keys = [parse_course_key(course_id) for course_id in options["courses"]]
+        if options["workers"] > 1 and not course_keys:
+            course_keys = list_courses()
+
+        if options["reset"]:
+            if course_keys:
+                for course_key in course_keys:
+                    FeedbackCheckpoint.reset(checkpoint_name(course_key))
+            else:
+                FeedbackCheckpoint.reset(CHECKPOINT_PREFIX)
+
+        if not course_keys:
+            created, updated = backfill(
+                batch_size=options["batch_size"], progress=self.progress
+            )
+            self.report("all courses", created, updated)
+        elif options["workers"] > 1:
+            # Connections must not be shared with the forked workers.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=init_worker
+            ) as executor:
+                results = executor.map(
+                    backfill_course,
+                    [str(course_key) for course_key in course_keys],
+                    [options["batch_size"]] * len(course_keys),
+                )
+                for course_id, (created, updated) in results:
+                    self.report(course_id, created, updated)
+        else:
+            for course_key in course_keys:
+                created, updated = backfill(
+                    course_key, options["batch_size"], progress=self.progress
+                )
+                self.report(course_key, created, updated)
+
+    def progress(self, last_id, created, updated):
+        """Report the progress after each chunk."""
+        self.stdout.write(
+            "Processed up to StudentModule {last_id}: "
+            "{created} created, {updated} updated.".format(
+                last_id=last_id, created=created, updated=updated
+            )
+        )
+
+    def report(self, scope, created, updated):
+        """Report the result of the backfill of a course."""
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Backfilled {scope}: {created} created, {updated} updated.".format(
+                    scope=scope, created=created, updated=updated
+                )
+            )
+        )
@@ -0,0 +1,53 @@
+"""
+Compute the recurring themes of the freeform feedback of every course, or
+of the given courses.
+
+Examples:
+
+    ./manage.py lms compute_feedback_themes
+    ./manage.py lms compute_feedback_themes --course course-v1:edX+Demo+V1 --full
+"""
+
+from django.core.management.base import BaseCommand
+
+from feedback.management.utils import parse_course_key
+from feedback.reconcile import list_courses
+from feedback.themes import update_course_themes
+
+
+class Command(BaseCommand):
+    """
+    Incrementally update the FeedbackThemeSummary table.
+    """
+
+    help = "Compute the recurring themes of the freeform feedback of each course."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            action="append",
+            dest="courses",
+            default=[],
+            help="Only process this course. Can be repeated.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recount all the feedback instead of the feedback created since the last run.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        course_keys = [
+            parse_course_key(course_id) for course_id in options["courses"]
+        ] or list_courses()
+        for course_key in course_keys:
+            read = update_course_themes(
+                course_key, full=options["full"], batch_size=options["batch_size"]
+            )
+            self.stdout.write("{}: {} comments read.".format(course_key, read))
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Updated the themes of {} courses.".format(len(course_keys))
+            )
+        )
@@ -0,0 +1,139 @@
+"""
+Export the feedback of every course to compressed shards, with a manifest.
+
+Examples:
+
+    ./manage.py lms export_feedback /exports/2025-01-06
+    ./manage.py lms export_feedback /exports/2025-01-06 --incremental --workers 8
+    ./manage.py lms export_feedback /exports/demo --format csv \
+        --course course-v1:edX+Demo+V1 --include-archived
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from feedback.bulk_export import (
+    export_course,
+    get_window,
+    list_courses,
+    save_watermark,
+    write_manifest,
+)
+from feedback.management.utils import parse_course_key
+from feedback.models import FeedbackExportJob
+
+
+def init_worker():
+    """
+    Set up Django in a worker process, with its own database connections.
+    """
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    """
+    Export the feedback, one shard per course, in parallel processes.
+    """
+
+    help = "Export the feedback of every course to compressed shards, with a manifest."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Directory of the shards and manifest.")
+        parser.add_argument(
+            "--format",
+            choices=[FeedbackExportJob.JSONL, FeedbackExportJob.CSV],
+            default=FeedbackExportJob.JSONL,
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only export the feedback changed since the previous export.",
+        )
+        parser.add_argument(
+            "--course",
+            action="append",
+            dest="courses",
+            default=[],
+            help="Only export this course. Can be repeated.",
+        )
+        parser.add_argument(
+            "--include-archived",
+            action="store_true",
+            help="Also export the archived feedback, to shards of its own.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Export the courses in this many parallel processes.",
+        )
+
+    def handle(self, *args, **options):
+        export_format = options["format"]
+        directory = options["output"]
+        os.makedirs(directory, exist_ok=True)
+
+        since, until = get_window(options["incremental"])
+        tasks = []
+        for archived in [False, True] if options["include_archived"] else [False]:
+            if options["courses"]:
+                course_ids = [
+                    str(parse_course_key(course_id)) for course_id in options["courses"]
+                ]
+            else:
+                course_ids = [
+                    str(course_key)
+                    for course_key in list_courses(since, until, archived)
+                ]
+            tasks += [(course_id, archived) for course_id in course_ids]
+
+        if options["workers"] > 1 and len(tasks) > 1:
+            # Connections must not be shared with the forked workers.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=init_worker
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        export_course,
+                        course_id,
+                        directory,
+                        export_format,
+                        since=since,
+                        until=until,
+                        archived=archived,
+                    )
+                    for course_id, archived in tasks
+                ]
+                shards = [future.result() for future in futures]
+        else:
+            shards = [
+                export_course(
+                    course_id,
+                    directory,
+                    export_format,
+                    since=since,
+                    until=until,
+                    archived=archived,
+                )
+                for course_id, archived in tasks
+            ]
+
+        manifest = write_manifest(directory, export_format, since, until, shards)
+        # Only a full export of all the courses moves the watermark.
+        if not options["courses"]:
+            save_watermark(until)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Exported {rows} feedback rows of {courses} courses to {manifest}.".format(
+                    rows=sum(shard["rows"] for shard in shards),
+                    courses=len({shard["course_id"] for shard in shards}),
+                    manifest=manifest,
+                )
+            )
+        )
@@ -0,0 +1,108 @@
+"""
+Generate synthetic learners and feedback for a course, to benchmark the
+dashboard and the admin on large courses in a local database.
+
+Examples:
+
+    ./manage.py lms generate_synthetic_feedback course-v1:edX+Synthetic+1 --learners 10000
+    ./manage.py lms generate_synthetic_feedback course-v1:edX+Synthetic+1 --blocks 20 \\
+        --ratings 10,20,30,20,20 --share-with course-v1:edX+Synthetic+2
+    ./manage.py lms generate_synthetic_feedback course-v1:edX+Synthetic+1 --delete
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from feedback.management.utils import parse_course_key
+from feedback.synthetic import DEFAULT_RATING_WEIGHTS, delete_course, generate_course
+
+
+class Command(BaseCommand):
+    """
+    Populate the Feedback table with the synthetic data of a course.
+    """
+
+    help = "Generate synthetic learners and feedback for a course."
+
+    def add_arguments(self, parser):
+        parser.add_argument("course", help="Course key of the synthetic course.")
+        parser.add_argument("--blocks", type=int, default=5)
+        parser.add_argument("--learners", type=int, default=1000)
+        parser.add_argument(
+            "--ratings",
+            default=",".join(str(weight) for weight in DEFAULT_RATING_WEIGHTS),
+            help="Weights of the ratings, best first, e.g. 35,30,15,12,8.",
+        )
+        parser.add_argument(
+            "--comment-ratio",
+            type=float,
+            default=0.3,
+            help="Share of the answers with a comment.",
+        )
+        parser.add_argument(
+            "--comment-words",
+            default="5,80",
+            help="Minimum and maximum number of words of a comment.",
+        )
+        parser.add_argument(
+            "--share-with",
+            action="append",
+            default=[],
+            help="Course the approved feedback is shared with. Can be repeated.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete the synthetic learners of the course and their feedback.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Run even when DEBUG is off.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError(
+                "This command writes synthetic data: only run it on a local "
+                "database, or use --force."
+            )
+        course_key = parse_course_key(options["course"])
+
+        if options["delete"]:
+            deleted = delete_course(course_key)
+            self.stdout.write(
+                self.style.SUCCESS("Deleted {} synthetic learners.".format(deleted))
+            )
+            return
+
+        try:
+            rating_weights = [float(weight) for weight in options["ratings"].split(",")]
+            comment_words = tuple(
+                int(words) for words in options["comment_words"].split(",")
+            )
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+        if len(comment_words) != 2:
+            raise CommandError("--comment-words takes a minimum and a maximum.")
+
+        course = generate_course(
+            course_key,
+            blocks=options["blocks"],
+            learners=options["learners"],
+            rating_weights=rating_weights,
+            comment_ratio=options["comment_ratio"],
+            comment_words=comment_words,
+            shared_with=[
+                parse_course_key(course_id) for course_id in options["share_with"]
+            ],
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Generated {} feedback entries for {} blocks.".format(
+                    course.feedback.count(), len(course.block_ids)
+                )
+            )
+        )
@@ -0,0 +1,56 @@
+"""
+Rebuild the search index of the freeform feedback text.
+
+Only needed on databases without full-text search, for the feedback saved
+before the index existed or written in bulk (e.g. by `backfill_feedback`).
+
+Examples:
+
+    ./manage.py lms index_feedback_search
+    ./manage.py lms index_feedback_search --course course-v1:edX+Demo+V1
+"""
+
+from django.core.management.base import BaseCommand
+
+from feedback.management.utils import parse_course_key
+from feedback.models import Feedback
+from feedback.search import rebuild_index, uses_fulltext
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the FeedbackSearchTerm table.
+    """
+
+    help = "Rebuild the search index of the freeform feedback text."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            action="append",
+            dest="courses",
+            default=[],
+            help="Only index this course. Can be repeated.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if uses_fulltext():
+            self.stdout.write("The database full-text index is used, nothing to do.")
+            return
+
+        queryset = Feedback.objects.all()
+        course_keys = [parse_course_key(course_id) for course_id in options["courses"]]
+        if course_keys:
+            queryset = queryset.filter(course_key__in=course_keys)
+
+        indexed = rebuild_index(
+            queryset,
+            batch_size=options["batch_size"],
+            progress=lambda indexed: self.stdout.write(
+                "Indexed {} feedback entries.".format(indexed)
+            ),
+        )
+        self.stdout.write(
+            self.style.SUCCESS("Indexed {} feedback entries.".format(indexed))
+        )
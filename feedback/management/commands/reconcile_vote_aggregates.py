@@ -0,0 +1,66 @@
+"""
+Compare the stored vote aggregates of the feedback blocks with the Feedback
+rows, and optionally repair them.
+
+Examples:
+
+    ./manage.py lms reconcile_vote_aggregates
+    ./manage.py lms reconcile_vote_aggregates --course course-v1:edX+Demo+V1 --repair
+"""
+
+from django.core.management.base import BaseCommand
+
+from feedback.management.utils import parse_course_key
+from feedback.reconcile import find_drift, list_courses, repair
+
+
+class Command(BaseCommand):
+    """
+    Report, and optionally repair, the drift between the vote aggregates
+    and the Feedback rows, course by course.
+    """
+
+    help = (
+        "Reconcile the vote aggregates of the feedback blocks with the Feedback rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            action="append",
+            dest="courses",
+            default=[],
+            help="Only reconcile this course. Can be repeated.",
+        )
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Replace the drifting aggregates with the recomputed ones.",
+        )
+
+    def handle(self, *args, **options):
+        course_keys = [
+            parse_course_key(course_id) for course_id in options["courses"]
+        ] or list_courses()
+
+        total = 0
+        for course_key in course_keys:
+            for drift in find_drift(course_key):
+                total += 1
+                self.stdout.write(
+                    "{course_key} {block_id}: stored {stored}, expected {expected}".format(
+                        **vars(drift)
+                    )
+                )
+                if options["repair"]:
+                    repair(drift)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{total} drifting aggregates in {courses} courses{repaired}.".format(
+                    total=total,
+                    courses=len(course_keys),
+                    repaired=", repaired" if options["repair"] and total else "",
+                )
+            )
+        )
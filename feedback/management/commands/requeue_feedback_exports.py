@@ -0,0 +1,26 @@
+"""
+Queue again the background exports of the feedback left without progress,
+e.g. by a restarted process.
+
+Examples:
+
+    ./manage.py lms requeue_feedback_exports
+"""
+
+from django.core.management.base import BaseCommand
+
+from feedback.exports import requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    """
+    Requeue the stale FeedbackExportJob rows.
+    """
+
+    help = "Queue again the feedback exports left pending or running without progress."
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        self.stdout.write(
+            self.style.SUCCESS("Requeued {} feedback exports.".format(len(requeued)))
+        )
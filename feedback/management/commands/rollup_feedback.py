@@ -0,0 +1,34 @@
+"""
+Update the daily feedback rollups with the feedback changed since the
+last run.
+
+Examples:
+
+    ./manage.py lms rollup_feedback
+    ./manage.py lms rollup_feedback --full
+"""
+
+from django.core.management.base import BaseCommand
+
+from feedback.rollups import update_rollups
+
+
+class Command(BaseCommand):
+    """
+    Incrementally update the FeedbackDailyRollup table.
+    """
+
+    help = "Update the daily feedback rollups with the feedback changed since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute the rollups of all the feedback.",
+        )
+
+    def handle(self, *args, **options):
+        updated = update_rollups(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS("Updated {} rollup buckets.".format(updated))
+        )
@@ -0,0 +1,90 @@
+"""
+Share the feedback of a course with other course versions.
+
+Example:
+
+    ./manage.py lms share_feedback course-v1:edX+Demo+V1 course-v1:edX+Demo+V2 course-v1:edX+Demo+V3
+"""
+
+from django.core.management.base import BaseCommand
+
+from feedback.management.utils import parse_course_key
+from feedback.models import Feedback, ShareFeedbackWith
+
+
+class Command(BaseCommand):
+    """
+    Share every approved feedback of a source course with target courses.
+    """
+
+    help = "Share the feedback of a course with other course versions, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("source_course", help="Course key the feedback comes from.")
+        parser.add_argument(
+            "target_courses",
+            nargs="+",
+            help="Course keys the feedback is shared with.",
+        )
+        parser.add_argument(
+            "--include-unapproved",
+            action="store_true",
+            help="Also share feedback not approved for display.",
+        )
+        parser.add_argument(
+            "--consented-only",
+            action="store_true",
+            help="Only share feedback with consent to share.",
+        )
+        parser.add_argument(
+            "--block-id",
+            help="Only share feedback of this feedback block.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how much feedback would be shared.",
+        )
+
+    def handle(self, *args, **options):
+        source_course_key = parse_course_key(options["source_course"])
+        target_course_keys = [
+            parse_course_key(course_id) for course_id in options["target_courses"]
+        ]
+
+        queryset = Feedback.objects.filter(course_key=source_course_key)
+        if not options["include_unapproved"]:
+            queryset = queryset.filter(is_approved=True)
+        if options["consented_only"]:
+            queryset = queryset.filter(consent_to_share=True)
+        if options["block_id"]:
+            queryset = queryset.filter(block_id=options["block_id"])
+
+        total = queryset.count()
+        already_shared = ShareFeedbackWith.objects.filter(
+            feedback__in=queryset, course_key__in=target_course_keys
+        ).count()
+        self.stdout.write(
+            "{total} feedback entries to share with {courses} courses "
+            "({shared} shares already exist).".format(
+                total=total, courses=len(target_course_keys), shared=already_shared
+            )
+        )
+        if options["dry_run"] or not total:
+            return
+
+        def progress(processed):
+            self.stdout.write(
+                "Shared {processed}/{total} feedback entries.".format(
+                    processed=processed, total=total
+                )
+            )
+
+        ShareFeedbackWith.bulk_share(
+            queryset,
+            target_course_keys,
+            batch_size=options["batch_size"],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS("Done."))
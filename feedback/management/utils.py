@@ -0,0 +1,15 @@
+"""
+Helpers shared by the management commands of the feedback app.
+"""
+
+from django.core.management.base import CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+
+def parse_course_key(course_id):
+    """Parse a course key, failing with a CommandError when invalid."""
+    try:
+        return CourseKey.from_string(course_id)
+    except InvalidKeyError as error:
+        raise CommandError("Invalid course key: {}".format(course_id)) from error
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedbackCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("value", models.CharField(max_length=255)),
+                ("modified", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Feedback Job Checkpoint",
+                "verbose_name_plural": "Feedback Job Checkpoints",
+            },
+        ),
+        migrations.AlterField(
+            model_name="feedback",
+            name="rating",
+            field=models.IntegerField(
+                blank=True, default=None, null=True, verbose_name="Rating"
+            ),
+        ),
+    ]
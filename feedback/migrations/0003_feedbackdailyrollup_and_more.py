@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:09
+
+from django.db import migrations, models
+import opaque_keys.edx.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0002_feedbackcheckpoint_alter_feedback_rating"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedbackDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "course_key",
+                    opaque_keys.edx.django.models.CourseKeyField(max_length=255),
+                ),
+                ("block_id", models.CharField(max_length=255)),
+                ("day", models.DateField()),
+                ("rating_0", models.PositiveIntegerField(default=0)),
+                ("rating_1", models.PositiveIntegerField(default=0)),
+                ("rating_2", models.PositiveIntegerField(default=0)),
+                ("rating_3", models.PositiveIntegerField(default=0)),
+                ("rating_4", models.PositiveIntegerField(default=0)),
+                ("total_count", models.PositiveIntegerField(default=0)),
+                ("comment_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Feedback Daily Rollup",
+                "verbose_name_plural": "Feedback Daily Rollups",
+                "indexes": [
+                    models.Index(
+                        fields=["course_key", "day"],
+                        name="feedback_fe_course__9f8aab_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="feedbackdailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("course_key", "block_id", "day"),
+                name="unique_rollup_course_block_day",
+            ),
+        ),
+    ]
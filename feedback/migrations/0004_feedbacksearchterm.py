@@ -0,0 +1,79 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:12
+
+import django.db.models.deletion
+import opaque_keys.edx.django.models
+from django.db import migrations, models
+
+
+def create_fulltext_index(apps, schema_editor):  # pylint: disable=unused-argument
+    """
+    Create a FULLTEXT index on the feedback text, on MySQL only. Other
+    databases use the FeedbackSearchTerm table instead.
+    """
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute(
+            "CREATE FULLTEXT INDEX feedback_feedback_text_fulltext "
+            "ON feedback_feedback (feedback)"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):  # pylint: disable=unused-argument
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute(
+            "DROP INDEX feedback_feedback_text_fulltext ON feedback_feedback"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0003_feedbackdailyrollup_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedbackSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "course_key",
+                    opaque_keys.edx.django.models.CourseKeyField(max_length=255),
+                ),
+                ("block_id", models.CharField(max_length=255)),
+                ("term", models.CharField(max_length=64)),
+                (
+                    "feedback",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="feedback.feedback",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Feedback Search Term",
+                "verbose_name_plural": "Feedback Search Terms",
+                "indexes": [
+                    models.Index(
+                        fields=["course_key", "term"],
+                        name="feedback_fe_course__81b17f_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="feedbacksearchterm",
+            constraint=models.UniqueConstraint(
+                fields=("feedback", "term"), name="unique_feedback_search_term"
+            ),
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
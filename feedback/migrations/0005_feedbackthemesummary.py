@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:13
+
+from django.db import migrations, models
+import opaque_keys.edx.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0004_feedbacksearchterm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedbackThemeSummary",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "course_key",
+                    opaque_keys.edx.django.models.CourseKeyField(
+                        max_length=255, unique=True
+                    ),
+                ),
+                ("last_id", models.PositiveIntegerField(default=0)),
+                ("watermark", models.DateTimeField()),
+                ("data", models.JSONField(default=dict)),
+            ],
+            options={
+                "verbose_name": "Feedback Theme Summary",
+                "verbose_name_plural": "Feedback Theme Summaries",
+            },
+        ),
+    ]
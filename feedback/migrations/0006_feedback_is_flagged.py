@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0005_feedbackthemesummary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feedback",
+            name="is_flagged",
+            field=models.BooleanField(
+                default=False,
+                help_text="Set when the feedback contains a term of the blocklist.",
+                verbose_name="Flagged for Moderation",
+            ),
+        ),
+    ]
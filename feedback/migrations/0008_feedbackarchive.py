@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import opaque_keys.edx.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("feedback", "0007_feedbackexportjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedbackArchive",
+            fields=[
+                ("id", models.IntegerField(primary_key=True, serialize=False)),
+                (
+                    "course_key",
+                    opaque_keys.edx.django.models.CourseKeyField(
+                        db_index=True, max_length=255
+                    ),
+                ),
+                ("block_id", models.CharField(max_length=255)),
+                (
+                    "block_name",
+                    models.CharField(blank=True, max_length=1024, null=True),
+                ),
+                ("rating", models.IntegerField(blank=True, null=True)),
+                ("feedback", models.TextField(blank=True, null=True)),
+                ("consent_to_share", models.BooleanField(default=False)),
+                ("is_approved", models.BooleanField(default=False)),
+                ("shared_with", models.JSONField(blank=True, default=list)),
+                ("created", models.DateTimeField()),
+                ("modified", models.DateTimeField()),
+                ("archived", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Feedback",
+                "verbose_name_plural": "Archived Feedback",
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:02
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Length
+
+BLOCK_ID_MAX_LENGTH = 255
+
+
+def check_block_ids(apps, schema_editor):  # pylint: disable=unused-argument
+    """
+    Stop before block ids are shortened to BLOCK_ID_MAX_LENGTH characters.
+    """
+    Feedback = apps.get_model("feedback", "Feedback")
+    count = (
+        Feedback.objects.annotate(length=Length("block_id"))
+        .filter(length__gt=BLOCK_ID_MAX_LENGTH)
+        .count()
+    )
+    if count:
+        raise RuntimeError(
+            "{count} feedback entries have a block id longer than {max_length} "
+            "characters: fix or delete them before migrating.".format(
+                count=count, max_length=BLOCK_ID_MAX_LENGTH
+            )
+        )
+
+
+def merge_duplicates(apps, schema_editor):  # pylint: disable=unused-argument
+    """
+    Merge the entries of each learner and block into one.
+
+    The approved entry is kept, or else the consented one, or else the most
+    recently modified one, and the other entries are shared with the
+    courses they were shared with before being deleted.
+    """
+    Feedback = apps.get_model("feedback", "Feedback")
+    ShareFeedbackWith = apps.get_model("feedback", "ShareFeedbackWith")
+    duplicates = (
+        Feedback.objects.values("course_key", "user_id", "block_id")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for key in duplicates.iterator():
+        kept, *others = Feedback.objects.filter(
+            course_key=key["course_key"],
+            user_id=key["user_id"],
+            block_id=key["block_id"],
+        ).order_by("-is_approved", "-consent_to_share", "-modified", "-id")
+        other_ids = [feedback.id for feedback in others]
+        shared = set(
+            ShareFeedbackWith.objects.filter(feedback=kept).values_list(
+                "course_key", flat=True
+            )
+        )
+        for share in ShareFeedbackWith.objects.filter(
+            feedback_id__in=other_ids
+        ).order_by("id"):
+            if share.course_key not in shared:
+                shared.add(share.course_key)
+                share.feedback = kept
+                share.save(update_fields=["feedback"])
+        Feedback.objects.filter(id__in=other_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0008_feedbackarchive"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_block_ids, migrations.RunPython.noop),
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0009_merge_duplicate_feedback"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="feedback",
+            name="block_id",
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name="feedback",
+            constraint=models.UniqueConstraint(
+                fields=("course_key", "user", "block_id"),
+                name="unique_feedback_course_user_block",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0010_feedback_unique_course_user_block"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="feedback",
+            index=models.Index(
+                fields=["modified"], name="feedback_fe_modifie_4d62be_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:06
+
+from django.db import migrations, models
+import opaque_keys.edx.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0011_feedback_modified_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedbackThemeEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "course_key",
+                    opaque_keys.edx.django.models.CourseKeyField(
+                        db_index=True, max_length=255
+                    ),
+                ),
+                ("feedback_id", models.PositiveIntegerField(unique=True)),
+                ("rating", models.IntegerField(blank=True, default=None, null=True)),
+                ("digest", models.CharField(max_length=40)),
+                ("terms", models.JSONField(default=list)),
+            ],
+            options={
+                "verbose_name": "Feedback Theme Entry",
+                "verbose_name_plural": "Feedback Theme Entries",
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0012_feedbackthemeentry"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="feedback",
+            index=models.Index(
+                fields=["course_key", "block_id"], name="feedback_fe_course__4aa3d3_idx"
+            ),
+        ),
+    ]
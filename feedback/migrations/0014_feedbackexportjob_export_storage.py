@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:10
+
+from django.db import migrations, models
+import feedback.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0013_feedback_course_block_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="feedbackexportjob",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                storage=feedback.models.export_storage,
+                upload_to="feedback-exports/",
+            ),
+        ),
+    ]
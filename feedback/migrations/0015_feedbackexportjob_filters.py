@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:12
+
+from django.db import migrations, models
+
+
+def fail_unfinished_jobs(apps, schema_editor):  # pylint: disable=unused-argument
+    """
+    Fail the jobs that did not run yet, as their pickled query is dropped.
+    """
+    FeedbackExportJob = apps.get_model("feedback", "FeedbackExportJob")
+    FeedbackExportJob.objects.filter(status__in=["pending", "running"]).update(
+        status="failed", error="Interrupted by an upgrade, please export again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0014_feedbackexportjob_export_storage"),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_unfinished_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="feedbackexportjob",
+            name="query",
+        ),
+        migrations.AddField(
+            model_name="feedbackexportjob",
+            name="filters",
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0015_feedbackexportjob_filters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="feedbackarchive",
+            index=models.Index(
+                fields=["modified"], name="feedback_fe_modifie_8b3f43_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sharefeedbackwith",
+            index=models.Index(
+                fields=["modified"], name="feedback_sh_modifie_01c3b3_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0016_modified_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="feedback",
+            index=models.Index(
+                fields=["created"], name="feedback_fe_created_9ae4b7_idx"
+            ),
+        ),
+    ]
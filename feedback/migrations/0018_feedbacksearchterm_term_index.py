@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0017_feedback_created_index"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="feedbacksearchterm",
+            name="block_id",
+        ),
+        migrations.AddIndex(
+            model_name="feedbacksearchterm",
+            index=models.Index(fields=["term"], name="feedback_fe_term_76dacb_idx"),
+        ),
+    ]
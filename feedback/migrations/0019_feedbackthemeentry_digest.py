@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0018_feedbacksearchterm_term_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="feedbackthemeentry",
+            name="digest",
+            field=models.CharField(max_length=64),
+        ),
+    ]
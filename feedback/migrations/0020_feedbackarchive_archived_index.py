@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0019_feedbackthemeentry_digest"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="feedbackarchive",
+            name="feedback_fe_modifie_8b3f43_idx",
+        ),
+        migrations.AddIndex(
+            model_name="feedbackarchive",
+            index=models.Index(
+                fields=["archived"], name="feedback_fe_archive_d4bc86_idx"
+            ),
+        ),
+    ]
@@ -13,12 +13,17 @@ file and check it in at the same time as your model changes. To do that,
 
 import logging
 from django.db import models
+from django.dispatch import Signal
+from model_utils import FieldTracker
 from model_utils.models import TimeStampedModel
 from django.contrib.auth.models import User
 from opaque_keys.edx.django.models import CourseKeyField
 
 log = logging.getLogger(__name__)
 
+# Sent by ShareFeedbackWith.bulk_share with the `course_keys` shared with.
+feedback_bulk_shared = Signal()
+
 
 class Feedback(TimeStampedModel):
     """
@@ -35,10 +40,14 @@ class Feedback(TimeStampedModel):
         db_index=True,
         on_delete=models.CASCADE,
     )
+    # Usage keys fit in 255 characters, which keeps the unique index below
+    # within the key size limit of MySQL.
     block_id = models.CharField(
-        max_length=1024,
+        max_length=255,
+    )
+    rating = models.IntegerField(
+        verbose_name="Rating", null=True, blank=True, default=None
     )
-    rating = models.IntegerField(verbose_name="Rating", default=0)
     block_name = models.CharField(max_length=1024, null=True, blank=True)
     feedback = models.TextField(verbose_name="User Feedback", null=True, blank=True)
     consent_to_share = models.BooleanField(
@@ -51,6 +60,17 @@ class Feedback(TimeStampedModel):
         help_text="Check this box to approve this feedback for public display on the course page.",
         default=False,
     )
+    is_flagged = models.BooleanField(
+        verbose_name="Flagged for Moderation",
+        help_text="Set when the feedback contains a term of the blocklist.",
+        default=False,
+    )
+
+    # Tracks the fields shown in public testimonials, so that cached
+    # responses (and the search index) are only updated when they change.
+    tracker = FieldTracker(
+        fields=["is_approved", "consent_to_share", "feedback", "rating", "block_name"]
+    )
 
     def __str__(self):
         return "{}-{}".format(str(self.course_key), self.user.username)
@@ -64,6 +84,20 @@ class Feedback(TimeStampedModel):
         verbose_name_plural = "Course Feedback"
         indexes = [
             models.Index(fields=["course_key", "is_approved", "consent_to_share"]),
+            # Read by the instructor dashboard.
+            models.Index(fields=["course_key", "block_id"]),
+            # Read by the incremental rollups and exports.
+            models.Index(fields=["modified"]),
+            # Read by the archival of old feedback.
+            models.Index(fields=["created"]),
+        ]
+        constraints = [
+            # One entry per learner and block, also when the block and the
+            # backfill create it at once.
+            models.UniqueConstraint(
+                fields=["course_key", "user", "block_id"],
+                name="unique_feedback_course_user_block",
+            ),
         ]
 
     @classmethod
@@ -76,27 +110,52 @@ class Feedback(TimeStampedModel):
         rating,
         feedback_message,
         consent_to_share,
+        is_flagged=None,
     ):
         """
         Update user feedback record
+
+        Only the fields that changed are written, and nothing is written
+        when the submission does not change the record.
         """
-        try:
-            feedback, _ = cls.objects.get_or_create(
-                course_key=course_key, user_id=user_id, block_id=block_id
-            )
-            if rating is not None:
-                feedback.rating = rating
-            if feedback_message is not None:
-                feedback.feedback = feedback_message
-            feedback.block_name = block_name
-            feedback.consent_to_share = consent_to_share
-            feedback.save()
-        except Exception as e:
-            log.info(
-                "Failed to save course feedback for {course_key} by {user_id}, Error: {error}".format(
-                    course_key=course_key, user_id=user_id, error=str(e)
+        # pylint: disable-next=import-outside-toplevel
+        from feedback.instrumentation import timer
+
+        with timer("db.create_or_update"):
+            try:
+                values = {
+                    "block_name": block_name,
+                    "consent_to_share": consent_to_share,
+                }
+                if rating is not None:
+                    values["rating"] = rating
+                if feedback_message is not None:
+                    values["feedback"] = feedback_message
+                if is_flagged is not None:
+                    values["is_flagged"] = is_flagged
+                feedback, created = cls.objects.get_or_create(
+                    course_key=course_key,
+                    user_id=user_id,
+                    block_id=block_id,
+                    defaults=values,
+                )
+                if created:
+                    return
+                changed = [
+                    field
+                    for field, value in values.items()
+                    if getattr(feedback, field) != value
+                ]
+                if changed:
+                    for field in changed:
+                        setattr(feedback, field, values[field])
+                    feedback.save(update_fields=changed + ["modified"])
+            except Exception as e:
+                log.info(
+                    "Failed to save course feedback for {course_key} by {user_id}, Error: {error}".format(
+                        course_key=course_key, user_id=user_id, error=str(e)
+                    )
                 )
-            )
 
 
 class ShareFeedbackWith(TimeStampedModel):
@@ -132,4 +191,316 @@ class ShareFeedbackWith(TimeStampedModel):
         ]
         indexes = [
             models.Index(fields=["course_key"]),
+            # Read by the incremental exports.
+            models.Index(fields=["modified"]),
+        ]
+
+    @classmethod
+    def bulk_share(cls, feedback_queryset, course_keys, batch_size=1000, progress=None):
+        """
+        Share every feedback of a queryset with other course versions.
+
+        Feedback is read in primary key order, `batch_size` entries at a
+        time, and shared with all the `course_keys` at once. Feedback
+        already shared with a course is skipped by the database thanks to
+        the `unique_feedback_course_key` constraint, and feedback is never
+        shared with its own course.
+
+        `progress`, when given, is called after each batch with the number
+        of feedback entries processed so far.
+
+        Returns the number of feedback entries processed.
+        """
+        course_keys = list(course_keys)
+        processed = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                feedback_queryset.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "course_key")[:batch_size]
+            )
+            if not batch:
+                break
+            cls.objects.bulk_create(
+                [
+                    cls(feedback_id=feedback_id, course_key=course_key)
+                    for feedback_id, source_course_key in batch
+                    for course_key in course_keys
+                    if course_key != source_course_key
+                ],
+                ignore_conflicts=True,
+            )
+            processed += len(batch)
+            last_pk = batch[-1][0]
+            if progress:
+                progress(processed)
+
+        # bulk_create() doesn't send signals, so the cached testimonials of
+        # the target courses are invalidated by the receivers of this one.
+        feedback_bulk_shared.send(sender=cls, course_keys=course_keys)
+        return processed
+
+
+class FeedbackCheckpoint(models.Model):
+    """
+    Model to store the progress of long running feedback jobs.
+
+    Each job stores its position (a primary key, a timestamp, ...) under a
+    unique name, so that it can resume after an interruption or only process
+    what changed since its previous run.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    value = models.CharField(max_length=255)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return "{}={}".format(self.name, self.value)
+
+    class Meta:
+        app_label = "feedback"
+        verbose_name = "Feedback Job Checkpoint"
+        verbose_name_plural = "Feedback Job Checkpoints"
+
+    @classmethod
+    def get_value(cls, name, default=None):
+        """
+        Return the value stored for a job, or `default` if it never ran.
+        """
+        value = cls.objects.filter(name=name).values_list("value", flat=True).first()
+        return default if value is None else value
+
+    @classmethod
+    def set_value(cls, name, value):
+        """
+        Store the value of a job.
+        """
+        cls.objects.update_or_create(name=name, defaults={"value": str(value)})
+
+    @classmethod
+    def reset(cls, prefix):
+        """
+        Forget the values of all the jobs whose name starts with `prefix`.
+        """
+        cls.objects.filter(name__startswith=prefix).delete()
+
+
+class FeedbackDailyRollup(models.Model):
+    """
+    Model for storing the daily totals of the feedback of a block.
+
+    Rows are computed from the Feedback table by the `rollup_feedback`
+    command, and let rating trends be charted without scanning the
+    Feedback rows. Feedback is counted on the day it was created.
+    """
+
+    course_key = CourseKeyField(max_length=255)
+    block_id = models.CharField(max_length=255)
+    day = models.DateField()
+    rating_0 = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    RATING_FIELDS = ["rating_0", "rating_1", "rating_2", "rating_3", "rating_4"]
+
+    def __str__(self):
+        return "{}-{}-{}".format(str(self.course_key), self.block_id, self.day)
+
+    class Meta:
+        app_label = "feedback"
+        verbose_name = "Feedback Daily Rollup"
+        verbose_name_plural = "Feedback Daily Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["course_key", "block_id", "day"],
+                name="unique_rollup_course_block_day",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["course_key", "day"]),
+        ]
+
+
+class FeedbackSearchTerm(models.Model):
+    """
+    Model for the inverted index of the freeform feedback text.
+
+    Each row links a term of a feedback text to the feedback, and is only
+    used on databases without a full-text search facility. The course key
+    is copied from the feedback, so that searches within a course only read
+    the index.
+    """
+
+    feedback = models.ForeignKey(
+        Feedback, related_name="search_terms", on_delete=models.CASCADE
+    )
+    course_key = CourseKeyField(max_length=255)
+    term = models.CharField(max_length=64)
+
+    def __str__(self):
+        return "{}-{}".format(self.term, self.feedback_id)
+
+    class Meta:
+        app_label = "feedback"
+        verbose_name = "Feedback Search Term"
+        verbose_name_plural = "Feedback Search Terms"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["feedback", "term"], name="unique_feedback_search_term"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["course_key", "term"]),
+            # Read by the searches across courses, e.g. in the admin.
+            models.Index(fields=["term"]),
+        ]
+
+
+class FeedbackThemeSummary(models.Model):
+    """
+    Model for caching the recurring themes of the feedback of a course.
+
+    Rows are computed by the `compute_feedback_themes` command. `last_id`
+    and `watermark` record which Feedback rows were processed, so that
+    later runs only read the new and modified ones.
+    """
+
+    course_key = CourseKeyField(max_length=255, unique=True)
+    last_id = models.PositiveIntegerField(default=0)
+    watermark = models.DateTimeField()
+    data = models.JSONField(default=dict)
+
+    def __str__(self):
+        return str(self.course_key)
+
+    class Meta:
+        app_label = "feedback"
+        verbose_name = "Feedback Theme Summary"
+        verbose_name_plural = "Feedback Theme Summaries"
+
+
+class FeedbackThemeEntry(models.Model):
+    """
+    Model recording how a Feedback row is counted in the theme summary of
+    its course.
+
+    `digest` identifies the counted text, and `terms` are its terms in
+    order, so that a row whose text or rating changed, or which was
+    deleted, can be subtracted from the counters. There is no foreign key,
+    so that entries outlive the deleted feedback until the next run.
+    """
+
+    course_key = CourseKeyField(max_length=255, db_index=True)
+    feedback_id = models.PositiveIntegerField(unique=True)
+    rating = models.IntegerField(null=True, blank=True, default=None)
+    digest = models.CharField(max_length=64)
+    terms = models.JSONField(default=list)
+
+    def __str__(self):
+        return "{}-{}".format(str(self.course_key), self.feedback_id)
+
+    class Meta:
+        app_label = "feedback"
+        verbose_name = "Feedback Theme Entry"
+        verbose_name_plural = "Feedback Theme Entries"
+
+
+def export_storage():
+    """
+    Return the storage of the feedback exports, see
+    `feedback.utils.get_export_storage`.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from feedback.utils import get_export_storage
+
+    return get_export_storage()
+
+
+class FeedbackExportJob(TimeStampedModel):
+    """
+    Model tracking an export of feedback run in the background.
+
+    The feedback exported is described by the `filters` of its queryset
+    (see `feedback.exports.get_job_queryset`), and the export is written to `file`, in the storage of the exports,
+    `rows_written` rows at a time.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+    CSV = "csv"
+    JSONL = "jsonl"
+    FORMAT_CHOICES = [(CSV, "CSV"), (JSONL, "JSON Lines")]
+
+    created_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    export_format = models.CharField(max_length=8, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    filters = models.JSONField(default=dict)
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    rows_written = models.PositiveIntegerField(default=0)
+    file = models.FileField(
+        upload_to="feedback-exports/", storage=export_storage, blank=True
+    )
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        return "Export {} ({})".format(self.pk, self.status)
+
+    class Meta:
+        app_label = "feedback"
+        verbose_name = "Feedback Export"
+        verbose_name_plural = "Feedback Exports"
+
+
+class FeedbackArchive(models.Model):
+    """
+    Model for the feedback moved out of the Feedback table by the
+    `archive_feedback` command.
+
+    Rows keep the id and the fields of the feedback, and the courses it was
+    shared with, but not its search index nor its moderation flag. Archived
+    feedback is still counted by the daily rollups and the reconciliation
+    of the vote counts, and exported on demand by `export_feedback`.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    course_key = CourseKeyField(db_index=True, max_length=255)
+    user = models.ForeignKey(
+        User, related_name="+", null=True, on_delete=models.SET_NULL
+    )
+    block_id = models.CharField(max_length=255)
+    block_name = models.CharField(max_length=1024, null=True, blank=True)
+    rating = models.IntegerField(null=True, blank=True)
+    feedback = models.TextField(null=True, blank=True)
+    consent_to_share = models.BooleanField(default=False)
+    is_approved = models.BooleanField(default=False)
+    shared_with = models.JSONField(default=list, blank=True)
+    created = models.DateTimeField()
+    modified = models.DateTimeField()
+    archived = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return "{}-{}".format(str(self.course_key), self.id)
+
+    class Meta:
+        app_label = "feedback"
+        verbose_name = "Archived Feedback"
+        verbose_name_plural = "Archived Feedback"
+        indexes = [
+            # Read by the incremental exports.
+            models.Index(fields=["archived"]),
         ]
@@ -0,0 +1,187 @@
+"""
+Screening of the freeform feedback against a blocklist.
+
+The blocklist is read from the `FEEDBACK_BLOCKLIST` setting (a list of
+terms) and from the `FEEDBACK_BLOCKLIST_FILE` setting (a text file with one
+term per line). All the terms are compiled into a single Aho–Corasick
+automaton, so that a text is checked in one pass whatever the number of
+terms. The automaton is built once per process, and rebuilt only when the
+setting or the file changes. The file is checked for changes at most every
+`FEEDBACK_BLOCKLIST_FILE_CHECK_INTERVAL` seconds.
+
+Terms are matched case insensitively and whatever the spacing between
+their words, on whole words only: "ass" matches "ass!" but not "class".
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+DEFAULT_FILE_CHECK_INTERVAL = 10
+
+_lock = threading.Lock()
+_matcher = None
+_matcher_source = None
+# (path, version, time checked) of the last check of the blocklist file.
+_file_check = (None, None, None)
+
+
+class BlocklistMatcher:
+    """
+    Aho–Corasick automaton matching a set of terms in a text.
+    """
+
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        for term in terms:
+            term = " ".join(term.lower().split())
+            if term:
+                self._add(term)
+        self._link()
+
+    def __len__(self):
+        return len(self.goto)
+
+    def _add(self, term):
+        """
+        Add the states spelling a term, and the term to the output of the
+        last one.
+        """
+        state = 0
+        for char in term:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            state = next_state
+        if term not in self.output[state]:
+            self.output[state] += (term,)
+
+    def _link(self):
+        """
+        Compute the failure links breadth first, and merge the terms ending
+        at the target of each link into the output of its state.
+        """
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    def find(self, text, first=False):
+        """
+        Return the distinct terms found in a text, in order of appearance.
+
+        With `first`, stop at the first match.
+        """
+        goto, fail, output = self.goto, self.fail, self.output
+        text = " ".join((text or "").lower().split())
+        found = {}
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term in output[state]:
+                start = end - len(term)
+                if _is_boundary(text, start - 1) and _is_boundary(text, end):
+                    found[term] = None
+                    if first:
+                        return list(found)
+        return list(found)
+
+
+def _is_boundary(text, index):
+    return (
+        index < 0
+        or index >= len(text)
+        or not (text[index].isalnum() or text[index] == "_")
+    )
+
+
+def _read_file(path):
+    with open(path, encoding="utf-8") as blocklist_file:
+        return [line for line in blocklist_file.read().splitlines() if line.strip()]
+
+
+def _get_file_version(path):
+    """
+    Return the modification time of the blocklist file, or None when it
+    cannot be read. The file is only checked again after the interval of
+    `FEEDBACK_BLOCKLIST_FILE_CHECK_INTERVAL` seconds.
+    """
+    global _file_check  # pylint: disable=global-statement
+
+    checked_path, version, checked = _file_check
+    now = time.monotonic()
+    interval = getattr(
+        settings, "FEEDBACK_BLOCKLIST_FILE_CHECK_INTERVAL", DEFAULT_FILE_CHECK_INTERVAL
+    )
+    if path == checked_path and checked is not None and now - checked < interval:
+        return version
+    try:
+        version = os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        version = None
+    _file_check = (path, version, now)
+    return version
+
+
+def get_matcher():
+    """
+    Return the matcher of the configured blocklist, or None when it is
+    empty.
+    """
+    global _matcher, _matcher_source  # pylint: disable=global-statement
+
+    terms = tuple(getattr(settings, "FEEDBACK_BLOCKLIST", None) or ())
+    path = getattr(settings, "FEEDBACK_BLOCKLIST_FILE", None)
+    file_version = _get_file_version(path)
+    source = (terms, path, file_version)
+    if source == _matcher_source:
+        return _matcher
+
+    with _lock:
+        if source != _matcher_source:
+            all_terms = list(terms)
+            if file_version is not None:
+                all_terms += _read_file(path)
+            elif path:
+                log.warning("The feedback blocklist file %s cannot be read.", path)
+            _matcher = BlocklistMatcher(all_terms) if all_terms else None
+            _matcher_source = source
+        return _matcher
+
+
+def find_blocked_terms(text):
+    """
+    Return the blocklisted terms found in a text.
+    """
+    matcher = get_matcher()
+    if matcher is None or not text:
+        return []
+    return matcher.find(text)
+
+
+def is_flagged(text):
+    """
+    Return whether a text contains a blocklisted term.
+    """
+    matcher = get_matcher()
+    return bool(matcher is not None and text and matcher.find(text, first=True))
@@ -0,0 +1,141 @@
+"""
+Opt-in profiling of the handlers of the feedback block and of the
+instructor dashboard.
+
+When `FEEDBACK_PROFILING` is on, the calls wrapped with `profiled` run
+under cProfile if they match:
+
+* `FEEDBACK_PROFILING_USERS`: ids of the users profiled (any when empty).
+* `FEEDBACK_PROFILING_COURSES`: ids of the courses profiled (any when
+  empty).
+* `FEEDBACK_PROFILING_SAMPLE_RATE`: share of the matching calls profiled
+  (1.0 by default).
+
+Each profiled call writes two files to `FEEDBACK_PROFILING_DIR`: the
+profile (`<name>.<time>.<id>.prof`, to open with pstats or snakeviz), and a
+summary of its `FEEDBACK_PROFILING_TOP` slowest functions, by cumulative
+time (`.txt`).
+
+When profiling is off, a wrapped call only reads the setting.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TOP = 30
+
+_state = threading.local()
+
+
+def get_profiling_dir():
+    return getattr(settings, "FEEDBACK_PROFILING_DIR", None) or os.path.join(
+        tempfile.gettempdir(), "feedback-profiles"
+    )
+
+
+def should_profile(user_id, course_id):
+    """
+    Return whether a call of a user in a course is profiled.
+    """
+    users = getattr(settings, "FEEDBACK_PROFILING_USERS", None)
+    if users and str(user_id) not in {str(user) for user in users}:
+        return False
+    courses = getattr(settings, "FEEDBACK_PROFILING_COURSES", None)
+    if courses and str(course_id) not in {str(course) for course in courses}:
+        return False
+    sample_rate = getattr(settings, "FEEDBACK_PROFILING_SAMPLE_RATE", 1.0)
+    return sample_rate >= 1 or random.random() < sample_rate
+
+
+def write_profile(name, profiler):
+    """
+    Write a profile and its summary, and return the path of the profile.
+    """
+    directory = get_profiling_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(
+        directory,
+        "{name}.{time}.{id}.prof".format(
+            name=name,
+            time=time.strftime("%Y%m%dT%H%M%S"),
+            id=uuid.uuid4().hex[:8],
+        ),
+    )
+    profiler.dump_stats(path)
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats("cumulative").print_stats(
+        getattr(settings, "FEEDBACK_PROFILING_TOP", DEFAULT_TOP)
+    )
+    with open(path[: -len(".prof")] + ".txt", "w", encoding="utf-8") as summary_file:
+        summary_file.write(summary.getvalue())
+
+    log.info("Profile of %s written to %s", name, path)
+    return path
+
+
+def xblock_target(block, *args, **kwargs):
+    """
+    Return the user and course of a call of an XBlock method.
+    """
+    return block.scope_ids.user_id, getattr(block, "course_id", None)
+
+
+def profiled(name, target=None):
+    """
+    Profile the calls of a function selected by the profiling settings.
+
+    Arguments:
+        name (str): name of the profile files.
+        target (callable): returns the user and course id of a call, from
+            its arguments.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not getattr(settings, "FEEDBACK_PROFILING", False):
+                return func(*args, **kwargs)
+            user_id, course_id = (
+                target(*args, **kwargs) if target is not None else (None, None)
+            )
+            # Nested calls are part of the profile of the outermost one.
+            if getattr(_state, "active", False) or not should_profile(
+                user_id, course_id
+            ):
+                return func(*args, **kwargs)
+
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is running.
+                return func(*args, **kwargs)
+            _state.active = True
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                _state.active = False
+                try:
+                    write_profile(name, profiler)
+                except OSError as error:
+                    log.warning("The profile of %s cannot be written: %s", name, error)
+
+        return wrapper
+
+    return decorator
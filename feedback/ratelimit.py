@@ -0,0 +1,92 @@
+"""
+Rate limiting of the feedback submissions.
+
+Each learner gets a token bucket per block, stored in the Django cache: the
+bucket holds up to `FEEDBACK_RATE_LIMIT_BURST` submissions and refills by
+`FEEDBACK_RATE_LIMIT_PER_MINUTE` submissions per minute. A submission
+consumes one token, and is rejected when the bucket is empty.
+
+Concurrent submissions of the same learner on the same block may both read
+the bucket before either updates it, so the limit is approximate; it is
+meant to stop runaway clients, not to count exactly.
+
+Retries of a submission carry the id of the original submission: the first
+request with an id claims it, atomically, with a cache `add`, and the
+others are ignored.
+"""
+
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CACHE_KEY_PREFIX = "feedback.ratelimit"
+SUBMISSION_KEY_PREFIX = "feedback.submission"
+DEFAULT_BURST = 10
+DEFAULT_PER_MINUTE = 20
+DEFAULT_SUBMISSION_ID_TIMEOUT = 60 * 60
+
+
+def _bucket_key(user_id, usage_id, prefix=CACHE_KEY_PREFIX):
+    # Usage ids can exceed the key length and characters allowed by
+    # memcached.
+    usage_hash = hashlib.md5(str(usage_id).encode("utf-8")).hexdigest()
+    return "{prefix}.{user_id}.{usage_hash}".format(
+        prefix=prefix, user_id=user_id, usage_hash=usage_hash
+    )
+
+
+def _submission_key(user_id, usage_id, submission_id):
+    submission_hash = hashlib.md5(str(submission_id).encode("utf-8")).hexdigest()
+    return "{}.{}".format(
+        _bucket_key(user_id, usage_id, prefix=SUBMISSION_KEY_PREFIX), submission_hash
+    )
+
+
+def claim_submission(user_id, usage_id, submission_id):
+    """
+    Claim the id of a submission of a learner on a block.
+
+    Returns False when the id was already claimed, i.e. for the retries of
+    a submission. Ids are kept `FEEDBACK_SUBMISSION_ID_TIMEOUT` seconds.
+    """
+    timeout = getattr(
+        settings, "FEEDBACK_SUBMISSION_ID_TIMEOUT", DEFAULT_SUBMISSION_ID_TIMEOUT
+    )
+    return cache.add(_submission_key(user_id, usage_id, submission_id), 1, timeout)
+
+
+def release_submission(user_id, usage_id, submission_id):
+    """
+    Release the id of a submission that failed, so that it can be retried.
+    """
+    cache.delete(_submission_key(user_id, usage_id, submission_id))
+
+
+def allow_submission(user_id, usage_id, now=None):
+    """
+    Consume a token of the bucket of a learner on a block.
+
+    Returns False when the bucket is empty. Set `FEEDBACK_RATE_LIMIT_BURST`
+    to 0 to disable the limit.
+    """
+    burst = getattr(settings, "FEEDBACK_RATE_LIMIT_BURST", DEFAULT_BURST)
+    per_minute = getattr(settings, "FEEDBACK_RATE_LIMIT_PER_MINUTE", DEFAULT_PER_MINUTE)
+    if not burst:
+        return True
+    rate = per_minute / 60
+    now = time.time() if now is None else now
+
+    key = _bucket_key(user_id, usage_id)
+    tokens, updated = cache.get(key) or (burst, now)
+    tokens = min(burst, tokens + max(now - updated, 0) * rate)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    # The bucket is full again, hence equivalent to a missing one, after
+    # this timeout.
+    timeout = math.ceil((burst - tokens) / rate) + 1 if rate else None
+    cache.set(key, (tokens, now), timeout)
+    return allowed
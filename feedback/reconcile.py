@@ -0,0 +1,169 @@
+"""
+Reconciliation of the stored vote aggregates with the Feedback table.
+
+The `vote_aggregate` field of the feedback blocks (stored in the
+user_state_summary table of the platform) and the ratings of the Feedback
+rows are maintained separately, and can diverge after races, failed writes
+or manual edits. This module recomputes the histograms of the blocks of a
+course from the Feedback table with a single GROUP BY query, and compares
+them with the stored aggregates.
+
+Run the `backfill_feedback` command first, so that the Feedback table holds
+the votes submitted before it existed.
+"""
+
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Count
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import UsageKey
+
+from feedback.aggregates import invalidate_aggregate
+from feedback.models import Feedback, FeedbackArchive
+from feedback.stats import DEFAULT_SCALE_LENGTH
+from feedback.utils import get_platform_model
+
+AGGREGATE_FIELD = "vote_aggregate"
+LOOKUP_CHUNK_SIZE = 500
+
+
+@dataclass
+class AggregateDrift:
+    """
+    A block whose stored aggregate differs from its Feedback rows.
+    """
+
+    course_key: str
+    block_id: str
+    stored: list
+    expected: list
+
+
+def get_user_state_summary_model():
+    """
+    Return the model storing the user_state_summary fields, which can be
+    replaced through the `FEEDBACK_USER_STATE_SUMMARY_MODEL` setting.
+    """
+    return get_platform_model(
+        "FEEDBACK_USER_STATE_SUMMARY_MODEL", "courseware.XModuleUserStateSummaryField"
+    )
+
+
+def list_courses():
+    """
+    Return the keys of the courses having Feedback rows.
+    """
+    return list(
+        Feedback.objects.order_by()
+        .values_list("course_key", flat=True)
+        .distinct()
+        .iterator()
+    )
+
+
+def compute_histograms(course_key, block_id=None):
+    """
+    Return the vote histogram of each block of a course, or of one of its
+    blocks, by block id, counting the archived feedback too.
+    """
+    histograms = defaultdict(lambda: [0] * DEFAULT_SCALE_LENGTH)
+    for model in (Feedback, FeedbackArchive):
+        queryset = model.objects.filter(course_key=course_key, rating__isnull=False)
+        if block_id is not None:
+            queryset = queryset.filter(block_id=block_id)
+        rows = (
+            queryset.values_list("block_id", "rating")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for row_block_id, rating, count in rows:
+            histogram = histograms[row_block_id]
+            if rating >= len(histogram):
+                histogram.extend([0] * (rating + 1 - len(histogram)))
+            histogram[rating] += count
+    return dict(histograms)
+
+
+def load_aggregates(block_ids):
+    """
+    Return the stored aggregate of the given blocks, by block id.
+    """
+    summary_model = get_user_state_summary_model()
+    usage_keys = {}
+    for block_id in block_ids:
+        try:
+            usage_keys[block_id] = UsageKey.from_string(block_id)
+        except InvalidKeyError:
+            continue
+
+    aggregates = {}
+    block_ids = list(usage_keys)
+    for start in range(0, len(block_ids), LOOKUP_CHUNK_SIZE):
+        end = start + LOOKUP_CHUNK_SIZE
+        chunk = [usage_keys[block_id] for block_id in block_ids[start:end]]
+        for usage_id, value in summary_model.objects.filter(
+            field_name=AGGREGATE_FIELD, usage_id__in=chunk
+        ).values_list("usage_id", "value"):
+            try:
+                aggregates[str(usage_id)] = json.loads(value)
+            except ValueError:
+                aggregates[str(usage_id)] = None
+    return aggregates
+
+
+def _pad(histogram, length):
+    return list(histogram) + [0] * (length - len(histogram))
+
+
+def find_drift(course_key):
+    """
+    Return the AggregateDrift of every block of a course.
+    """
+    histograms = compute_histograms(course_key)
+    aggregates = load_aggregates(histograms)
+
+    drifts = []
+    for block_id, expected in histograms.items():
+        stored = aggregates.get(block_id)
+        if not isinstance(stored, list):
+            stored = []
+        length = max(len(stored), len(expected))
+        if _pad(stored, length) != _pad(expected, length):
+            drifts.append(
+                AggregateDrift(
+                    course_key=str(course_key),
+                    block_id=block_id,
+                    stored=stored,
+                    expected=_pad(expected, length),
+                )
+            )
+    return drifts
+
+
+def repair(drift):
+    """
+    Replace the stored aggregate of a block with the recomputed one.
+
+    The aggregate row is locked while the histogram is recomputed and
+    saved, so that votes counted meanwhile aren't overwritten.
+    """
+    usage_id = UsageKey.from_string(drift.block_id)
+    with transaction.atomic():
+        summary, _ = (
+            get_user_state_summary_model()
+            .objects.select_for_update()
+            .get_or_create(
+                field_name=AGGREGATE_FIELD,
+                usage_id=usage_id,
+                defaults={"value": "null"},
+            )
+        )
+        histogram = compute_histograms(drift.course_key, drift.block_id).get(
+            drift.block_id, [0] * DEFAULT_SCALE_LENGTH
+        )
+        summary.value = json.dumps(_pad(histogram, len(drift.expected)))
+        summary.save(update_fields=["value"])
+    invalidate_aggregate(usage_id)
@@ -0,0 +1,236 @@
+"""
+Daily rollups of the feedback, for rating trends over time.
+
+`update_rollups` only reads the Feedback rows modified since its previous
+run (its watermark), finds the (course, block, day) buckets they belong to,
+and recomputes those buckets with one GROUP BY query per course. Archived
+feedback (FeedbackArchive) is still counted in its buckets, and the bucket
+of deleted feedback is recomputed when the deletion commits.
+`rating_time_series` then answers trend queries from the rollup table.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from feedback.models import (
+    Feedback,
+    FeedbackArchive,
+    FeedbackCheckpoint,
+    FeedbackDailyRollup,
+)
+
+log = logging.getLogger(__name__)
+
+WATERMARK = "rollup:daily"
+# Rows are re-read a bit before the watermark, so that rows committed by
+# transactions still running during the previous run are not missed.
+# Recomputing a bucket twice is harmless.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+PERIODS = {
+    "day": None,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+_state = threading.local()
+
+
+def get_buckets(queryset):
+    """
+    Return the (block, day) buckets of the rows of a queryset, by course.
+    """
+    buckets = defaultdict(set)
+    for course_key, block_id, day in (
+        queryset.annotate(day=TruncDate("created"))
+        .values_list("course_key", "block_id", "day")
+        .order_by()
+        .distinct()
+        .iterator()
+    ):
+        buckets[course_key].add((block_id, day))
+    return buckets
+
+
+def _changed_buckets(since, until):
+    """
+    Return the (block, day) buckets of the rows modified between `since`
+    and `until`, by course.
+    """
+    changed = Feedback.objects.filter(modified__lt=until)
+    if since is not None:
+        changed = changed.filter(modified__gte=since)
+    return get_buckets(changed)
+
+
+def _compute_buckets(course_key, buckets):
+    """
+    Recompute the given (block, day) buckets of a course, from the
+    Feedback rows and the archived ones.
+    """
+    fields = FeedbackDailyRollup.RATING_FIELDS + ["total_count", "comment_count"]
+    counts = {
+        field: Count("id", filter=Q(rating=index))
+        for index, field in enumerate(FeedbackDailyRollup.RATING_FIELDS)
+    }
+    totals = {}
+    for model in (Feedback, FeedbackArchive):
+        rows = (
+            model.objects.filter(
+                course_key=course_key,
+                block_id__in={block_id for block_id, _ in buckets},
+            )
+            .annotate(day=TruncDate("created"))
+            .filter(day__in={day for _, day in buckets})
+            .values("block_id", "day")
+            .annotate(
+                total_count=Count("id"),
+                comment_count=Count("id", filter=Q(feedback__gt="")),
+                **counts
+            )
+            .order_by()
+        )
+        for row in rows:
+            bucket = (row["block_id"], row["day"])
+            if bucket not in buckets:
+                continue
+            total = totals.setdefault(bucket, dict.fromkeys(fields, 0))
+            for field in fields:
+                total[field] += row[field]
+    return [
+        FeedbackDailyRollup(course_key=course_key, block_id=block_id, day=day, **total)
+        for (block_id, day), total in totals.items()
+    ]
+
+
+def refresh_buckets(course_key, buckets):
+    """
+    Recompute and store the given (block, day) buckets of a course, and
+    return the number of buckets stored. Buckets left without feedback are
+    deleted.
+    """
+    rollups = _compute_buckets(course_key, buckets)
+    FeedbackDailyRollup.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=["course_key", "block_id", "day"],
+        update_fields=FeedbackDailyRollup.RATING_FIELDS
+        + ["total_count", "comment_count"],
+    )
+    empty = set(buckets) - {(rollup.block_id, rollup.day) for rollup in rollups}
+    if empty:
+        condition = Q()
+        for block_id, day in empty:
+            condition |= Q(block_id=block_id, day=day)
+        FeedbackDailyRollup.objects.filter(condition, course_key=course_key).delete()
+    return len(rollups)
+
+
+def get_bucket(feedback):
+    """
+    Return the (block, day) bucket of a feedback, the day being truncated
+    in the current time zone like TruncDate.
+    """
+    created = feedback.created
+    if timezone.is_aware(created):
+        created = timezone.localtime(created)
+    return feedback.block_id, created.date()
+
+
+def schedule_refresh(feedback):
+    """
+    Recompute the bucket of a feedback once the current transaction
+    commits, unless refreshes are suspended.
+    """
+    if getattr(_state, "suspended", False):
+        return
+    course_key, bucket = feedback.course_key, get_bucket(feedback)
+    transaction.on_commit(lambda: refresh_buckets(course_key, {bucket}))
+
+
+@contextmanager
+def suspend_refresh():
+    """
+    Skip `schedule_refresh`, for callers recomputing the buckets of the
+    feedback they delete themselves.
+    """
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = False
+
+
+def update_rollups(full=False):
+    """
+    Update the daily rollups with the Feedback rows changed since the last
+    run, or with all of them when `full` is True.
+
+    Returns the number of buckets updated.
+    """
+    until = timezone.now()
+    since = None
+    if not full:
+        watermark = FeedbackCheckpoint.get_value(WATERMARK)
+        if watermark:
+            since = parse_datetime(watermark) - WATERMARK_OVERLAP
+
+    updated = 0
+    for course_key, buckets in _changed_buckets(since, until).items():
+        updated += refresh_buckets(course_key, buckets)
+
+    FeedbackCheckpoint.set_value(WATERMARK, until.isoformat())
+    log.info("Updated %d feedback rollup buckets.", updated)
+    return updated
+
+
+def rating_time_series(course_key, block_id=None, start=None, end=None, period="day"):
+    """
+    Return the rating counts of a course, or one of its blocks, over time.
+
+    Arguments:
+        course_key (CourseKey): the course.
+        block_id (str): only count the feedback of this block.
+        start (date): first day of the series, inclusive.
+        end (date): last day of the series, inclusive.
+        period (str): "day", "week" or "month".
+
+    Returns a list of dicts with the `period` start date, the `ratings`
+    counts by rating index, the `total_count` and the `comment_count`,
+    oldest first.
+    """
+    rollups = FeedbackDailyRollup.objects.filter(course_key=course_key)
+    if block_id is not None:
+        rollups = rollups.filter(block_id=block_id)
+    if start is not None:
+        rollups = rollups.filter(day__gte=start)
+    if end is not None:
+        rollups = rollups.filter(day__lte=end)
+
+    trunc = PERIODS[period]
+    rollups = rollups.annotate(period=trunc("day") if trunc else F("day"))
+    fields = FeedbackDailyRollup.RATING_FIELDS + ["total_count", "comment_count"]
+    rows = (
+        rollups.values("period")
+        .annotate(**{"sum_" + field: Sum(field) for field in fields})
+        .order_by("period")
+    )
+    return [
+        {
+            "period": row["period"],
+            "ratings": [
+                row["sum_" + field] for field in FeedbackDailyRollup.RATING_FIELDS
+            ],
+            "total_count": row["sum_total_count"],
+            "comment_count": row["sum_comment_count"],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,190 @@
+"""
+Search of the freeform feedback text.
+
+On MySQL, searches use the FULLTEXT index of the feedback text. On other
+databases, the terms of each feedback text are stored in the
+FeedbackSearchTerm table, an inverted index kept up to date whenever a
+feedback text changes, and searches only read that index.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BooleanField, Count, F, Func, Value
+
+from feedback.models import Feedback, FeedbackSearchTerm
+
+TERM_RE = re.compile(r"\w+")
+MAX_TERM_LENGTH = 64
+# The minimum word length of the MySQL full-text index (innodb_ft_min_token_size):
+# shorter terms would match nothing there.
+MIN_TERM_LENGTH = 3
+DEFAULT_LIMIT = 50
+STOP_WORDS = frozenset("""
+    a an and are as at be but by for from has have i in is it its me my of on
+    or so that the this to was we were with you your
+    """.split())
+
+
+class MatchAgainst(Func):  # pylint: disable=abstract-method
+    """
+    MySQL full-text boolean search on a column.
+
+    Only used as a filter: the operators of Combinable are not supported.
+    """
+
+    output_field = BooleanField()
+
+    def __init__(self, field, query):
+        super().__init__(F(field), Value(query))
+
+    def as_sql(
+        self, compiler, connection, **extra_context
+    ):  # pylint: disable=arguments-differ,redefined-outer-name
+        field_sql, field_params = compiler.compile(self.source_expressions[0])
+        query_sql, query_params = compiler.compile(self.source_expressions[1])
+        return (
+            "MATCH ({field}) AGAINST ({query} IN BOOLEAN MODE)".format(
+                field=field_sql, query=query_sql
+            ),
+            [*field_params, *query_params],
+        )
+
+
+def iter_terms(text):
+    """
+    Yield the terms of a text, in order, without the stop words.
+    """
+    for term in TERM_RE.findall((text or "").lower()):
+        if len(term) >= MIN_TERM_LENGTH and term not in STOP_WORDS:
+            yield term[:MAX_TERM_LENGTH]
+
+
+def tokenize(text):
+    """
+    Return the distinct search terms of a text, in order.
+    """
+    return list(dict.fromkeys(iter_terms(text)))
+
+
+def uses_fulltext():
+    """
+    Return whether searches use the full-text index of the database.
+
+    Set `FEEDBACK_SEARCH_USE_FULLTEXT` to False to always use the
+    FeedbackSearchTerm table.
+    """
+    return connection.vendor == "mysql" and getattr(
+        settings, "FEEDBACK_SEARCH_USE_FULLTEXT", True
+    )
+
+
+def index_feedback(feedback):
+    """
+    Replace the indexed terms of a feedback with the terms of its text.
+    """
+    if uses_fulltext():
+        return
+    with transaction.atomic():
+        FeedbackSearchTerm.objects.filter(feedback_id=feedback.pk).delete()
+        FeedbackSearchTerm.objects.bulk_create(
+            [
+                FeedbackSearchTerm(
+                    feedback_id=feedback.pk,
+                    course_key=feedback.course_key,
+                    term=term,
+                )
+                for term in tokenize(feedback.feedback)
+            ]
+        )
+
+
+def rebuild_index(queryset, batch_size=1000, progress=None):
+    """
+    Rebuild the indexed terms of every feedback of a queryset, in batches.
+
+    Returns the number of feedback entries indexed.
+    """
+    if uses_fulltext():
+        return 0
+    indexed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", "course_key", "feedback")[:batch_size]
+        )
+        if not batch:
+            break
+        with transaction.atomic():
+            FeedbackSearchTerm.objects.filter(feedback__in=batch).delete()
+            FeedbackSearchTerm.objects.bulk_create(
+                [
+                    FeedbackSearchTerm(
+                        feedback_id=feedback.pk,
+                        course_key=feedback.course_key,
+                        term=term,
+                    )
+                    for feedback in batch
+                    for term in tokenize(feedback.feedback)
+                ]
+            )
+        indexed += len(batch)
+        last_pk = batch[-1].pk
+        if progress:
+            progress(indexed)
+    return indexed
+
+
+def search_queryset(queryset, query, course_key=None):
+    """
+    Filter feedback on its text containing every term of a query.
+
+    Arguments:
+        queryset (QuerySet): the feedback to search.
+        query (str): the searched text, e.g. "quiz too hard".
+        course_key (CourseKey): the course of the feedback, if known, which
+            narrows the lookup in the FeedbackSearchTerm table.
+
+    Returns None when the query has no search term.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+
+    if uses_fulltext():
+        return queryset.filter(
+            MatchAgainst("feedback", " ".join("+" + term for term in terms))
+        )
+
+    matches = FeedbackSearchTerm.objects.filter(term__in=terms)
+    if course_key is not None:
+        matches = matches.filter(course_key=course_key)
+    return queryset.filter(
+        id__in=matches.values("feedback_id")
+        .annotate(matched=Count("term"))
+        .filter(matched=len(terms))
+        .values("feedback_id")
+    )
+
+
+def search_feedback(course_key, query, block_id=None, limit=DEFAULT_LIMIT):
+    """
+    Return the feedback of a course whose text contains every term of the
+    query, newest first.
+
+    Arguments:
+        course_key (CourseKey): the course to search in.
+        query (str): the searched text, e.g. "quiz too hard".
+        block_id (str): only search the feedback of this block.
+        limit (int): maximum number of results.
+    """
+    feedback = Feedback.objects.filter(course_key=course_key)
+    if block_id is not None:
+        feedback = feedback.filter(block_id=block_id)
+    feedback = search_queryset(feedback, query, course_key)
+    if feedback is None:
+        return []
+    return list(feedback.order_by("-id")[:limit])
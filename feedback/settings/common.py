@@ -19,3 +19,65 @@ def plugin_settings(settings):
     More info: https://github.com/openedx/edx-platform/blob/master/openedx/core/djangoapps/plugins/README.rst
     """
     settings.MAKO_TEMPLATE_DIRS_BASE.append(ROOT_DIRECTORY / "templates")
+    # Seconds a page of course testimonials is kept in the cache. Pages are
+    # invalidated whenever an approval changes, so this can be long.
+    settings.FEEDBACK_TESTIMONIALS_CACHE_TIMEOUT = 60 * 60
+    # Database alias testimonials are read from. Defaults to `read_replica`
+    # when configured, otherwise to `default`.
+    settings.FEEDBACK_TESTIMONIALS_DB_ALIAS = None
+    # Terms flagging a feedback for moderation, matched on whole words, and
+    # an optional text file with one more term per line.
+    settings.FEEDBACK_BLOCKLIST = []
+    settings.FEEDBACK_BLOCKLIST_FILE = None
+    # Seconds between two checks of the blocklist file for changes.
+    settings.FEEDBACK_BLOCKLIST_FILE_CHECK_INTERVAL = 10
+    # Content of the freeform_provided tracking events: "full", "truncated"
+    # (to FEEDBACK_FREEFORM_EVENT_MAX_LENGTH characters) or "digest".
+    settings.FEEDBACK_FREEFORM_EVENT_MODE = "full"
+    settings.FEEDBACK_FREEFORM_EVENT_MAX_LENGTH = 200
+    # Submissions allowed in a burst, per learner and block, and refilled
+    # per minute. Set the burst to 0 to disable the limit.
+    settings.FEEDBACK_RATE_LIMIT_BURST = 10
+    settings.FEEDBACK_RATE_LIMIT_PER_MINUTE = 20
+    # Seconds the ids of the submissions are kept to ignore their retries.
+    settings.FEEDBACK_SUBMISSION_ID_TIMEOUT = 60 * 60
+    # Seconds the vote aggregate of a block is cached, i.e. the longest time
+    # learners can see outdated counts. Set to 0 to disable the cache.
+    settings.FEEDBACK_AGGREGATE_CACHE_TIMEOUT = 30
+    # Where the timings and counters of the plugin are sent: None (disabled),
+    # "logging", "statsd" (to FEEDBACK_STATSD_HOST:FEEDBACK_STATSD_PORT over
+    # UDP), "memory" or the dotted path of a sink class.
+    settings.FEEDBACK_INSTRUMENTATION = None
+    settings.FEEDBACK_INSTRUMENTATION_PREFIX = "feedback"
+    settings.FEEDBACK_STATSD_HOST = "localhost"
+    settings.FEEDBACK_STATSD_PORT = 8125
+    # Profile the handlers and the instructor dashboard with cProfile, for
+    # the given users and courses (all when empty) and share of the calls.
+    # Profiles and their summaries are written to FEEDBACK_PROFILING_DIR.
+    settings.FEEDBACK_PROFILING = False
+    settings.FEEDBACK_PROFILING_USERS = []
+    settings.FEEDBACK_PROFILING_COURSES = []
+    settings.FEEDBACK_PROFILING_SAMPLE_RATE = 1.0
+    settings.FEEDBACK_PROFILING_DIR = None
+    settings.FEEDBACK_PROFILING_TOP = 30
+    # Where the exports started from the admin run: "thread" (a pool of
+    # FEEDBACK_EXPORT_WORKERS threads of the web process) or "celery". Their
+    # files are saved to an instance of FEEDBACK_EXPORT_STORAGE (a dotted
+    # path, which must not be a public storage), or to the
+    # FEEDBACK_EXPORT_DIR directory ("feedback-exports" in the temporary
+    # directory when None), which must be shared with the Celery workers.
+    settings.FEEDBACK_EXPORT_BACKEND = "thread"
+    settings.FEEDBACK_EXPORT_WORKERS = 2
+    settings.FEEDBACK_EXPORT_STORAGE = None
+    settings.FEEDBACK_EXPORT_DIR = None
+    # Seconds after which a pending or running export without progress is
+    # queued again, e.g. when the process running it restarted. Running
+    # exports send a heartbeat a few times within this timeout.
+    settings.FEEDBACK_EXPORT_STALE_TIMEOUT = 60 * 60
+    # Retention policy of the archive_feedback command: feedback of ended
+    # courses created more than FEEDBACK_ARCHIVE_AFTER_YEARS years ago, or
+    # of courses ended more than FEEDBACK_ARCHIVE_ENDED_COURSES_DAYS days
+    # ago, is moved to the FeedbackArchive table, except the testimonials.
+    # None disables a criterion.
+    settings.FEEDBACK_ARCHIVE_AFTER_YEARS = 3
+    settings.FEEDBACK_ARCHIVE_ENDED_COURSES_DAYS = 365
@@ -14,7 +14,11 @@ INSTALLED_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
+    "django.contrib.messages",
+    "django.contrib.sessions",
     "feedback",
+    # Stand-ins for the edx-platform tables.
+    "feedbacktests",
     "workbench",
 ]
 
@@ -0,0 +1,91 @@
+"""
+Signal handlers for the feedback app.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from feedback.models import Feedback, ShareFeedbackWith, feedback_bulk_shared
+from feedback.rollups import schedule_refresh
+from feedback.search import index_feedback
+from feedback.testimonials import (
+    invalidate_course_testimonials,
+    invalidate_feedback_testimonials,
+)
+
+
+@receiver(post_save, sender=Feedback)
+def invalidate_testimonials_on_save(
+    sender, instance, created, **kwargs
+):  # pylint: disable=unused-argument
+    """
+    Invalidate cached testimonials when an approved feedback changes, or
+    when the approval status of a feedback changes.
+    """
+    if created:
+        changed = instance.is_approved
+    else:
+        changed = instance.tracker.has_changed("is_approved") or (
+            instance.is_approved and bool(instance.tracker.changed())
+        )
+    if changed:
+        invalidate_feedback_testimonials(instance)
+
+
+@receiver(post_delete, sender=Feedback)
+def invalidate_testimonials_on_delete(
+    sender, instance, **kwargs
+):  # pylint: disable=unused-argument
+    """
+    Invalidate cached testimonials when an approved feedback is deleted.
+
+    Shared course rows are deleted in cascade, and invalidate their own
+    course.
+    """
+    if instance.is_approved:
+        invalidate_course_testimonials(instance.course_key)
+
+
+@receiver(post_save, sender=ShareFeedbackWith)
+@receiver(post_delete, sender=ShareFeedbackWith)
+def invalidate_testimonials_on_share(
+    sender, instance, **kwargs
+):  # pylint: disable=unused-argument
+    """
+    Invalidate cached testimonials of a course when feedback is shared
+    with it or stops being shared with it.
+    """
+    invalidate_course_testimonials(instance.course_key)
+
+
+@receiver(feedback_bulk_shared)
+def invalidate_testimonials_on_bulk_share(
+    sender, course_keys, **kwargs
+):  # pylint: disable=unused-argument
+    """
+    Invalidate cached testimonials of the courses feedback was shared with
+    in bulk.
+    """
+    invalidate_course_testimonials(*course_keys)
+
+
+@receiver(post_save, sender=Feedback)
+def index_feedback_on_save(
+    sender, instance, created, **kwargs
+):  # pylint: disable=unused-argument
+    """
+    Update the search index when a feedback text changes.
+    """
+    if created or instance.tracker.has_changed("feedback"):
+        index_feedback(instance)
+
+
+@receiver(post_delete, sender=Feedback)
+def refresh_rollup_on_delete(
+    sender, instance, **kwargs
+):  # pylint: disable=unused-argument
+    """
+    Recompute the daily rollup of deleted feedback, which the incremental
+    rollups never read again.
+    """
+    schedule_refresh(instance)
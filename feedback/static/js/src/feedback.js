@@ -29,37 +29,169 @@ function FeedbackXBlock(runtime, element) {
     }
   }
 
-  function submit_feedback(freeform, vote) {
-    var feedback = {};
-    if (freeform) {
-      feedback['freeform'] = freeform;
-    }
-    if (vote !== -1) {
-      feedback['vote'] = vote;
+  function getConsentToShare() {
+    return $('.consent_to_share input', element).is(':checked');
+  }
+
+  // Radio changes are only submitted after this delay without other
+  // changes, or with the text when Submit is clicked.
+  var VOTE_DEBOUNCE_MS = 2000;
+  var MAX_RETRIES = 2;
+  var pendingVote = null;
+
+  function newSubmissionId() {
+    if (window.crypto && window.crypto.randomUUID) {
+      return window.crypto.randomUUID();
     }
+    return Date.now().toString(36) + Math.random().toString(36).slice(2);
+  }
 
-    Logger.log('edx.feedbackxblock.submitted', feedback);
+  function post(feedback, retries) {
     $.ajax({
       type: 'POST',
-      url: runtime.handlerUrl(element, 'feedback'),
+      url: runtime.handlerUrl(element, 'submit'),
       data: JSON.stringify(feedback),
       success: function (data) {
         $('.feedback_thank_you', element).text(data.response || '');
         updateVoteCount(data);
+      },
+      error: function (xhr) {
+        // Retries reuse the submission id, so the server ignores the
+        // submissions it already received.
+        if (retries > 0 && (xhr.status === 0 || xhr.status >= 500)) {
+          setTimeout(function () {
+            post(feedback, retries - 1);
+          }, 1000);
+        }
       }
     });
   }
 
+  function getCookie(name) {
+    var match = document.cookie.match(new RegExp('(?:^|; )' + name + '=([^;]*)'));
+    return match ? decodeURIComponent(match[1]) : null;
+  }
+
+  function newFeedback(freeform, vote) {
+    var feedback = {
+      submission_id: newSubmissionId(),
+      consent_to_share: getConsentToShare()
+    };
+    if (freeform) {
+      feedback['freeform'] = freeform;
+    }
+    if (vote !== -1) {
+      feedback['vote'] = vote;
+    }
+    return feedback;
+  }
+
+  function submit_feedback(freeform, vote) {
+    var feedback = newFeedback(freeform, vote);
+    Logger.log('edx.feedbackxblock.submitted', feedback);
+    post(feedback, MAX_RETRIES);
+  }
+
+  function cancelPendingVote() {
+    if (pendingVote !== null) {
+      clearTimeout(pendingVote);
+      pendingVote = null;
+    }
+  }
+
+  // A vote still waiting for its delay is sent when the learner leaves
+  // the page, with a keepalive request that outlives the page.
+  function flushPendingVote() {
+    if (pendingVote === null) {
+      return;
+    }
+    cancelPendingVote();
+    var feedback = newFeedback(false, getLikedVote());
+    if (!window.fetch) {
+      post(feedback, 0);
+      return;
+    }
+    Logger.log('edx.feedbackxblock.submitted', feedback);
+    window.fetch(runtime.handlerUrl(element, 'submit'), {
+      method: 'POST',
+      body: JSON.stringify(feedback),
+      headers: {
+        'Content-Type': 'application/json',
+        'X-CSRFToken': getCookie('csrftoken') || ''
+      },
+      credentials: 'same-origin',
+      keepalive: true
+    });
+  }
+
+  window.addEventListener('pagehide', flushPendingVote);
+  document.addEventListener('visibilitychange', function () {
+    if (document.visibilityState === 'hidden') {
+      flushPendingVote();
+    }
+  });
+
   $('.feedback_submit_feedback', element).click(function () {
-    submit_feedback(getFeedbackMessage(), -1);
+    cancelPendingVote();
+    submit_feedback(getFeedbackMessage(), getLikedVote());
   });
 
   $('.feedback_radio', element).change(function () {
     Logger.log('edx.feedbackxblock.likert_changed', { vote: getLikedVote() });
-    submit_feedback(false, getLikedVote());
+    cancelPendingVote();
+    pendingVote = setTimeout(function () {
+      pendingVote = null;
+      submit_feedback(false, getLikedVote());
+    }, VOTE_DEBOUNCE_MS);
   });
 
   $('.feedback_freeform_area', element).change(function () {
     Logger.log('edx.feedbackxblock.freeform_changed', { freeform: getFeedbackMessage() });
   });
+
+  // Vote counts, when shown, are refreshed by polling. Polls are spaced
+  // out while the counts do not change, and paused in hidden tabs.
+  var POLL_MIN_MS = 5000;
+  var POLL_MAX_MS = 60000;
+  var pollDelay = POLL_MIN_MS;
+  var aggregateEtag = null;
+
+  function schedulePoll() {
+    setTimeout(pollAggregate, pollDelay);
+  }
+
+  function pollAggregate() {
+    if (document.hidden) {
+      schedulePoll();
+      return;
+    }
+    var headers = {};
+    if (aggregateEtag) {
+      headers['If-None-Match'] = aggregateEtag;
+    }
+    $.ajax({
+      type: 'GET',
+      url: runtime.handlerUrl(element, 'aggregate'),
+      headers: headers,
+      dataType: 'json',
+      complete: function (xhr) {
+        if (xhr.status === 200) {
+          aggregateEtag = xhr.getResponseHeader('ETag');
+          updateVoteCount({ success: true, aggregate: xhr.responseJSON.aggregate });
+          pollDelay = POLL_MIN_MS;
+        } else if (xhr.status === 304) {
+          pollDelay = Math.min(pollDelay * 1.5, POLL_MAX_MS);
+        } else if (xhr.status === 403) {
+          return;
+        } else {
+          pollDelay = Math.min(pollDelay * 2, POLL_MAX_MS);
+        }
+        schedulePoll();
+      }
+    });
+  }
+
+  if ($('.feedback_vote_count', element).length) {
+    schedulePoll();
+  }
 }
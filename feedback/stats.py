@@ -0,0 +1,136 @@
+"""
+Rating statistics for feedback blocks.
+
+Votes are stored as the index of the selected item of the scale, and the
+scale goes from the best rating to the worst one: with the default scale
+("Excellent" ... "Poor"), vote 0 is a score of 5 and vote 4 a score of 1.
+All the statistics are computed on scores.
+
+Statistics are computed with NumPy for many blocks at once, from an array
+of vote histograms with one row per block.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+
+DEFAULT_SCALE_LENGTH = 5
+
+
+def rating_to_score(rating, scale_length=DEFAULT_SCALE_LENGTH):
+    """
+    Convert a vote index into a score, from `scale_length` (best) to 1.
+    """
+    return scale_length - rating
+
+
+def histograms_from_ratings(
+    groups, ratings, group_count, scale_length=DEFAULT_SCALE_LENGTH
+):
+    """
+    Build vote histograms from raw votes.
+
+    Arguments:
+        groups (array): group (e.g. block) index of each vote.
+        ratings (array): vote index of each vote.
+        group_count (int): number of groups.
+        scale_length (int): number of items in the scale.
+
+    Returns a (group_count, scale_length) array of vote counts.
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    ratings = np.asarray(ratings, dtype=np.int64)
+    valid = (ratings >= 0) & (ratings < scale_length)
+    return np.bincount(
+        groups[valid] * scale_length + ratings[valid],
+        minlength=group_count * scale_length,
+    ).reshape(group_count, scale_length)
+
+
+def compute_stats(histograms, confidence=0.95, box_size=1):
+    """
+    Compute the rating statistics of many blocks at once.
+
+    Arguments:
+        histograms (array): (blocks, scale_length) vote counts, by vote index.
+        confidence (float): level of the confidence interval of the mean.
+        box_size (int): number of scale items in the top and bottom boxes.
+
+    Returns a dict of arrays with one value per block: `count`, `mean`,
+    `median`, `std`, `ci_low`, `ci_high`, `top_box` and `bottom_box`. Blocks
+    without votes get 0 everywhere.
+    """
+    histograms = np.asarray(histograms, dtype=np.float64)
+    if histograms.ndim == 1:
+        histograms = histograms[np.newaxis, :]
+    scale_length = histograms.shape[1]
+    scores = np.arange(scale_length, 0, -1, dtype=np.float64)
+
+    count = histograms.sum(axis=1)
+    has_votes = count > 0
+    safe_count = np.where(has_votes, count, 1)
+
+    mean = histograms @ scores / safe_count
+    deviations = (scores[np.newaxis, :] - mean[:, np.newaxis]) ** 2
+    variance = (histograms * deviations).sum(axis=1) / np.maximum(count - 1, 1)
+    std = np.sqrt(variance)
+
+    # Median on the scores in ascending order: the average of the lower and
+    # upper middle votes.
+    cumulative = np.cumsum(histograms[:, ::-1], axis=1)
+    lower = np.argmax(cumulative > ((count - 1) // 2)[:, np.newaxis], axis=1) + 1
+    upper = np.argmax(cumulative > (count // 2)[:, np.newaxis], axis=1) + 1
+    median = (lower + upper) / 2
+
+    margin = NormalDist().inv_cdf((1 + confidence) / 2) * std / np.sqrt(safe_count)
+
+    top_box = histograms[:, :box_size].sum(axis=1) / safe_count
+    bottom_start = scale_length - box_size
+    bottom_box = histograms[:, bottom_start:].sum(axis=1) / safe_count
+
+    stats = {
+        "count": count.astype(np.int64),
+        "mean": mean,
+        "median": median,
+        "std": std,
+        "ci_low": mean - margin,
+        "ci_high": mean + margin,
+        "top_box": top_box,
+        "bottom_box": bottom_box,
+    }
+    for name, values in stats.items():
+        stats[name] = np.where(has_votes, values, 0)
+    return stats
+
+
+def summarize(histograms, confidence=0.95, box_size=1, decimals=2):
+    """
+    Compute the rating statistics of blocks with scales of any length.
+
+    Histograms are grouped by scale length, with one `compute_stats` call
+    per length. Returns one dict of rounded statistics per histogram, in
+    the same order.
+    """
+    by_length = {}
+    for index, histogram in enumerate(histograms):
+        by_length.setdefault(len(histogram), []).append(index)
+
+    summaries = [None] * len(histograms)
+    for length, indexes in by_length.items():
+        if not length:
+            for index in indexes:
+                summaries[index] = dict.fromkeys(compute_stats([[0]]), 0)
+            continue
+        stats = compute_stats(
+            [histograms[index] for index in indexes], confidence, box_size
+        )
+        for position, index in enumerate(indexes):
+            summaries[index] = {
+                name: (
+                    int(values[position])
+                    if name == "count"
+                    else round(float(values[position]), decimals)
+                )
+                for name, values in stats.items()
+            }
+    return summaries
@@ -0,0 +1,186 @@
+"""
+Synthetic feedback data, to benchmark the dashboard and the admin on large
+courses in a local database.
+
+`generate_course` creates the learners of a course, the Feedback rows of
+its blocks, with a given rating distribution and comment length, and the
+ShareFeedbackWith links of its approved feedback. Learners are users named
+`synthetic.<course>.<n>`, so that the data of a course can be generated
+again, or removed with `delete_course`.
+
+Only the database is populated: blocks and enrollments do not exist in the
+modulestore, and the platform APIs must be stubbed to use them (see
+feedbacktests/synthetic.py).
+"""
+
+import random
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from feedback.backfill import mark_backfilled
+from feedback.models import Feedback, ShareFeedbackWith
+
+BLOCK_CATEGORY = "feedback"
+# Weights of the ratings, by vote index (0 is the best rating).
+DEFAULT_RATING_WEIGHTS = (35, 30, 15, 12, 8)
+WORDS = """
+    course video quiz lecture exercise example reading assignment instructor
+    explanation clear confusing hard easy long short useful interesting boring
+    pace material topic concept practice feedback answer question time more
+    less great good bad helpful unclear detailed slides notes forum project
+    """.split()
+
+
+@dataclass
+class SyntheticCourse:
+    """
+    The keys of the generated data of a course.
+    """
+
+    course_key: object
+    block_ids: list
+    username_prefix: str
+
+    @property
+    def users(self):
+        return get_user_model().objects.filter(
+            username__startswith=self.username_prefix
+        )
+
+    @property
+    def feedback(self):
+        return Feedback.objects.filter(
+            course_key=self.course_key, user__username__startswith=self.username_prefix
+        )
+
+
+def username_prefix(course_key):
+    return "synthetic.{}.".format(re.sub(r"[^\w]+", "-", str(course_key)))
+
+
+def block_ids(course_key, blocks):
+    return [
+        str(course_key.make_usage_key(BLOCK_CATEGORY, "synthetic{}".format(index)))
+        for index in range(blocks)
+    ]
+
+
+def _comment(rng, comment_words):
+    return " ".join(rng.choices(WORDS, k=rng.randint(*comment_words))).capitalize()
+
+
+def generate_course(
+    course_key,
+    *,
+    blocks=5,
+    learners=1000,
+    rating_weights=DEFAULT_RATING_WEIGHTS,
+    comment_ratio=0.3,
+    comment_words=(5, 80),
+    consent_ratio=0.5,
+    approved_ratio=0.2,
+    shared_with=(),
+    days=90,
+    seed=0,
+    batch_size=5000,
+):
+    """
+    Generate the learners and feedback of a course, replacing the data
+    generated for it before.
+
+    Arguments:
+        course_key (CourseKey): the course.
+        blocks (int): number of feedback blocks.
+        learners (int): number of learners, each answering every block.
+        rating_weights (list): weights of the ratings, by vote index.
+        comment_ratio (float): share of the answers with a comment.
+        comment_words (tuple): minimum and maximum words of a comment.
+        consent_ratio (float): share of the answers with consent to share.
+        approved_ratio (float): share of the consented answers approved.
+        shared_with (list): course keys the approved feedback is shared with.
+        days (int): the answers are spread over this many days, until now.
+        seed (int): seed of the random generator.
+        batch_size (int): number of rows inserted at once.
+
+    Returns a SyntheticCourse.
+    """
+    rng = random.Random(seed)
+    course = SyntheticCourse(
+        course_key=course_key,
+        block_ids=block_ids(course_key, blocks),
+        username_prefix=username_prefix(course_key),
+    )
+    now = timezone.now()
+    ratings = range(len(rating_weights))
+    user_model = get_user_model()
+
+    with transaction.atomic():
+        course.feedback.delete()
+        for start in range(0, learners, batch_size):
+            user_model.objects.bulk_create(
+                [
+                    user_model(
+                        username="{}{}".format(course.username_prefix, index),
+                        email="{}{}@example.com".format(course.username_prefix, index),
+                    )
+                    for index in range(start, min(start + batch_size, learners))
+                ],
+                ignore_conflicts=True,
+            )
+        user_ids = list(
+            course.users.order_by("id").values_list("id", flat=True)[:learners]
+        )
+
+        rows = []
+        for user_id in user_ids:
+            for block_id in course.block_ids:
+                consent = rng.random() < consent_ratio
+                rows.append(
+                    Feedback(
+                        course_key=course_key,
+                        user_id=user_id,
+                        block_id=block_id,
+                        block_name="Synthetic feedback",
+                        rating=rng.choices(ratings, weights=rating_weights)[0],
+                        feedback=(
+                            _comment(rng, comment_words)
+                            if rng.random() < comment_ratio
+                            else ""
+                        ),
+                        consent_to_share=consent,
+                        is_approved=consent and rng.random() < approved_ratio,
+                        created=now - timedelta(seconds=rng.uniform(0, days * 86400)),
+                    )
+                )
+                if len(rows) >= batch_size:
+                    Feedback.objects.bulk_create(rows)
+                    rows = []
+        Feedback.objects.bulk_create(rows)
+        # The generated feedback has no user state to backfill.
+        mark_backfilled(course_key)
+
+    if shared_with:
+        ShareFeedbackWith.bulk_share(
+            course.feedback.filter(is_approved=True),
+            shared_with,
+            batch_size=batch_size,
+        )
+    return course
+
+
+def delete_course(course_key):
+    """
+    Delete the generated learners of a course, and their feedback.
+
+    Returns the number of learners deleted.
+    """
+    user_model = get_user_model()
+    deleted, by_model = user_model.objects.filter(
+        username__startswith=username_prefix(course_key)
+    ).delete()
+    return by_model.get(user_model._meta.label, 0) if deleted else 0
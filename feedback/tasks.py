@@ -0,0 +1,24 @@
+"""
+Celery tasks of the feedback app, used when FEEDBACK_EXPORT_BACKEND is
+"celery".
+"""
+
+from feedback.exports import RUN_EXPORT_TASK, run_job
+
+try:
+    from celery import shared_task
+except ImportError:
+    # Celery is only needed with the "celery" export backend.
+    def shared_task(**kwargs):
+        """
+        Leave the task a plain function when Celery isn't installed.
+        """
+        return lambda task: task
+
+
+@shared_task(name=RUN_EXPORT_TASK)
+def run_export_job(job_id):
+    """
+    Run a background export of the feedback.
+    """
+    run_job(job_id)
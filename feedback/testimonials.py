@@ -0,0 +1,180 @@
+"""
+Read access to approved feedback (testimonials) for public course pages.
+
+Testimonials for a course are the approved feedback, with consent to share,
+submitted either in the course itself or in another course version and
+shared with it through ShareFeedbackWith. Results are cached per course
+and page; every change to the public data of a course bumps a version
+number, which invalidates all the cached pages of that course at once.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from feedback.instrumentation import increment
+from feedback.models import Feedback, ShareFeedbackWith
+from feedback.stats import DEFAULT_SCALE_LENGTH, rating_to_score
+
+CACHE_KEY_PREFIX = "feedback.testimonials"
+DEFAULT_CACHE_TIMEOUT = 60 * 60
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+TESTIMONIAL_FIELDS = (
+    "id",
+    "course_key",
+    "block_name",
+    "rating",
+    "feedback",
+    "created",
+    "user__username",
+    "user__first_name",
+    "user__last_name",
+)
+
+
+def _version_key(course_key):
+    return "{prefix}.version.{course_key}".format(
+        prefix=CACHE_KEY_PREFIX, course_key=course_key
+    )
+
+
+def get_cache_version(course_key):
+    """
+    Return the current cache version of the testimonials of a course.
+
+    The version is a random token rather than a counter starting at 1, so
+    that an evicted version key can never resurrect stale pages.
+    """
+    version = cache.get(_version_key(course_key))
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(_version_key(course_key), version, None)
+    return version
+
+
+def invalidate_course_testimonials(*course_keys):
+    """
+    Invalidate the cached testimonials of the given courses.
+    """
+    cache.set_many(
+        {_version_key(course_key): uuid.uuid4().hex for course_key in course_keys},
+        None,
+    )
+
+
+def invalidate_feedback_testimonials(feedback):
+    """
+    Invalidate the cached testimonials of every course showing a feedback.
+    """
+    shared_course_keys = ShareFeedbackWith.objects.filter(
+        feedback_id=feedback.pk
+    ).values_list("course_key", flat=True)
+    invalidate_course_testimonials(feedback.course_key, *shared_course_keys)
+
+
+def _read_database():
+    """
+    Return the database alias testimonials are read from.
+
+    Defaults to the read replica when one is configured, so that public
+    pages never load the primary database.
+    """
+    alias = getattr(settings, "FEEDBACK_TESTIMONIALS_DB_ALIAS", None)
+    if alias:
+        return alias
+    if "read_replica" in settings.DATABASES:
+        return "read_replica"
+    return "default"
+
+
+def _score(rating):
+    """
+    Return the 1–5 score (5 is the best) of a vote index, which goes from
+    0 (the best) to 4, or None.
+    """
+    if rating is None or not 0 <= rating < DEFAULT_SCALE_LENGTH:
+        return None
+    return rating_to_score(rating)
+
+
+def _serialize(row):
+    """
+    Return the public fields of a testimonial row.
+    """
+    values = dict(zip(TESTIMONIAL_FIELDS, row))
+    full_name = " ".join(
+        name for name in (values["user__first_name"], values["user__last_name"]) if name
+    )
+    return {
+        "id": values["id"],
+        "course_key": str(values["course_key"]),
+        "block_name": values["block_name"],
+        "rating": _score(values["rating"]),
+        "feedback": values["feedback"],
+        "user_name": full_name or values["user__username"],
+        "created": values["created"].isoformat(),
+    }
+
+
+def query_testimonials(course_key, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Return one page of testimonials for a course, newest first.
+
+    Arguments:
+        course_key (CourseKey): the course the testimonials are shown in.
+        cursor (int): only return feedback older than this feedback id.
+        page_size (int): maximum number of testimonials to return.
+
+    Returns a dict with the `results` and the `next` cursor, which is None
+    on the last page. Feedback of the course and feedback shared with it
+    are fetched with a single UNION query, each side using its own index.
+    """
+    approved = Feedback.objects.using(_read_database()).filter(
+        is_approved=True, consent_to_share=True
+    )
+    if cursor is not None:
+        approved = approved.filter(id__lt=cursor)
+    own = approved.filter(course_key=course_key).values_list(*TESTIMONIAL_FIELDS)
+    shared = approved.filter(sharefeedbackwith__course_key=course_key).values_list(
+        *TESTIMONIAL_FIELDS
+    )
+    rows = list(own.union(shared).order_by("-id")[: page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = rows[-1][0]
+    return {
+        "results": [_serialize(row) for row in rows],
+        "next": next_cursor,
+    }
+
+
+def get_testimonials(course_key, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Return one page of testimonials for a course, served from the cache.
+    """
+    key = "{prefix}.page.{course_key}.{version}.{cursor}.{page_size}".format(
+        prefix=CACHE_KEY_PREFIX,
+        course_key=course_key,
+        version=get_cache_version(course_key),
+        cursor=cursor,
+        page_size=page_size,
+    )
+    page = cache.get(key)
+    increment("cache.testimonials.{}".format("miss" if page is None else "hit"))
+    if page is None:
+        page = query_testimonials(course_key, cursor, page_size)
+        cache.set(
+            key,
+            page,
+            getattr(
+                settings,
+                "FEEDBACK_TESTIMONIALS_CACHE_TIMEOUT",
+                DEFAULT_CACHE_TIMEOUT,
+            ),
+        )
+    return page
@@ -0,0 +1,373 @@
+"""
+Recurring themes of the freeform feedback of a course.
+
+`update_course_themes` streams the feedback texts of a course in chunks and
+counts, for each term and each pair of consecutive terms (bigram), the
+number of comments containing it, overall and by rating bucket. Counters
+are trimmed to their most frequent entries, and stored with the derived
+themes in the FeedbackThemeSummary table.
+
+Runs are incremental: the summary records the last Feedback row counted,
+and later runs only count the rows created since then. Each counted row
+has a FeedbackThemeEntry with the digest of its text, its rating and its
+terms: a counted row modified since the last run is subtracted and counted
+again only when its text or rating changed, and deleted rows are
+subtracted. The entries and the counters are saved after each chunk, in
+one transaction, so that an interrupted run resumes where it stopped.
+"""
+
+import logging
+import math
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from feedback.events import text_digest
+from feedback.models import Feedback, FeedbackThemeEntry, FeedbackThemeSummary
+from feedback.rollups import WATERMARK_OVERLAP
+from feedback.search import iter_terms
+from feedback.stats import DEFAULT_SCALE_LENGTH, rating_to_score
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+# Number of entries kept in each counter between runs.
+MAX_COUNTER_SIZE = 2000
+TOP_THEMES = 10
+TOP_DISTINCTIVE_TERMS = 5
+# Minimum number of comments mentioning a theme.
+MIN_THEME_COUNT = 2
+BUCKETS = ("positive", "neutral", "negative")
+
+
+def rating_bucket(rating, scale_length=DEFAULT_SCALE_LENGTH):
+    """
+    Return the bucket of a vote index: "positive", "neutral" or "negative",
+    or None when there is no vote.
+    """
+    if rating is None:
+        return None
+    score = rating_to_score(rating, scale_length)
+    if score > 3:
+        return "positive"
+    if score == 3:
+        return "neutral"
+    return "negative"
+
+
+def _most_common(counter):
+    return sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+
+
+class ThemeCounters:
+    """
+    Comment counts of the terms and bigrams of a course.
+    """
+
+    def __init__(self, comments=0, terms=None, bigrams=None, buckets=None):
+        self.comments = comments
+        self.terms = Counter(terms or {})
+        self.bigrams = Counter(bigrams or {})
+        self.buckets = {
+            bucket: Counter((buckets or {}).get(bucket, {})) for bucket in BUCKETS
+        }
+
+    def add(self, text, rating):
+        """
+        Count the terms and bigrams of a comment, once each, and return
+        its terms.
+        """
+        terms = list(iter_terms(text))
+        self._count(terms, rating, 1)
+        return terms
+
+    def remove(self, terms, rating):
+        """
+        Subtract a comment counted by `add`, from its terms.
+        """
+        self._count(terms, rating, -1)
+
+    def _count(self, terms, rating, sign):
+        """
+        Add (`sign` 1) or subtract (`sign` -1) the counts of a comment.
+        """
+        if not terms:
+            return
+        distinct_terms = dict.fromkeys(terms, sign)
+        bigrams = dict.fromkeys(
+            (" ".join(pair) for pair in zip(terms, terms[1:])), sign
+        )
+        counters = [(self.terms, distinct_terms), (self.bigrams, bigrams)]
+        bucket = rating_bucket(rating)
+        if bucket:
+            counters.append((self.buckets[bucket], distinct_terms))
+        self.comments += sign
+        for counter, delta in counters:
+            counter.update(delta)
+            if sign < 0:
+                # Entries trimmed since the comment was counted can go
+                # below zero.
+                for key in delta:
+                    if counter[key] <= 0:
+                        del counter[key]
+
+    def trim(self, size=MAX_COUNTER_SIZE):
+        """
+        Only keep the `size` most frequent entries of each counter.
+        """
+        for counter in [self.terms, self.bigrams, *self.buckets.values()]:
+            if len(counter) > size:
+                kept = dict(_most_common(counter)[:size])
+                counter.clear()
+                counter.update(kept)
+
+    def themes(self, count=TOP_THEMES):
+        """
+        Return the most frequent bigrams, completed with the most frequent
+        terms not already part of them. Ties are sorted alphabetically.
+        """
+        themes = [
+            {"theme": bigram, "count": total}
+            for bigram, total in _most_common(self.bigrams)[:count]
+            if total >= MIN_THEME_COUNT
+        ]
+        covered = {term for theme in themes for term in theme["theme"].split()}
+        for term, total in _most_common(self.terms):
+            if len(themes) >= count or total < MIN_THEME_COUNT:
+                break
+            if term not in covered:
+                themes.append({"theme": term, "count": total})
+        return sorted(themes, key=lambda theme: (-theme["count"], theme["theme"]))
+
+    def distinctive_terms(self, count=TOP_DISTINCTIVE_TERMS):
+        """
+        Return the terms most specific to each rating bucket, by bucket.
+
+        Terms are ranked by the smoothed log-odds ratio of their frequency
+        in the bucket over their frequency in the other buckets.
+        """
+        totals = {bucket: sum(self.buckets[bucket].values()) for bucket in BUCKETS}
+        vocabulary = len(self.terms) or 1
+        distinctive = {}
+        for bucket in BUCKETS:
+            other_total = sum(totals.values()) - totals[bucket]
+            scores = []
+            for term, total in self.buckets[bucket].items():
+                if total < MIN_THEME_COUNT:
+                    continue
+                other = sum(
+                    self.buckets[other_bucket][term]
+                    for other_bucket in BUCKETS
+                    if other_bucket != bucket
+                )
+                score = math.log(
+                    (total + 1) / (totals[bucket] + vocabulary)
+                ) - math.log((other + 1) / (other_total + vocabulary))
+                if score > 0:
+                    scores.append((score, term))
+            distinctive[bucket] = [term for _, term in sorted(scores, reverse=True)]
+            distinctive[bucket] = distinctive[bucket][:count]
+        return distinctive
+
+    def to_dict(self):
+        return {
+            "comments": self.comments,
+            "terms": dict(self.terms),
+            "bigrams": dict(self.bigrams),
+            "buckets": {bucket: dict(self.buckets[bucket]) for bucket in BUCKETS},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            comments=data.get("comments", 0),
+            terms=data.get("terms"),
+            bigrams=data.get("bigrams"),
+            buckets=data.get("buckets"),
+        )
+
+
+def _save_counters(summary, counters, last_id):
+    """
+    Save the counters of a run in progress, with the last row counted.
+    """
+    summary.last_id = last_id
+    summary.data = {**summary.data, "counters": counters.to_dict()}
+    summary.save(update_fields=["last_id", "data"])
+
+
+def _count_deleted(counters, feedback, summary, batch_size):
+    """
+    Subtract from the counters the counted rows deleted since the last run.
+    """
+    deleted = (
+        FeedbackThemeEntry.objects.filter(course_key=summary.course_key)
+        .exclude(feedback_id__in=feedback.values("id"))
+        .order_by("feedback_id")
+    )
+    while True:
+        chunk = list(deleted[:batch_size])
+        if not chunk:
+            break
+        with transaction.atomic():
+            for entry in chunk:
+                counters.remove(entry.terms, entry.rating)
+            FeedbackThemeEntry.objects.filter(
+                feedback_id__in=[entry.feedback_id for entry in chunk]
+            ).delete()
+            _save_counters(summary, counters, summary.last_id)
+
+
+def _count_changed(counters, feedback, summary, batch_size):
+    """
+    Apply to the counters the counted rows deleted, or whose text or rating
+    changed, since the last run. Returns the number of rows read.
+    """
+    _count_deleted(counters, feedback, summary, batch_size)
+
+    read = 0
+    last_id = 0
+    rows = feedback.filter(
+        id__lte=summary.last_id,
+        modified__gte=summary.watermark - WATERMARK_OVERLAP,
+    ).order_by("id")
+    while True:
+        chunk = list(
+            rows.filter(id__gt=last_id).values_list("id", "rating", "feedback")[
+                :batch_size
+            ]
+        )
+        if not chunk:
+            break
+        entries = FeedbackThemeEntry.objects.in_bulk(
+            [feedback_id for feedback_id, _, _ in chunk], field_name="feedback_id"
+        )
+        stale = []
+        created = []
+        for feedback_id, rating, text in chunk:
+            entry = entries.get(feedback_id)
+            digest = text_digest(text)
+            if entry and (entry.digest, entry.rating) == (digest, rating):
+                continue
+            if entry:
+                counters.remove(entry.terms, entry.rating)
+                stale.append(feedback_id)
+            if text:
+                created.append(
+                    FeedbackThemeEntry(
+                        course_key=summary.course_key,
+                        feedback_id=feedback_id,
+                        rating=rating,
+                        digest=digest,
+                        terms=counters.add(text, rating),
+                    )
+                )
+        with transaction.atomic():
+            FeedbackThemeEntry.objects.filter(feedback_id__in=stale).delete()
+            FeedbackThemeEntry.objects.bulk_create(created)
+            _save_counters(summary, counters, summary.last_id)
+        read += len(chunk)
+        last_id = chunk[-1][0]
+    return read
+
+
+def update_course_themes(course_key, full=False, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Update the theme summary of a course with the feedback created, changed
+    or deleted since the last run, or with all of it when `full` is True.
+
+    Each chunk is committed with the counters, and the watermark of the
+    run is only recorded once every chunk was counted.
+
+    Returns the number of Feedback rows read.
+    """
+    started = timezone.now()
+    feedback = Feedback.objects.filter(course_key=course_key)
+    summary = FeedbackThemeSummary.objects.filter(course_key=course_key).first()
+
+    incremental = summary is not None and not full
+    read = 0
+    if incremental:
+        counters = ThemeCounters.from_dict(summary.data.get("counters", {}))
+        read += _count_changed(counters, feedback, summary, batch_size)
+    else:
+        # Rows modified while they are counted are read again by the next
+        # run, whose watermark is the start of this one.
+        counters = ThemeCounters()
+        with transaction.atomic():
+            FeedbackThemeEntry.objects.filter(course_key=course_key).delete()
+            summary, _ = FeedbackThemeSummary.objects.update_or_create(
+                course_key=course_key,
+                defaults={
+                    "last_id": 0,
+                    "watermark": started,
+                    "data": {
+                        **(summary.data if summary else {}),
+                        "counters": counters.to_dict(),
+                    },
+                },
+            )
+
+    last_id = summary.last_id
+    max_id = feedback.aggregate(max_id=Max("id"))["max_id"] or last_id
+    rows = feedback.filter(id__lte=max_id, feedback__gt="").order_by("id")
+    while True:
+        chunk = list(
+            rows.filter(id__gt=last_id).values_list("id", "rating", "feedback")[
+                :batch_size
+            ]
+        )
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        with transaction.atomic():
+            FeedbackThemeEntry.objects.bulk_create(
+                [
+                    FeedbackThemeEntry(
+                        course_key=course_key,
+                        feedback_id=feedback_id,
+                        rating=rating,
+                        digest=text_digest(text),
+                        terms=counters.add(text, rating),
+                    )
+                    for feedback_id, rating, text in chunk
+                ]
+            )
+            _save_counters(summary, counters, last_id)
+        read += len(chunk)
+    counters.trim()
+
+    summary.last_id = max(max_id, summary.last_id)
+    summary.watermark = started
+    summary.data = {
+        "counters": counters.to_dict(),
+        "themes": counters.themes(),
+        "distinctive_terms": counters.distinctive_terms(),
+    }
+    summary.save()
+    log.info(
+        "Updated the feedback themes of %s (%s, %d rows read).",
+        course_key,
+        "incremental" if incremental else "full",
+        read,
+    )
+    return read
+
+
+def get_course_themes(course_key):
+    """
+    Return the stored themes of a course: a dict with the `themes` list, the
+    `distinctive_terms` by rating bucket, the number of `comments` counted
+    and the `updated` date, or None when they were never computed.
+    """
+    summary = FeedbackThemeSummary.objects.filter(course_key=course_key).first()
+    if summary is None:
+        return None
+    return {
+        "themes": summary.data.get("themes", []),
+        "distinctive_terms": summary.data.get("distinctive_terms", {}),
+        "comments": summary.data.get("counters", {}).get("comments", 0),
+        "updated": summary.watermark,
+    }
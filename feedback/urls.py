@@ -0,0 +1,15 @@
+"""
+URLs for the feedback app.
+"""
+
+from django.urls import path
+
+from feedback import views
+
+urlpatterns = [
+    path(
+        "v1/courses/<str:course_id>/testimonials/",
+        views.course_testimonials,
+        name="course_testimonials",
+    ),
+]
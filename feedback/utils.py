@@ -1,6 +1,62 @@
 """Utilities for feedback app"""
 
+import os
+import tempfile
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.module_loading import import_string
+
 
 def _(text):
     """Dummy `gettext` replacement to make string extraction tools scrape strings marked for translation"""
     return text
+
+
+def get_platform_model(setting_name, default):
+    """
+    Return an edx-platform model, as `app_label.ModelName`.
+
+    The model can be replaced through the `setting_name` setting, for
+    instance with a stand-in table when running outside of the platform.
+    """
+    return apps.get_model(getattr(settings, setting_name, default))
+
+
+class ExportStorage(FileSystemStorage):
+    """
+    Private storage of the feedback exports, in the `FEEDBACK_EXPORT_DIR`
+    directory (`feedback-exports` in the temporary directory by default).
+
+    Its files have no URL: they hold personal data, and are only sent by
+    the download view of the admin, to staff.
+    """
+
+    # The cached properties of FileSystemStorage are replaced with
+    # properties, so that the settings are read at each use.
+    # pylint: disable=invalid-overridden-method
+
+    @property
+    def base_location(self):
+        return getattr(settings, "FEEDBACK_EXPORT_DIR", None) or os.path.join(
+            tempfile.gettempdir(), "feedback-exports"
+        )
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    @property
+    def base_url(self):
+        return None
+
+
+def get_export_storage():
+    """
+    Return the storage of the feedback exports: an instance of the
+    `FEEDBACK_EXPORT_STORAGE` class (a dotted path), or an ExportStorage.
+    The configured storage must not be public.
+    """
+    path = getattr(settings, "FEEDBACK_EXPORT_STORAGE", None)
+    return import_string(path)() if path else ExportStorage()
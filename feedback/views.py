@@ -0,0 +1,67 @@
+"""
+Views for the feedback app.
+"""
+
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_GET
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.testimonials import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    get_cache_version,
+    get_testimonials,
+)
+
+
+def _parse_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _testimonials_etag(request, course_id):
+    """
+    Build the ETag of a testimonials page from the course cache version,
+    so that conditional requests are answered without any database query.
+    """
+    try:
+        course_key = CourseKey.from_string(course_id)
+    except InvalidKeyError:
+        return None
+    return "{version}-{cursor}-{page_size}".format(
+        version=get_cache_version(course_key),
+        cursor=request.GET.get("cursor", ""),
+        page_size=request.GET.get("page_size", ""),
+    )
+
+
+@require_GET
+@condition(etag_func=_testimonials_etag)
+def course_testimonials(request, course_id):
+    """
+    Return the approved feedback to display on the page of a course.
+
+    Query parameters:
+        cursor: the `next` value of the previous page.
+        page_size: number of testimonials per page (max. 100).
+    """
+    try:
+        course_key = CourseKey.from_string(course_id)
+    except InvalidKeyError:
+        return JsonResponse({"error": "Invalid course key"}, status=404)
+
+    cursor = _parse_int(request.GET.get("cursor"), None)
+    page_size = min(
+        max(_parse_int(request.GET.get("page_size"), DEFAULT_PAGE_SIZE), 1),
+        MAX_PAGE_SIZE,
+    )
+
+    response = JsonResponse(get_testimonials(course_key, cursor, page_size))
+    # Shared caches may keep the page, but must revalidate it with the ETag,
+    # so approval changes are visible right away.
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
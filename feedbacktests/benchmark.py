@@ -0,0 +1,123 @@
+"""
+Benchmark helpers for the feedback block.
+
+Benchmarks only run when `FEEDBACK_BENCHMARK=1` (see `make benchmark`).
+Each benchmark measures the median latency of a call, and the peak memory
+allocated during a call, and compares them with the baselines stored in
+`var/benchmarks.json` (or `FEEDBACK_BENCHMARK_BASELINE`). A benchmark fails
+when it is slower, or allocates more, than its baseline by more than
+`FEEDBACK_BENCHMARK_TOLERANCE` (0.5, i.e. 50%, by default).
+
+Set `FEEDBACK_BENCHMARK_SAVE=1` to store the results as the new baselines.
+Timings depend on the machine: baselines are local, and are not committed.
+"""
+
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+ENABLED = os.environ.get("FEEDBACK_BENCHMARK") == "1"
+SAVE = os.environ.get("FEEDBACK_BENCHMARK_SAVE") == "1"
+TOLERANCE = float(os.environ.get("FEEDBACK_BENCHMARK_TOLERANCE", "0.5"))
+BASELINE_PATH = Path(
+    os.environ.get("FEEDBACK_BENCHMARK_BASELINE", "var/benchmarks.json")
+)
+ROUNDS = 15
+ROUND_DURATION = 0.01
+# Below these values, differences are noise.
+MIN_LATENCY_US = 5
+MIN_PEAK_KIB = 4
+
+
+def measure(func, rounds=ROUNDS):
+    """
+    Return the median and minimum latency of `func`, in microseconds, and
+    the peak memory it allocates, in KiB.
+
+    Each round calls `func` as many times as fit in about
+    ROUND_DURATION seconds.
+    """
+    func()
+    iterations = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < ROUND_DURATION:
+        func()
+        iterations += 1
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        timings.append((time.perf_counter() - start) / iterations)
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_us": round(statistics.median(timings) * 1e6, 2),
+        "min_us": round(min(timings) * 1e6, 2),
+        "peak_kib": round((peak - before) / 1024, 2),
+        "iterations": iterations * rounds,
+    }
+
+
+class BenchmarkRecorder:
+    """
+    Compare benchmark results with their baselines, and collect them.
+    """
+
+    def __init__(self, path=BASELINE_PATH, tolerance=TOLERANCE):
+        self.path = Path(path)
+        self.tolerance = tolerance
+        self.baselines = {}
+        if self.path.exists():
+            self.baselines = json.loads(self.path.read_text())
+        self.results = {}
+
+    def regressions(self, name, result):
+        """
+        Return the regressions of a result compared with its baseline.
+        """
+        baseline = self.baselines.get(name)
+        if not baseline:
+            return []
+        messages = []
+        for metric, floor in (
+            ("median_us", MIN_LATENCY_US),
+            ("peak_kib", MIN_PEAK_KIB),
+        ):
+            limit = max(baseline[metric], floor) * (1 + self.tolerance)
+            if result[metric] > limit:
+                messages.append(
+                    "{name}: {metric} {value} > {limit:.2f} (baseline {baseline})".format(
+                        name=name,
+                        metric=metric,
+                        value=result[metric],
+                        limit=limit,
+                        baseline=baseline[metric],
+                    )
+                )
+        return messages
+
+    def record(self, name, result):
+        self.results[name] = result
+        return self.regressions(name, result)
+
+    def save(self):
+        """
+        Store the results as the new baselines, keeping the other ones.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps({**self.baselines, **self.results}, indent=2, sort_keys=True)
+        )
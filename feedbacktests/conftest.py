@@ -1,11 +1,14 @@
 import pytest
 from mock import Mock
 
+from opaque_keys.edx.keys import CourseKey
 from workbench.runtime import WorkbenchRuntime
 from xblock.fields import ScopeIds
 from xblock.runtime import DictKeyValueStore, KvsFieldData
 
 from feedback.feedback import FeedbackXBlock
+from feedback.synthetic import generate_course
+from feedbacktests import benchmark as benchmark_module
 
 
 def generate_scope_ids(runtime, block_type):
@@ -25,3 +28,54 @@ def feedback_xblock():
     feedback_xblock = FeedbackXBlock(runtime, db_model, scope_ids=ids)
     feedback_xblock.usage_id = Mock()
     return feedback_xblock
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder():
+    """Benchmark results of the session, saved as baselines on request."""
+    recorder = benchmark_module.BenchmarkRecorder()
+    yield recorder
+    if benchmark_module.SAVE and recorder.results:
+        recorder.save()
+
+
+@pytest.fixture
+def benchmark(benchmark_recorder):  # pylint: disable=redefined-outer-name
+    """
+    Measure a function, and fail when it regressed from its baseline.
+
+    Usage: `benchmark("name", func)`, returning the measured result.
+    """
+    if not benchmark_module.ENABLED:
+        pytest.skip("Set FEEDBACK_BENCHMARK=1 to run the benchmarks.")
+
+    def run(name, func, **kwargs):
+        result = benchmark_module.measure(func, **kwargs)
+        print(
+            "\n{name}: {median_us} us/call (min {min_us}), {peak_kib} KiB peak".format(
+                name=name, **result
+            )
+        )
+        regressions = benchmark_recorder.record(name, result)
+        assert not regressions, "\n".join(regressions)
+        return result
+
+    return run
+
+
+@pytest.fixture
+def synthetic_course(db):  # pylint: disable=unused-argument
+    """
+    Factory generating a synthetic course, see feedback.synthetic.
+
+    Usage: `synthetic_course(learners=1000, blocks=5)`.
+    """
+    counter = iter(range(1000))
+
+    def generate(**kwargs):
+        course_key = CourseKey.from_string(
+            "course-v1:edX+Synthetic+{}".format(next(counter))
+        )
+        return generate_course(course_key, **kwargs)
+
+    return generate
@@ -0,0 +1,364 @@
+"""
+Load test of the `feedback` handler on the workbench runtime.
+
+Simulated learners vote on one feedback block, from threads in one or more
+processes. Each vote loads the block, calls the handler and saves the
+block, like the runtime does for a request, and stores the Feedback row of
+the learner. The run reports the throughput, the latency percentiles, and
+whether the `vote_aggregate` of the block still counts every voter:
+concurrent votes read and write the whole aggregate, so votes are lost
+when they overlap. The Feedback table, written per learner, is the
+reference.
+
+Usage:
+
+    DJANGO_SETTINGS_MODULE=feedback.settings.test python -m feedbacktests.loadtest \\
+        --migrate --learners 200 --votes 3 --threads 1,4,16 --processes 2
+
+`--threads` takes a list, to find where contention starts. The block
+fields are stored by a backend of BACKENDS:
+
+* workbench (default): the XBlockState table of the workbench, in the
+  database, as in the workbench server.
+* memory: a store in the process, for a single process.
+
+SQLite allows one writer at a time: set WORKBENCH_DATABASES to a database
+server for realistic numbers with several processes. The rate limit of the
+submissions is disabled during the run.
+"""
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from random import Random
+from types import SimpleNamespace
+
+import django
+
+# The modules below need the Django settings.
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "feedback.settings.test")
+django.setup()
+
+# pylint: disable=wrong-import-position
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from opaque_keys.edx.keys import CourseKey, UsageKey  # noqa: E402
+from webob import Request  # noqa: E402
+from workbench.models import XBlockState  # noqa: E402
+from workbench.runtime import WORKBENCH_KVS, WorkbenchRuntime  # noqa: E402
+from xblock.fields import ScopeIds  # noqa: E402
+from xblock.runtime import DictKeyValueStore, KvsFieldData  # noqa: E402
+
+from feedback.feedback import FeedbackXBlock  # noqa: E402
+from feedback.reconcile import compute_histograms  # noqa: E402
+
+BACKENDS = ("workbench", "memory")
+SETTINGS_OVERRIDES = {"FEEDBACK_RATE_LIMIT_BURST": 0}
+
+_stores = {}
+
+
+@dataclass
+class LoadTestConfig:
+    """
+    Parameters of a load test run.
+    """
+
+    learners: int = 100
+    votes: int = 1
+    threads: int = 4
+    processes: int = 1
+    backend: str = "workbench"
+    seed: int = 0
+
+
+@dataclass
+class Target:
+    """
+    The block and learners of a run.
+    """
+
+    course_key: str
+    usage_id: str
+    user_ids: list
+
+
+class MemoryKeyValueStore(DictKeyValueStore):
+    """
+    A store in the process, copying the values like a database.
+    """
+
+    def get(self, key):
+        return copy.deepcopy(super().get(key))
+
+    def set(self, key, value):
+        super().set(key, copy.deepcopy(value))
+
+
+def get_store(backend, usage_id):
+    """
+    Return the key-value store of a backend, shared by the threads of the
+    process.
+    """
+    if (backend, usage_id) not in _stores:
+        if backend == "workbench":
+            _stores[(backend, usage_id)] = WORKBENCH_KVS
+        elif backend == "memory":
+            _stores[(backend, usage_id)] = MemoryKeyValueStore()
+        else:
+            raise ValueError("Unknown backend {}".format(backend))
+    return _stores[(backend, usage_id)]
+
+
+def load_block(store, target, user_id):
+    """
+    Load the block of a run for a learner.
+    """
+    usage_id = target.usage_id
+    block = FeedbackXBlock(
+        WorkbenchRuntime(user_id),
+        KvsFieldData(store),
+        scope_ids=ScopeIds(
+            str(user_id), "feedback", usage_id.rsplit(".", 1)[0], usage_id
+        ),
+    )
+    block.course_id = CourseKey.from_string(target.course_key)
+    block.location = UsageKey.from_string(
+        str(block.course_id.make_usage_key("feedback", usage_id.split(".")[0]))
+    )
+    block.xmodule_runtime = SimpleNamespace(user_id=user_id, user_is_staff=False)
+    return block
+
+
+def read_aggregate(store, target):
+    block = load_block(store, target, None)
+    return list(block.vote_aggregate or [])
+
+
+def _init_store(store, target):
+    """
+    Create the aggregate before the run, so that concurrent votes do not
+    create the row of the block at once.
+    """
+    block = load_block(store, target, None)
+    if not block.vote_aggregate:
+        block.init_vote_aggregate()
+        block.save()
+
+
+def _init_process(overrides):
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+def run_worker(config, target, user_ids):
+    """
+    Vote for the given learners from `config.threads` threads.
+
+    Returns the latencies of the votes, in milliseconds, the errors by
+    type, and the learners with at least one vote.
+    """
+    store = get_store(config.backend, target.usage_id)
+
+    def vote_as(user_id):
+        rng = Random("{}.{}".format(config.seed, user_id))
+        latencies, errors, voted = [], Counter(), False
+        try:
+            for _ in range(config.votes):
+                request = Request.blank(
+                    "/",
+                    method="POST",
+                    body=json.dumps({"vote": rng.randrange(5)}).encode("utf-8"),
+                )
+                start = time.perf_counter()
+                try:
+                    block = load_block(store, target, user_id)
+                    response = block.feedback(request)
+                    block.save()
+                except Exception as error:  # pylint: disable=broad-except
+                    errors[type(error).__name__] += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code == 200:
+                    voted = True
+                else:
+                    errors["HTTP {}".format(response.status_code)] += 1
+        finally:
+            connections.close_all()
+        return latencies, errors, voted
+
+    latencies, errors, voters = [], Counter(), 0
+    with ThreadPoolExecutor(config.threads) as pool:
+        for user_latencies, user_errors, voted in pool.map(vote_as, user_ids):
+            latencies += user_latencies
+            errors += user_errors
+            voters += voted
+    return latencies, errors, voters
+
+
+def create_target(config):
+    """
+    Create the learners and the block of a run.
+    """
+    run_id = uuid.uuid4().hex[:8]
+    prefix = "loadtest.{}.".format(run_id)
+    User.objects.bulk_create(
+        [
+            User(username="{}{}".format(prefix, index))
+            for index in range(config.learners)
+        ]
+    )
+    return Target(
+        course_key="course-v1:loadtest+{}+1".format(run_id),
+        usage_id="loadtest-{}.feedback.d0.u0".format(run_id),
+        user_ids=list(
+            User.objects.filter(username__startswith=prefix)
+            .order_by("id")
+            .values_list("id", flat=True)
+        ),
+    )
+
+
+def delete_target(target):
+    User.objects.filter(id__in=target.user_ids).delete()
+    XBlockState.objects.filter(scenario=target.usage_id.split(".")[0]).delete()
+    _stores.pop(("memory", target.usage_id), None)
+
+
+def percentile(values, percent):
+    """
+    Return a percentile of a list of values, by linear interpolation.
+    """
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def run(config):
+    """
+    Run a load test, and return its report.
+    """
+    if config.backend == "memory" and config.processes > 1:
+        raise ValueError("The memory backend only runs in one process.")
+
+    target = create_target(config)
+    store = get_store(config.backend, target.usage_id)
+    _init_store(store, target)
+    try:
+        with override_settings(**SETTINGS_OVERRIDES):
+            start = time.perf_counter()
+            if config.processes == 1:
+                latencies, errors, voters = run_worker(config, target, target.user_ids)
+            else:
+                # Forked processes must not share the database connections.
+                connections.close_all()
+                with ProcessPoolExecutor(
+                    config.processes,
+                    initializer=_init_process,
+                    initargs=(SETTINGS_OVERRIDES,),
+                ) as pool:
+                    results = list(
+                        pool.map(
+                            run_worker,
+                            [config] * config.processes,
+                            [target] * config.processes,
+                            [
+                                target.user_ids[index :: config.processes]
+                                for index in range(config.processes)
+                            ],
+                        )
+                    )
+                latencies = [value for result in results for value in result[0]]
+                errors = sum((result[1] for result in results), Counter())
+                voters = sum(result[2] for result in results)
+            elapsed = time.perf_counter() - start
+
+        aggregate = read_aggregate(store, target)
+        table = sum(compute_histograms(target.course_key).values(), [])
+    finally:
+        delete_target(target)
+
+    latencies.sort()
+    return {
+        "backend": config.backend,
+        "processes": config.processes,
+        "threads": config.threads,
+        "requests": len(latencies) + sum(errors.values()),
+        "errors": dict(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            name: round(percentile(latencies, percent), 3) if latencies else None
+            for name, percent in (("p50", 50), ("p90", 90), ("p99", 99))
+        },
+        "voters": voters,
+        "aggregate": aggregate,
+        "aggregate_total": sum(aggregate),
+        "feedback_table_total": sum(table),
+        "lost_votes": voters - sum(aggregate),
+    }
+
+
+def format_report(report):
+    return (
+        "{backend} {processes}x{threads}: {requests} requests in {elapsed_s} s, "
+        "{throughput_rps} votes/s, p50 {p50} ms, p90 {p90} ms, p99 {p99} ms, "
+        "{errors_total} errors; {voters} voters, aggregate {aggregate_total}, "
+        "Feedback table {feedback_table_total}, {lost_votes} lost votes"
+    ).format(
+        errors_total=sum(report["errors"].values()),
+        **report,
+        **report["latency_ms"],
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--learners", type=int, default=100)
+    parser.add_argument("--votes", type=int, default=1, help="Votes per learner.")
+    parser.add_argument(
+        "--threads",
+        default="4",
+        help="Threads per process, or a comma separated list of runs.",
+    )
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--backend", choices=BACKENDS, default="workbench")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--migrate", action="store_true", help="Migrate the database first."
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON reports.")
+    args = parser.parse_args(argv)
+
+    if args.migrate:
+        # The workbench app has no migrations.
+        call_command("migrate", run_syncdb=True, verbosity=0)
+
+    for threads in args.threads.split(","):
+        report = run(
+            LoadTestConfig(
+                learners=args.learners,
+                votes=args.votes,
+                threads=int(threads),
+                processes=args.processes,
+                backend=args.backend,
+                seed=args.seed,
+            )
+        )
+        print(json.dumps(report) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
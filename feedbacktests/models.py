@@ -0,0 +1,51 @@
+"""
+Stand-ins for the edx-platform tables read by the feedback app.
+"""
+
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+from opaque_keys.edx.django.models import CourseKeyField, UsageKeyField
+
+
+class StudentModule(models.Model):
+    """
+    Stand-in for the edx-platform StudentModule table.
+    """
+
+    student = models.ForeignKey(User, on_delete=models.CASCADE)
+    course_id = CourseKeyField(max_length=255)
+    module_state_key = UsageKeyField(max_length=255)
+    module_type = models.CharField(max_length=32)
+    state = models.TextField(null=True)
+    created = models.DateTimeField(default=timezone.now)
+    modified = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        app_label = "feedbacktests"
+
+
+class CourseOverview(models.Model):
+    """
+    Stand-in for the edx-platform CourseOverview table.
+    """
+
+    id = CourseKeyField(primary_key=True, max_length=255)
+    display_name = models.TextField(null=True)
+    end = models.DateTimeField(null=True)
+
+    class Meta:
+        app_label = "feedbacktests"
+
+
+class UserStateSummaryField(models.Model):
+    """
+    Stand-in for the edx-platform XModuleUserStateSummaryField table.
+    """
+
+    field_name = models.CharField(max_length=64)
+    usage_id = UsageKeyField(max_length=255)
+    value = models.TextField(default="null")
+
+    class Meta:
+        app_label = "feedbacktests"
@@ -0,0 +1,106 @@
+"""
+Stubs of the platform APIs used by the instructor dashboard, serving the
+synthetic courses of feedback.synthetic.
+
+`stub_platform(course)` patches the modulestore, enrollment and block
+loading functions of feedback.extensions.filters.
+"""
+
+from contextlib import ExitStack
+from unittest.mock import Mock, patch
+
+from django.db.models import F
+from opaque_keys.edx.keys import UsageKey
+
+from feedback.reconcile import compute_histograms
+
+SCALE_TEXT = ["Excellent", "Good", "Average", "Fair", "Poor"]
+
+
+class StubBlock:
+    """
+    A block of the course outline.
+    """
+
+    def __init__(self, location, display_name, parent=None, vote_aggregate=None):
+        self.location = location
+        self.display_name = display_name
+        self.parent = parent
+        self.vote_aggregate = vote_aggregate
+        self.prompts = [{"likert": "How was it?", "freeform": "Why?"}]
+
+    def get_parent(self):
+        return self.parent
+
+    def get_prompt(self, index=-1):  # pylint: disable=unused-argument
+        return {"scale_text": SCALE_TEXT}
+
+
+class SyntheticEnrollments:
+    """
+    Stand-in for the enrollment queryset of a course, with the fields of
+    CourseEnrollment mapped to those of User.
+    """
+
+    FIELDS = {"user_id": "id", "user__username": "username"}
+
+    def __init__(self, course):
+        self.users = course.users
+
+    def values_list(self, *fields, **kwargs):
+        return self.users.values_list(
+            *(self.FIELDS[field] for field in fields), **kwargs
+        )
+
+    def values(self, *fields):
+        return self.users.annotate(
+            **{field: F(self.FIELDS[field]) for field in fields}
+        ).values(*fields)
+
+
+def stub_platform(course):
+    """
+    Return a context manager patching the platform APIs of the dashboard
+    to serve a SyntheticCourse.
+    """
+    section = StubBlock(None, "Section")
+    subsection = StubBlock(None, "Subsection", parent=section)
+    unit = StubBlock(None, "Unit", parent=subsection)
+    histograms = compute_histograms(course.course_key)
+
+    def get_block_by_usage_id(
+        request, course_id, usage_id, **kwargs
+    ):  # pylint: disable=unused-argument
+        return (
+            StubBlock(
+                UsageKey.from_string(usage_id),
+                "Feedback",
+                parent=unit,
+                vote_aggregate=list(histograms.get(usage_id, [])),
+            ),
+            None,
+        )
+
+    modulestore = Mock()
+    modulestore.return_value.get_items.return_value = [
+        Mock(location=UsageKey.from_string(block_id)) for block_id in course.block_ids
+    ]
+
+    stack = ExitStack()
+    for name, value in {
+        "modulestore": modulestore,
+        "get_user_enrollments": lambda course_id: SyntheticEnrollments(course),
+        "get_block_by_usage_id": get_block_by_usage_id,
+        "get_lms_link_for_item": lambda location: "/courses/jump_to/{}".format(
+            location
+        ),
+    }.items():
+        stack.enter_context(patch("feedback.extensions.filters." + name, value))
+    return stack
+
+
+def stub_course_descriptor(course):
+    """
+    Return a stand-in of the course descriptor given to the dashboard.
+    """
+    return Mock(id=course.course_key, location=Mock(course_key=course.course_key))
@@ -0,0 +1,203 @@
+"""
+Tests for the archival of old feedback.
+"""
+
+import gzip
+import json
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import F, Sum
+from django.test import override_settings
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.archive import archive_feedback
+from feedback.models import (
+    Feedback,
+    FeedbackArchive,
+    FeedbackDailyRollup,
+    ShareFeedbackWith,
+)
+from feedback.reconcile import compute_histograms
+from feedback.rollups import update_rollups
+from feedback.testimonials import query_testimonials
+from feedbacktests.models import CourseOverview
+
+RERUN = CourseKey.from_string("course-v1:edX+V2+1")
+
+
+@pytest.fixture(autouse=True)
+def course_overviews():
+    with override_settings(
+        FEEDBACK_COURSE_OVERVIEW_MODEL="feedbacktests.CourseOverview"
+    ):
+        yield
+
+
+def _end_course(course_key, end=datetime(2020, 1, 1, tzinfo=timezone.utc)):
+    CourseOverview.objects.create(id=course_key, end=end)
+
+
+def _rollup_totals(course_key):
+    return FeedbackDailyRollup.objects.filter(course_key=course_key).aggregate(
+        total=Sum("total_count"), comments=Sum("comment_count"), best=Sum("rating_0")
+    )
+
+
+def test_archive_course(synthetic_course):
+    """The feedback moves to the archive, and stays counted."""
+    course = synthetic_course(learners=5, blocks=2, approved_ratio=0)
+    other = synthetic_course(learners=2, blocks=1)
+    ShareFeedbackWith.bulk_share(
+        Feedback.objects.filter(
+            pk__in=list(course.feedback.values_list("pk", flat=True)[:3])
+        ),
+        [RERUN],
+    )
+    update_rollups()
+    rollups = _rollup_totals(course.course_key)
+    histograms = compute_histograms(course.course_key)
+    shared = set(
+        Feedback.objects.filter(
+            course_key=course.course_key, sharefeedbackwith__isnull=False
+        ).values_list("pk", flat=True)
+    )
+    progress = []
+
+    archived = archive_feedback(
+        [course.course_key], batch_size=4, progress=progress.append
+    )
+
+    assert archived == 10
+    assert progress == [4, 8, 10]
+    assert not Feedback.objects.filter(course_key=course.course_key).exists()
+    assert Feedback.objects.filter(course_key=other.course_key).count() == 2
+    assert FeedbackArchive.objects.count() == 10
+    assert shared and shared == set(
+        FeedbackArchive.objects.exclude(shared_with=[]).values_list("pk", flat=True)
+    )
+    assert _rollup_totals(course.course_key) == rollups
+    assert compute_histograms(course.course_key) == histograms
+    # Recomputing the rollups still counts the archive.
+    update_rollups(full=True)
+    assert _rollup_totals(course.course_key) == rollups
+
+
+def test_keep_testimonials(synthetic_course):
+    """The testimonials of an archived course stay shown in its reruns."""
+    course = synthetic_course(learners=5, blocks=2, shared_with=[RERUN])
+    testimonials = query_testimonials(RERUN)
+    testimonial_ids = {testimonial["id"] for testimonial in testimonials["results"]}
+
+    archived = archive_feedback([course.course_key])
+
+    assert testimonial_ids
+    assert archived == 10 - len(testimonial_ids)
+    assert query_testimonials(RERUN) == testimonials
+    assert testimonial_ids.isdisjoint(
+        FeedbackArchive.objects.values_list("pk", flat=True)
+    )
+
+
+def test_archive_old_feedback(synthetic_course):
+    course = synthetic_course(learners=3, blocks=1, approved_ratio=0)
+    running = synthetic_course(learners=1, blocks=1, approved_ratio=0)
+    _end_course(course.course_key, end=datetime.now(timezone.utc) - timedelta(days=1))
+    _end_course(running.course_key, end=None)
+    old = Feedback.objects.filter(course_key=course.course_key).first()
+    Feedback.objects.filter(pk__in=[old.pk, running.feedback.get().pk]).update(
+        created=datetime(2015, 1, 1, 12, tzinfo=timezone.utc)
+    )
+
+    out = StringIO()
+    call_command("archive_feedback", "--after-years", "3", "--dry-run", stdout=out)
+    assert "Would archive 1 feedback." in out.getvalue()
+    assert not FeedbackArchive.objects.exists()
+
+    # The old feedback of the running course isn't archived, as its
+    # learner could answer again.
+    assert archive_feedback(after_years=3) == 1
+    assert list(FeedbackArchive.objects.values_list("pk", flat=True)) == [old.pk]
+    # Rollups are kept for the archived buckets.
+    assert FeedbackDailyRollup.objects.get(day=date(2015, 1, 1)).total_count == 1
+
+
+def test_archive_named_course_only(synthetic_course):
+    course = synthetic_course(learners=2, blocks=1, approved_ratio=0)
+    ended = synthetic_course(learners=2, blocks=1, approved_ratio=0)
+    _end_course(ended.course_key)
+    Feedback.objects.update(created=datetime(2015, 1, 1, 12, tzinfo=timezone.utc))
+
+    call_command(
+        "archive_feedback",
+        "--course",
+        str(course.course_key),
+        "--after-years",
+        "0",
+        "--ended-courses-days",
+        "0",
+        stdout=StringIO(),
+    )
+
+    assert set(FeedbackArchive.objects.values_list("course_key", flat=True)) == {
+        course.course_key
+    }
+    assert Feedback.objects.filter(course_key=ended.course_key).count() == 2
+
+
+def test_export_archived(tmp_path, synthetic_course):
+    course = synthetic_course(learners=3, blocks=1, approved_ratio=0)
+    ids = set(
+        Feedback.objects.filter(course_key=course.course_key).values_list(
+            "pk", flat=True
+        )
+    )
+    archive_feedback([course.course_key])
+
+    call_command(
+        "export_feedback", str(tmp_path), "--include-archived", stdout=StringIO()
+    )
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    [shard] = manifest["shards"]
+    assert shard["archived"] is True
+    with gzip.open(tmp_path / shard["file"], "rt", encoding="utf-8") as shard_file:
+        lines = [json.loads(line) for line in shard_file]
+    assert {line["id"] for line in lines} == ids
+
+
+def test_incremental_export_archived(tmp_path, synthetic_course):
+    """Feedback archived after the previous export is exported."""
+    course = synthetic_course(learners=3, blocks=1, approved_ratio=0)
+    call_command(
+        "export_feedback",
+        str(tmp_path / "1"),
+        "--incremental",
+        "--include-archived",
+        stdout=StringIO(),
+    )
+    # The feedback was last modified before the watermark, out of its
+    # overlap window.
+    Feedback.objects.update(modified=F("modified") - timedelta(hours=1))
+    ids = set(
+        Feedback.objects.filter(course_key=course.course_key).values_list(
+            "pk", flat=True
+        )
+    )
+    archive_feedback([course.course_key])
+
+    call_command(
+        "export_feedback",
+        str(tmp_path / "2"),
+        "--incremental",
+        "--include-archived",
+        stdout=StringIO(),
+    )
+
+    manifest = json.loads((tmp_path / "2" / "manifest.json").read_text())
+    [shard] = manifest["shards"]
+    assert shard["archived"] is True
+    with gzip.open(tmp_path / "2" / shard["file"], "rt", encoding="utf-8") as lines:
+        assert {json.loads(line)["id"] for line in lines} == ids
@@ -0,0 +1,166 @@
+"""
+Tests for the backfill of the Feedback table from the XBlock user state.
+"""
+
+import json
+from io import StringIO
+
+import pytest
+from mock import patch
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.backfill import is_backfilled, parse_state
+from feedback.models import Feedback
+from feedbacktests.models import StudentModule
+
+COURSE_KEY = CourseKey.from_string("course-v1:edX+Demo+V1")
+
+
+@pytest.fixture
+def student_module(db):  # pylint: disable=unused-argument
+    """Read the user state from the stand-in StudentModule table."""
+    with override_settings(FEEDBACK_STUDENT_MODULE_MODEL="feedbacktests.StudentModule"):
+        yield StudentModule
+
+
+def add_state(username, block, **state):
+    """Store the user state of a feedback block."""
+    return StudentModule.objects.create(
+        student=User.objects.create(username=username),
+        course_id=COURSE_KEY,
+        module_state_key=COURSE_KEY.make_usage_key("feedback", block),
+        module_type="feedback",
+        state=json.dumps(state),
+    )
+
+
+def test_parse_state():
+    """Votes and freeform are extracted from the user state."""
+    assert parse_state('{"user_vote": 2, "user_freeform": "ok"}') == (2, "ok", False)
+    assert parse_state('{"user_vote": -1, "user_freeform": "ok"}') == (
+        None,
+        "ok",
+        False,
+    )
+    assert parse_state('{"user_vote": 1, "consent_to_share": "true"}') == (
+        1,
+        None,
+        True,
+    )
+    assert parse_state('{"user_vote": -1, "user_freeform": ""}') is None
+    assert parse_state("not json") is None
+
+
+def test_backfill_resumes_from_checkpoint(
+    student_module,
+):  # pylint: disable=redefined-outer-name,unused-argument
+    """Rows are upserted in chunks and only new rows are read on resume."""
+    add_state("a", "one", user_vote=0, user_freeform="Great")
+    add_state("b", "one", user_vote=-1, user_freeform="Missing examples")
+    add_state("c", "two", user_vote=-1, user_freeform="")
+
+    call_command("backfill_feedback", "--batch-size", "2", stdout=StringIO())
+
+    assert Feedback.objects.count() == 2
+    feedback = Feedback.objects.get(user__username="b")
+    assert feedback.rating is None
+    assert feedback.feedback == "Missing examples"
+    assert feedback.block_id == str(COURSE_KEY.make_usage_key("feedback", "one"))
+
+    assert is_backfilled(COURSE_KEY)
+    assert is_backfilled(CourseKey.from_string("course-v1:edX+Other+V1"))
+
+    add_state("d", "two", user_vote=4)
+    out = StringIO()
+    call_command("backfill_feedback", stdout=out)
+
+    assert "1 created, 0 updated" in out.getvalue()
+    assert Feedback.objects.get(user__username="d").rating == 4
+
+
+def test_backfill_keeps_newer_feedback(
+    student_module,
+):  # pylint: disable=redefined-outer-name,unused-argument
+    """Feedback saved by the block after the user state isn't overwritten."""
+    state = add_state("a", "one", user_vote=0)
+    StudentModule.objects.filter(pk=state.pk).update(
+        modified=timezone.now() - timezone.timedelta(days=1)
+    )
+    Feedback.objects.create(
+        course_key=COURSE_KEY,
+        user=state.student,
+        block_id=str(state.module_state_key),
+        rating=3,
+    )
+
+    assert not is_backfilled(COURSE_KEY)
+    call_command("backfill_feedback", "--course", str(COURSE_KEY), stdout=StringIO())
+
+    assert Feedback.objects.get().rating == 3
+    assert is_backfilled(COURSE_KEY)
+    assert not is_backfilled(CourseKey.from_string("course-v1:edX+Other+V1"))
+
+
+def test_backfill_updates_only_stale_feedback(
+    student_module,
+):  # pylint: disable=redefined-outer-name,unused-argument
+    """
+    Live submissions, whose user state is saved just after the entry, are
+    left alone; entries the user state changed long after are updated.
+    """
+    live = add_state("live", "one", user_vote=0, user_freeform="Great")
+    stale = add_state("stale", "one", user_vote=1)
+    Feedback.objects.create(
+        course_key=COURSE_KEY,
+        user=live.student,
+        block_id=str(live.module_state_key),
+        block_name="Feedback",
+        rating=0,
+        feedback="Great",
+    )
+    entry = Feedback.objects.create(
+        course_key=COURSE_KEY,
+        user=stale.student,
+        block_id=str(stale.module_state_key),
+        rating=3,
+    )
+    Feedback.objects.filter(pk=entry.pk).update(
+        modified=timezone.now() - timezone.timedelta(days=1)
+    )
+    add_state("new", "one", user_vote=2)
+
+    out = StringIO()
+    call_command("backfill_feedback", stdout=out)
+
+    assert "1 created, 1 updated" in out.getvalue()
+    assert Feedback.objects.get(user__username="stale").rating == 1
+    # The name of the block is copied from its other entries.
+    assert Feedback.objects.get(user__username="new").block_name == "Feedback"
+
+
+def test_backfill_counts_only_inserted_feedback(
+    student_module,
+):  # pylint: disable=redefined-outer-name,unused-argument
+    """Entries the block creates during the backfill aren't counted."""
+    state = add_state("a", "one", user_vote=0)
+    add_state("b", "one", user_vote=1)
+
+    def create_live_entry(block_ids):  # pylint: disable=unused-argument
+        Feedback.objects.create(
+            course_key=COURSE_KEY,
+            user=state.student,
+            block_id=str(state.module_state_key),
+            rating=3,
+        )
+        return {}
+
+    out = StringIO()
+    with patch("feedback.backfill.get_block_names", side_effect=create_live_entry):
+        call_command("backfill_feedback", stdout=out)
+
+    assert "1 created, 0 updated" in out.getvalue()
+    assert Feedback.objects.get(user__username="a").rating == 3
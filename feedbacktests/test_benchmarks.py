@@ -0,0 +1,87 @@
+"""
+Benchmarks of the hot paths of the Feedback XBlock.
+
+Run them with `make benchmark`; see feedbacktests/benchmark.py.
+"""
+
+import json
+import random
+import string
+
+import pytest
+from django.test import override_settings
+from mock import Mock, patch
+
+from feedback.moderation import BlocklistMatcher
+
+
+@pytest.fixture
+def learner_xblock(feedback_xblock):
+    """A feedback block as seen by a learner in the LMS."""
+    feedback_xblock.course_id = "course-v1:edX+Demo+V1"
+    feedback_xblock.xmodule_runtime = Mock(user_id=1, user_is_staff=False)
+    feedback_xblock.location = "block-v1:edX+Demo+V1+type@feedback+block@1"
+    feedback_xblock.runtime.publish = Mock()
+    with patch("feedback.feedback.Feedback"), override_settings(
+        FEEDBACK_RATE_LIMIT_BURST=0
+    ):
+        yield feedback_xblock
+
+
+def post(data):
+    return Mock(method="POST", body=json.dumps(data).encode())
+
+
+def test_get_prompt(benchmark, learner_xblock):  # pylint: disable=redefined-outer-name
+    benchmark("get_prompt", learner_xblock.get_prompt)
+
+
+def test_vote(benchmark, learner_xblock):  # pylint: disable=redefined-outer-name
+    votes = iter(range(10**9))
+    benchmark("vote", lambda: learner_xblock.vote({"vote": next(votes) % 5}))
+
+
+def test_feedback_handler(
+    benchmark, learner_xblock
+):  # pylint: disable=redefined-outer-name
+    # Alternate submissions, so that none of them is skipped as unchanged.
+    submissions = iter(range(10**9))
+    benchmark(
+        "feedback",
+        lambda: learner_xblock.feedback(
+            post({"vote": next(submissions) % 5, "freeform": "Great course"})
+        ),
+    )
+
+
+def test_feedback_handler_unchanged(
+    benchmark, learner_xblock
+):  # pylint: disable=redefined-outer-name
+    benchmark("feedback_unchanged", lambda: learner_xblock.feedback(post({"vote": 1})))
+
+
+def test_student_view(
+    benchmark, learner_xblock
+):  # pylint: disable=redefined-outer-name
+    benchmark("student_view", learner_xblock.student_view)
+
+
+def test_student_view_data(
+    benchmark, learner_xblock
+):  # pylint: disable=redefined-outer-name
+    benchmark("student_view_data", learner_xblock.student_view_data)
+
+
+def test_studio_view(benchmark, learner_xblock):  # pylint: disable=redefined-outer-name
+    benchmark("studio_view", lambda: learner_xblock.studio_view(None))
+
+
+def test_blocklist_check(benchmark):
+    rng = random.Random(0)
+    terms = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        for _ in range(10000)
+    ]
+    matcher = BlocklistMatcher(terms)
+    text = "The videos were clear and the quizzes helped me a lot. " * 5
+    benchmark("blocklist_check", lambda: matcher.find(text, first=True))
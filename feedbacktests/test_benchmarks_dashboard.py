@@ -0,0 +1,80 @@
+"""
+Benchmarks of the instructor dashboard and the admin on large synthetic
+courses.
+
+The course sizes, in learners, are set with `FEEDBACK_BENCHMARK_LEARNERS`,
+e.g. `FEEDBACK_BENCHMARK_LEARNERS=1000,10000,100000 make benchmark`; each
+learner answers the 5 blocks of the course. See feedbacktests/benchmark.py.
+
+The admin benchmarks run with the admin, session and message apps of
+feedback/settings/test.py, whose admin imports feedback.admin and the
+edx-platform modules it needs, as for the rest of the suite.
+"""
+
+import os
+from urllib.parse import urlencode
+
+import pytest
+from django.contrib import admin
+from django.test import RequestFactory
+
+from feedback.admin import FeedbackAdmin
+from feedback.extensions.filters import load_blocks
+from feedback.models import Feedback
+from feedbacktests.synthetic import stub_course_descriptor, stub_platform
+
+LEARNERS = [
+    int(learners)
+    for learners in os.environ.get("FEEDBACK_BENCHMARK_LEARNERS", "1000").split(",")
+]
+ROUNDS = 3
+
+
+@pytest.fixture(params=LEARNERS, ids=str)
+def large_course(
+    request, benchmark, synthetic_course
+):  # pylint: disable=unused-argument
+    """A synthetic course, only generated when benchmarks run."""
+    return synthetic_course(learners=request.param, blocks=5)
+
+
+def test_dashboard(benchmark, large_course):  # pylint: disable=redefined-outer-name
+    course = stub_course_descriptor(large_course)
+    with stub_platform(large_course):
+        benchmark(
+            "dashboard.{}".format(large_course.users.count()),
+            lambda: load_blocks(None, course),
+            rounds=ROUNDS,
+        )
+
+
+def test_admin_changelist(
+    admin_client, benchmark, large_course
+):  # pylint: disable=redefined-outer-name
+    url = "/admin/feedback/feedback/?" + urlencode(
+        {"course_key": str(large_course.course_key)}
+    )
+
+    def changelist():
+        response = admin_client.get(url)
+        assert response.status_code == 200
+
+    benchmark(
+        "admin_changelist.{}".format(large_course.users.count()),
+        changelist,
+        rounds=ROUNDS,
+    )
+
+
+def test_csv_export(
+    benchmark, large_course, admin_user
+):  # pylint: disable=redefined-outer-name
+    model_admin = FeedbackAdmin(Feedback, admin.site)
+    request = RequestFactory().post("/admin/feedback/feedback/")
+    request.user = admin_user
+
+    benchmark(
+        "csv_export.{}".format(large_course.users.count()),
+        lambda: model_admin.export_as_csv(request, large_course.feedback).content,
+        rounds=ROUNDS,
+    )
@@ -0,0 +1,90 @@
+"""
+Tests for the export of all the feedback to per-course shards.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F
+
+from feedback.bulk_export import SHARD_COLUMNS
+from feedback.models import Feedback, ShareFeedbackWith
+
+
+def _manifest(directory):
+    return json.loads((directory / "manifest.json").read_text())
+
+
+def _lines(directory, shard):
+    path = directory / shard["file"]
+    assert hashlib.sha256(path.read_bytes()).hexdigest() == shard["sha256"]
+    with gzip.open(path, "rt", encoding="utf-8") as shard_file:
+        return [json.loads(line) for line in shard_file]
+
+
+def test_full_export(tmp_path, synthetic_course):
+    first = synthetic_course(learners=4, blocks=2, approved_ratio=1.0)
+    synthetic_course(
+        learners=3, blocks=1, approved_ratio=1.0, shared_with=["course-v1:edX+V2+1"]
+    )
+
+    call_command("export_feedback", str(tmp_path), stdout=StringIO())
+
+    manifest = _manifest(tmp_path)
+    assert manifest["incremental"] is False
+    assert manifest["columns"] == [key for key, _ in SHARD_COLUMNS]
+    assert manifest["total_rows"] == Feedback.objects.count() == 11
+    assert [shard["rows"] for shard in manifest["shards"]] == [8, 3]
+    assert {line["course_id"] for line in _lines(tmp_path, manifest["shards"][0])} == {
+        str(first.course_key)
+    }
+    shared = _lines(tmp_path, manifest["shards"][1])
+    assert sum(line["shared_with"] == ["course-v1:edX+V2+1"] for line in shared) == (
+        ShareFeedbackWith.objects.count()
+    )
+
+
+def test_incremental_export(tmp_path, synthetic_course):
+    """Only the rows changed since the previous export are exported."""
+    course = synthetic_course(learners=4, blocks=2)
+    call_command("export_feedback", str(tmp_path / "1"), stdout=StringIO())
+
+    # Move the rows out of the overlap window of the watermark.
+    Feedback.objects.update(modified=F("modified") - timedelta(hours=1))
+    changed = Feedback.objects.filter(course_key=course.course_key).first()
+    changed.feedback = "Changed"
+    changed.save()
+    call_command(
+        "export_feedback", str(tmp_path / "2"), "--incremental", stdout=StringIO()
+    )
+
+    manifest = _manifest(tmp_path / "2")
+    assert manifest["incremental"] is True
+    [shard] = manifest["shards"]
+    assert [line["id"] for line in _lines(tmp_path / "2", shard)] == [changed.pk]
+
+
+def test_csv_shard(tmp_path, synthetic_course):
+    course = synthetic_course(learners=2, blocks=1)
+
+    call_command(
+        "export_feedback",
+        str(tmp_path),
+        "--format",
+        "csv",
+        "--course",
+        str(course.course_key),
+        stdout=StringIO(),
+    )
+
+    [shard] = _manifest(tmp_path)["shards"]
+    with gzip.open(tmp_path / shard["file"], "rt", encoding="utf-8") as shard_file:
+        rows = list(csv.reader(io.StringIO(shard_file.read())))
+    assert rows[0] == [label for _, label in SHARD_COLUMNS]
+    assert len(rows) == 3
@@ -0,0 +1,108 @@
+"""
+Tests for the tracking event payloads.
+"""
+
+import json
+import random
+
+import pytest
+from django.test import override_settings
+
+from feedback.events import diff_summary, freeform_event_payload, text_digest
+
+SENTENCES = [
+    "The lectures were clear and well paced.",
+    "I found the second quiz too hard compared to the material covered.",
+    "The videos helped me understand the examples much better than the readings.",
+    "Some of the exercises had typos that made them confusing.",
+    "I would have liked more worked examples before the assessment.",
+    "The instructor explained the key concepts with great real world cases.",
+    "It took me about three hours to finish this unit, longer than announced.",
+    "Thank you, this was one of the most useful sections of the course!",
+]
+
+
+def comment_corpus(size=500, seed=0):
+    """
+    Return (old, new) feedback text pairs: first submissions of one to
+    twelve sentences, and edits appending a sentence to the previous text.
+    """
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(size):
+        text = " ".join(rng.choices(SENTENCES, k=rng.randint(1, 12)))
+        if rng.random() < 0.3:
+            pairs.append((text, text + " " + rng.choice(SENTENCES)))
+        else:
+            pairs.append(("", text))
+    return pairs
+
+
+def test_full_mode_is_unchanged():
+    """The default payload carries both texts."""
+    assert freeform_event_payload("old", "new") == {
+        "old_freeform": "old",
+        "new_freeform": "new",
+    }
+
+
+@override_settings(
+    FEEDBACK_FREEFORM_EVENT_MODE="truncated", FEEDBACK_FREEFORM_EVENT_MAX_LENGTH=5
+)
+def test_truncated_mode():
+    """Texts are cut, with their full lengths."""
+    assert freeform_event_payload(None, "Great course") == {
+        "mode": "truncated",
+        "old_freeform": "",
+        "new_freeform": "Great",
+        "old_freeform_length": 0,
+        "new_freeform_length": 12,
+        "truncated": True,
+    }
+
+
+@override_settings(FEEDBACK_FREEFORM_EVENT_MODE="digest")
+def test_digest_mode():
+    """Texts are replaced with digests matching the stored text."""
+    payload = freeform_event_payload("Great course", "Great course, hard quiz")
+
+    assert payload["new_freeform_digest"] == text_digest("Great course, hard quiz")
+    assert payload["words_added"] == 3
+    assert payload["words_removed"] == 1
+    assert payload["words_kept"] == 1
+    assert diff_summary("", "a b") == {
+        "words_added": 2,
+        "words_removed": 0,
+        "words_kept": 0,
+    }
+
+
+@pytest.mark.parametrize(
+    "mode, max_ratio", [("full", 1), ("truncated", 0.7), ("digest", 0.6)]
+)
+def test_event_size_reduction(mode, max_ratio):
+    """Compact payloads reduce the size of the events of a comment corpus."""
+    corpus = comment_corpus()
+
+    def total_size(mode):
+        return sum(
+            len(json.dumps(freeform_event_payload(old, new, mode=mode)))
+            for old, new in corpus
+        )
+
+    ratio = total_size(mode) / total_size("full")
+    print("{}: {:.0%} of the full event size".format(mode, ratio))
+    assert ratio <= max_ratio
+
+
+def test_diff_summary_of_long_texts():
+    """Long changed parts are counted as replaced, without diffing them."""
+    words = ["word{}".format(index % 50) for index in range(5000)]
+    old, new = " ".join(words), " ".join(reversed(words))
+
+    assert diff_summary(old, old + " more") == {
+        "words_added": 1,
+        "words_removed": 0,
+        "words_kept": 5000,
+    }
+    assert diff_summary("start " + old, "start " + new)["words_kept"] == 1
@@ -0,0 +1,228 @@
+"""
+Tests for the background exports of the feedback.
+"""
+
+import csv
+import gzip
+import io
+import json
+import re
+import time
+from datetime import timedelta
+from urllib.parse import urlencode
+from unittest.mock import Mock, patch
+
+import pytest
+from django.contrib import admin
+from django.test import override_settings
+from django.utils import timezone
+
+from feedback import exports
+from feedback.admin import FeedbackAdmin
+from feedback.models import Feedback, FeedbackExportJob
+from feedback.synthetic import username_prefix
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path):
+    with override_settings(FEEDBACK_EXPORT_DIR=str(tmp_path)):
+        yield tmp_path
+
+
+def _read(job):
+    with job.file.open("rb") as export_file:
+        return gzip.decompress(export_file.read()).decode("utf-8")
+
+
+def _create_job(filters, export_format):
+    with patch("feedback.exports.submit_job"):
+        return exports.create_job(filters, export_format)
+
+
+def test_csv_export(synthetic_course):
+    course = synthetic_course(learners=5, blocks=2)
+    queryset = Feedback.objects.filter(course_key=course.course_key)
+    job = _create_job({"course_key": str(course.course_key)}, FeedbackExportJob.CSV)
+
+    with patch.object(exports, "CHUNK_SIZE", 3):
+        job = exports.run_job(job.pk)
+
+    assert job.status == FeedbackExportJob.SUCCEEDED
+    assert job.total_rows == job.rows_written == queryset.count() == 10
+    rows = list(csv.reader(io.StringIO(_read(job))))
+    assert rows[0] == exports.CSV_HEADER
+    assert len(rows) == 11
+    assert {row[0] for row in rows[1:]} == {str(course.course_key)}
+
+
+def test_export_file_is_private(export_dir, synthetic_course):
+    course = synthetic_course(learners=1, blocks=1)
+    job = exports.run_job(
+        _create_job({"course_key": str(course.course_key)}, FeedbackExportJob.CSV).pk
+    )
+
+    assert (export_dir / job.file.name).is_file()
+    assert re.fullmatch(
+        r"feedback-exports/feedback-export-{}-[0-9a-f]{{32}}\.csv\.gz".format(job.pk),
+        job.file.name,
+    )
+    with pytest.raises(ValueError):
+        job.file.url  # pylint: disable=pointless-statement
+
+
+def test_jsonl_export(synthetic_course):
+    course = synthetic_course(learners=5, blocks=2)
+    queryset = Feedback.objects.filter(course_key=course.course_key, rating=0)
+    job = exports.run_job(
+        _create_job(
+            {"id__in": list(queryset.values_list("pk", flat=True))},
+            FeedbackExportJob.JSONL,
+        ).pk
+    )
+
+    lines = [json.loads(line) for line in _read(job).splitlines()]
+    assert len(lines) == queryset.count() == job.rows_written
+    assert [key for key, _ in exports.EXPORT_COLUMNS] == list(lines[0])
+    assert {line["rating"] for line in lines} == {5}
+
+
+def test_failed_export(db):  # pylint: disable=unused-argument
+    job = FeedbackExportJob.objects.create(
+        export_format=FeedbackExportJob.CSV, filters={"user__email": "a@example.com"}
+    )
+
+    job = exports.run_job(job.pk)
+
+    assert job.status == FeedbackExportJob.FAILED
+    assert job.error
+    assert not job.file
+    # A job runs once.
+    assert exports.run_job(job.pk).status == FeedbackExportJob.FAILED
+
+
+def test_requeue_stale_jobs(
+    db, django_capture_on_commit_callbacks
+):  # pylint: disable=unused-argument
+    jobs = [_create_job({}, FeedbackExportJob.CSV) for _ in range(3)]
+    FeedbackExportJob.objects.filter(pk=jobs[1].pk).update(
+        status=FeedbackExportJob.RUNNING
+    )
+    FeedbackExportJob.objects.filter(pk=jobs[2].pk).update(
+        status=FeedbackExportJob.SUCCEEDED
+    )
+    later = timezone.now() + timedelta(hours=2)
+
+    with patch("feedback.exports.submit_job") as submit_job:
+        with django_capture_on_commit_callbacks(execute=True):
+            assert exports.requeue_stale_jobs() == []
+            assert exports.requeue_stale_jobs(now=later) == [jobs[0].pk, jobs[1].pk]
+            assert exports.requeue_stale_jobs(now=later) == []
+
+    assert [call.args for call in submit_job.call_args_list] == [
+        (jobs[0].pk,),
+        (jobs[1].pk,),
+    ]
+    assert FeedbackExportJob.objects.get(pk=jobs[1].pk).status == "pending"
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(FEEDBACK_EXPORT_STALE_TIMEOUT=0.4)
+def test_slow_job_is_not_requeued(synthetic_course):
+    course = synthetic_course(learners=2, blocks=1)
+    job = _create_job({"course_key": str(course.course_key)}, FeedbackExportJob.CSV)
+    get_job_queryset = exports.get_job_queryset
+    requeued = []
+
+    def slow_get_job_queryset(job):
+        # E.g. a long count, before the first progress of the job.
+        time.sleep(0.6)
+        requeued.extend(exports.requeue_stale_jobs())
+        return get_job_queryset(job)
+
+    with patch.object(exports, "get_job_queryset", slow_get_job_queryset):
+        job = exports.run_job(job.pk)
+
+    assert requeued == []
+    assert job.status == FeedbackExportJob.SUCCEEDED
+    assert job.rows_written == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_thread_backend(synthetic_course):
+    course = synthetic_course(learners=3, blocks=1)
+    job = _create_job({"course_key": str(course.course_key)}, FeedbackExportJob.CSV)
+
+    future = exports.submit_job(job.pk)
+
+    assert future.result(timeout=30).status == FeedbackExportJob.SUCCEEDED
+    job.refresh_from_db()
+    assert job.rows_written == 3
+
+
+def test_celery_backend():
+    celery_app = Mock()
+    with override_settings(FEEDBACK_EXPORT_BACKEND="celery"), patch.object(
+        exports, "celery_app", celery_app
+    ):
+        assert exports.submit_job(42) is None
+
+    celery_app.send_task.assert_called_once_with(
+        "feedback.tasks.run_export_job", args=[42]
+    )
+
+
+def test_admin_download(admin_client, synthetic_course):
+    course = synthetic_course(learners=2, blocks=1)
+    job = exports.run_job(
+        _create_job({"course_key": str(course.course_key)}, FeedbackExportJob.CSV).pk
+    )
+
+    response = admin_client.get(
+        "/admin/feedback/feedbackexportjob/{}/download/".format(job.pk)
+    )
+
+    assert response.status_code == 200
+    assert "attachment" in response["Content-Disposition"]
+    assert gzip.decompress(b"".join(response.streaming_content)).startswith(
+        b"Course ID,"
+    )
+
+
+def test_admin_export_filters(rf, synthetic_course):
+    model_admin = FeedbackAdmin(Feedback, admin.site)
+    course = synthetic_course(learners=2, blocks=1)
+    queryset = Feedback.objects.filter(course_key=course.course_key)
+    url = "/admin/feedback/feedback/?" + urlencode(
+        {"course_key__exact": str(course.course_key), "is_approved__exact": 0, "o": 1}
+    )
+
+    request = rf.post(url, {"select_across": "1"})
+    assert model_admin._get_export_filters(request, queryset) == {
+        "course_key": str(course.course_key),
+        "is_approved": False,
+    }
+    request = rf.post(url, {"select_across": "0"})
+    assert model_admin._get_export_filters(request, queryset) == {
+        "id__in": list(queryset.values_list("pk", flat=True))
+    }
+    request = rf.post(url + "&user__email=a@example.com", {"select_across": "1"})
+    with pytest.raises(ValueError):
+        model_admin._get_export_filters(request, queryset)
+
+
+def test_admin_export_search(rf, synthetic_course):
+    model_admin = FeedbackAdmin(Feedback, admin.site)
+    course = synthetic_course(learners=2, blocks=1)
+    username = username_prefix(course.course_key) + "1"
+    url = "/admin/feedback/feedback/?" + urlencode(
+        {"course_key__exact": str(course.course_key), "q": username, "p": 1}
+    )
+
+    filters = model_admin._get_export_filters(
+        rf.post(url, {"select_across": "1"}), Feedback.objects.all()
+    )
+    job = exports.run_job(_create_job(filters, FeedbackExportJob.JSONL).pk)
+
+    assert filters == {"course_key": str(course.course_key), "search": username}
+    lines = [json.loads(line) for line in _read(job).splitlines()]
+    assert [line["user"] for line in lines] == [username]
@@ -2,7 +2,14 @@
 Tests for the Feedback XBlock with heavy mocking.
 """
 
-from mock import Mock
+import json
+
+from django.test import override_settings
+from mock import Mock, patch
+from webob import Request
+
+from feedback.aggregates import invalidate_aggregate
+from feedback.feedback import FeedbackXBlock
 
 
 def test_template_content(feedback_xblock):
@@ -62,3 +69,127 @@ def test_feedback_method(feedback_xblock):
     assert (
         response.status_code == 200 and response.json == expected_response_json
     ), response.json
+
+
+def test_feedback_method_skips_unchanged_submissions(feedback_xblock):
+    """Re-submitting the same state writes nothing and publishes no event"""
+    feedback_xblock.course_id = "course-v1:edX+Demo+V1"
+    feedback_xblock.xmodule_runtime = Mock(user_id=1)
+    feedback_xblock.location = "block-v1:edX+Demo+V1+type@feedback+block@1"
+    feedback_xblock.runtime.publish = Mock()
+
+    def submit(data):
+        request = Mock(method="POST", body=json.dumps(data).encode())
+        return feedback_xblock.feedback(request).json
+
+    with patch("feedback.feedback.Feedback") as feedback_model:
+        submit({"vote": 1})
+        submit({"freeform": "yes", "consent_to_share": True})
+        response = submit({"vote": 1})
+        submit({"freeform": "yes", "consent_to_share": True})
+
+        assert feedback_model.create_or_update.call_count == 2
+        assert feedback_xblock.runtime.publish.call_count == 2
+        assert feedback_xblock.vote_aggregate == [0, 1, 0, 0, 0]
+        assert response["vote"] == 1 and response["freeform"] == "yes"
+
+        submit({"freeform": "yes", "consent_to_share": False})
+        assert feedback_model.create_or_update.call_count == 3
+        assert feedback_model.create_or_update.call_args.args[6] is False
+        assert feedback_xblock.runtime.publish.call_count == 2
+
+        submit({"freeform": "yes", "consent_to_share": "false"})
+        assert feedback_model.create_or_update.call_count == 3
+        submit({"freeform": "yes", "consent_to_share": "true"})
+        assert feedback_model.create_or_update.call_args.args[6] is True
+
+
+def test_submit_method_ignores_retries(feedback_xblock):
+    """Vote, text and consent are stored at once, and retries are ignored"""
+    feedback_xblock.course_id = "course-v1:edX+Demo+V1"
+    feedback_xblock.xmodule_runtime = Mock(user_id=1)
+    feedback_xblock.location = "block-v1:edX+Demo+V1+type@feedback+block@1"
+    feedback_xblock.runtime.publish = Mock()
+
+    def submit(data):
+        request = Mock(method="POST", body=json.dumps(data).encode())
+        return feedback_xblock.submit(request).json
+
+    with patch("feedback.feedback.Feedback") as feedback_model:
+        first = {"submission_id": "a", "vote": 1, "freeform": "yes"}
+        response = submit(dict(first, consent_to_share=True))
+        submit({"submission_id": "b", "vote": 2})
+        retried = submit(first)
+
+        assert feedback_model.create_or_update.call_count == 2
+        assert feedback_model.create_or_update.call_args_list[0].args[4:7] == (
+            1,
+            "yes",
+            True,
+        )
+        assert response["response"] == "Thank you for your feedback!"
+        assert retried["vote"] == 2 and retried["freeform"] == "yes"
+        assert feedback_xblock.vote_aggregate == [0, 0, 1, 0, 0]
+
+
+def test_vote_aggregate_cache(feedback_xblock):
+    """Aggregates are read from the cache, and votes write through it"""
+    usage_id = feedback_xblock.scope_ids.usage_id
+    invalidate_aggregate(usage_id)
+    feedback_xblock.vote_aggregate = [1, 0, 0, 0, 0]
+    assert feedback_xblock.get_vote_aggregate() == [1, 0, 0, 0, 0]
+
+    feedback_xblock.vote_aggregate = [2, 0, 0, 0, 0]
+    assert feedback_xblock.get_vote_aggregate() == [1, 0, 0, 0, 0]
+
+    feedback_xblock.vote({"vote": 3})
+    assert feedback_xblock.get_vote_aggregate() == [2, 0, 0, 1, 0]
+
+    with override_settings(FEEDBACK_AGGREGATE_CACHE_TIMEOUT=0):
+        feedback_xblock.vote_aggregate = [5, 0, 0, 1, 0]
+        assert feedback_xblock.get_vote_aggregate() == [5, 0, 0, 1, 0]
+
+
+def test_aggregate_handler_etag(feedback_xblock):
+    """Polls of an unchanged aggregate get a 304 without reading it"""
+    feedback_xblock.show_aggregate_to_students = True
+    feedback_xblock.vote({"vote": 1})
+
+    response = feedback_xblock.aggregate(Request.blank("/"))
+    assert response.status_code == 200
+    assert response.json == {"aggregate": [0, 1, 0, 0, 0]}
+
+    with patch.object(FeedbackXBlock, "get_vote_aggregate") as get_vote_aggregate:
+        response = feedback_xblock.aggregate(
+            Request.blank("/", if_none_match=response.etag)
+        )
+    assert response.status_code == 304
+    get_vote_aggregate.assert_not_called()
+
+    etag = response.etag
+    feedback_xblock.vote({"vote": 2})
+    response = feedback_xblock.aggregate(Request.blank("/", if_none_match=etag))
+    assert response.status_code == 200
+    assert response.json == {"aggregate": [0, 0, 1, 0, 0]}
+
+    feedback_xblock.show_aggregate_to_students = False
+    feedback_xblock.xmodule_runtime = Mock(user_is_staff=False)
+    assert feedback_xblock.aggregate(Request.blank("/")).status_code == 403
+
+
+def test_student_view_data(feedback_xblock):
+    """The student view data is compact JSON of the learner state"""
+    feedback_xblock.xmodule_runtime = Mock(user_is_staff=False)
+    feedback_xblock.user_vote = 1
+    feedback_xblock.user_freeform = "yes"
+
+    data = feedback_xblock.student_view_data()
+
+    assert data["scale_text"] == ["Excellent", "Good", "Average", "Fair", "Poor"]
+    assert data["user_vote"] == 1 and data["user_freeform"] == "yes"
+    assert data["shown"] is True
+    assert "aggregate" not in data
+    assert len(json.dumps(data)) < 1000
+
+    feedback_xblock.show_aggregate_to_students = True
+    assert len(feedback_xblock.student_view_data()["aggregate"]) == 5
@@ -4,10 +4,14 @@ Test for the instructor dashboard filters.
 
 from unittest import TestCase
 from unittest.mock import Mock, patch
+from django.contrib.auth.models import User
 from django.test.utils import override_settings
 
 
-from feedback.extensions.filters import AddFeedbackTab, load_xblock_answers
+from feedback.extensions.filters import AddFeedbackTab, load_feedback_answers
+from feedback.models import Feedback
+
+BLOCK_ID = "block-v1:edX+Demo+V1+type@feedback+block@1"
 
 
 class TestFilters(TestCase):
@@ -21,6 +25,7 @@ class TestFilters(TestCase):
         """
         self.filter = AddFeedbackTab(filter_type=Mock(), running_pipeline=Mock())
 
+    @patch("feedback.extensions.filters.get_course_themes", Mock(return_value=None))
     @patch("feedback.extensions.filters.get_user_enrollments")
     @patch("feedback.extensions.filters.get_block_by_usage_id")
     @patch("feedback.extensions.filters.modulestore")
@@ -42,15 +47,17 @@ class TestFilters(TestCase):
         get_block_by_usage_id_mock.assert_not_called()
         get_user_enrollments_mock.assert_not_called()
 
+    @patch("feedback.extensions.filters.get_course_themes", Mock(return_value=None))
+    @patch("feedback.extensions.filters.is_backfilled", Mock(return_value=True))
     @patch("feedback.extensions.filters.get_lms_link_for_item")
     @patch("feedback.extensions.filters.get_user_enrollments")
     @patch("feedback.extensions.filters.get_block_by_usage_id")
-    @patch("feedback.extensions.filters.load_single_xblock")
+    @patch("feedback.extensions.filters.load_feedback_answers")
     @patch("feedback.extensions.filters.modulestore")
     def test_run_filter(
         self,
         modulestore_mock,
-        load_single_xblock_mock,
+        load_feedback_answers_mock,
         get_block_by_usage_id_mock,
         get_user_enrollments_mock,
         get_lms_link_for_item_mock,
@@ -71,10 +78,13 @@ class TestFilters(TestCase):
         block_mock.get_prompt.return_value = {"scale_text": ["test-scale-text"]}
         get_block_by_usage_id_mock.return_value = block_mock, None
         get_lms_link_for_item_mock.return_value = "test-url"
-        load_single_xblock_mock.return_value = Mock(
-            user_vote=1,
-            user_freeform="test-user-freeform",
-        )
+        load_feedback_answers_mock.return_value = [
+            {
+                "username": "test-username",
+                "user_vote": "test-scale-text",
+                "user_freeform": "test-user-freeform",
+            }
+        ]
 
         result = self.filter.run_filter(context, template_name)
 
@@ -82,67 +92,126 @@ class TestFilters(TestCase):
         get_user_enrollments_mock.assert_called_once()
         self.assertEqual(1, len(result.get("context", {})["sections"]))
 
-    @override_settings(FEATURES={"ENABLE_FEEDBACK_INSTRUCTOR_VIEW": False})
-    def test_run_filter_disable(self):
-        context = {"course": Mock(id="test-course-id"), "sections": []}
-        template_name = "test-template-name"
-
-        new_context = self.filter.run_filter(context, template_name)["context"]
-
-        self.assertEqual(context, new_context)
-
+    @patch("feedback.extensions.filters.get_course_themes", Mock(return_value=None))
+    @patch("feedback.extensions.filters.is_backfilled", Mock(return_value=False))
+    @patch("feedback.extensions.filters.get_lms_link_for_item", Mock())
+    @patch("feedback.extensions.filters.get_user_enrollments")
+    @patch("feedback.extensions.filters.get_block_by_usage_id")
     @patch("feedback.extensions.filters.load_single_xblock")
-    def test_load_xblock_answers(self, load_single_xblock_mock):
-        request_mock = Mock()
-        students = [(1, "test-username")]
-        course_id = "test-course-id"
-        block_id = "test-block-id"
-        course = Mock()
-
-        single_block = Mock(
-            user_vote=0,
-            user_freeform="test-user-freeform",
-        )
-        single_block.get_prompt.return_value = {"scale_text": ["test-scale-text"]}
-
-        load_single_xblock_mock.return_value = single_block
+    @patch("feedback.extensions.filters.modulestore")
+    def test_run_filter_before_backfill(
+        self,
+        modulestore_mock,
+        load_single_xblock_mock,
+        get_block_by_usage_id_mock,
+        get_user_enrollments_mock,
+    ):
+        """
+        Check the answers are read from the user state of the learners until
+        the course is backfilled.
+        """
+        modulestore_mock().get_items.return_value = [Mock(location="test-location")]
+        context = {"course": Mock(id="test-course-id"), "sections": []}
+        get_user_enrollments_mock().values_list.return_value = [
+            (1, "student1"),
+            (2, "student2"),
+        ]
+        block_mock = Mock(vote_aggregate=[])
+        block_mock.get_prompt.return_value = {"scale_text": ["Excellent"]}
+        get_block_by_usage_id_mock.return_value = block_mock, None
+        load_single_xblock_mock.side_effect = [
+            Mock(user_freeform="Great", user_vote=0, get_prompt=block_mock.get_prompt),
+            Mock(user_freeform="", user_vote=-1),
+        ]
 
-        answers = load_xblock_answers(
-            request_mock, students, course_id, block_id, course
-        )
+        result = self.filter.run_filter(context, "test-template-name")
 
         self.assertEqual(
             [
                 {
-                    "username": "test-username",
-                    "user_vote": "test-scale-text",
-                    "user_freeform": "test-user-freeform",
+                    "username": "student1",
+                    "user_vote": "Excellent",
+                    "user_freeform": "Great",
                 }
             ],
-            answers,
+            result["context"]["blocks"][0]["answers"],
         )
 
-    @patch("feedback.extensions.filters.load_single_xblock")
-    def test_load_xblock_answers_skip_empty(self, load_single_xblock_mock):
-        request_mock = Mock()
-        students = [(1, "test-username")]
-        course_id = "test-course-id"
-        block_id = "test-block-id"
-        course = Mock()
-
-        single_block = Mock(
-            user_vote=-1,
-            user_freeform="",
-        )
-        single_block.get_prompt.return_value = {"scale_text": ["test-scale-text"]}
+    @override_settings(FEATURES={"ENABLE_FEEDBACK_INSTRUCTOR_VIEW": False})
+    def test_run_filter_disable(self):
+        context = {"course": Mock(id="test-course-id"), "sections": []}
+        template_name = "test-template-name"
 
-        load_single_xblock_mock.return_value = single_block
+        new_context = self.filter.run_filter(context, template_name)["context"]
 
-        answers = load_xblock_answers(
-            request_mock, students, course_id, block_id, course
-        )
+        self.assertEqual(context, new_context)
 
-        self.assertEqual(
-            [],
-            answers,
+
+def test_load_feedback_answers(db):  # pylint: disable=unused-argument
+    """The latest answers with a comment are read from the Feedback table."""
+    students = []
+    for index, (rating, text) in enumerate(
+        [(0, "test-user-freeform"), (None, "no vote"), (1, ""), (2, None)]
+    ):
+        user = User.objects.create(username="student{}".format(index))
+        students.append(user.id)
+        Feedback.objects.create(
+            course_key="course-v1:edX+Demo+V1",
+            user=user,
+            block_id=BLOCK_ID,
+            rating=rating,
+            feedback=text,
+        )
+    other = User.objects.create(username="not-enrolled")
+    Feedback.objects.create(
+        course_key="course-v1:edX+Demo+V1",
+        user=other,
+        block_id=BLOCK_ID,
+        rating=0,
+        feedback="not enrolled",
+    )
+    Feedback.objects.create(
+        course_key="course-v1:edX+Other+V1",
+        user_id=students[0],
+        block_id=BLOCK_ID,
+        rating=0,
+        feedback="other course",
+    )
+
+    answers = load_feedback_answers(
+        "course-v1:edX+Demo+V1",
+        students,
+        BLOCK_ID,
+        ["test-scale-text", "Good", "Average"],
+    )
+
+    assert answers == [
+        {
+            "username": "student0",
+            "user_vote": "test-scale-text",
+            "user_freeform": "test-user-freeform",
+        },
+        {"username": "student1", "user_vote": "No vote", "user_freeform": "no vote"},
+    ]
+
+
+@patch("feedback.extensions.filters.ANSWERS_SHOWN", 2)
+def test_load_feedback_answers_latest(db):  # pylint: disable=unused-argument
+    """Only the latest answers are loaded, oldest first."""
+    students = []
+    for index in range(4):
+        user = User.objects.create(username="student{}".format(index))
+        students.append(user.id)
+        Feedback.objects.create(
+            course_key="course-v1:edX+Demo+V1",
+            user=user,
+            block_id=BLOCK_ID,
+            rating=0,
+            feedback="answer {}".format(index),
         )
+
+    answers = load_feedback_answers(
+        "course-v1:edX+Demo+V1", students, BLOCK_ID, ["Excellent"]
+    )
+
+    assert [answer["user_freeform"] for answer in answers] == ["answer 2", "answer 3"]
@@ -0,0 +1,126 @@
+"""
+Tests for the timings and counters of the feedback block.
+"""
+
+import json
+import logging
+import socket
+from unittest.mock import Mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+
+from feedback import instrumentation
+from feedback.extensions.filters import load_blocks
+from feedbacktests.synthetic import stub_course_descriptor, stub_platform
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def memory_sink():
+    """The in-memory sink, emptied."""
+    with override_settings(FEEDBACK_INSTRUMENTATION="memory"):
+        sink = instrumentation.get_sink()
+        sink.clear()
+        yield sink
+
+
+def test_disabled():
+    """Nothing is recorded without the setting."""
+    with override_settings(FEEDBACK_INSTRUMENTATION=None):
+        assert instrumentation.get_sink() is None
+        with instrumentation.timer("disabled"):
+            pass
+        instrumentation.increment("disabled")
+
+
+def test_timer_and_counters(memory_sink):  # pylint: disable=redefined-outer-name
+    @instrumentation.timer("decorated")
+    def decorated(value):
+        return value
+
+    with instrumentation.timer("block"):
+        pass
+    assert decorated(1) == 1
+    assert decorated(2) == 2
+    instrumentation.increment("cache.test.hit", 3)
+    instrumentation.increment("cache.test.miss")
+    instrumentation.record_throughput("export", 100, 0.5)
+
+    assert len(memory_sink.timings["block"]) == 1
+    assert len(memory_sink.timings["decorated"]) == 2
+    assert memory_sink.hit_rate("cache.test") == 0.75
+    assert memory_sink.hit_rate("cache.other") is None
+    assert memory_sink.counters["export.rows"] == 100
+    assert memory_sink.gauges["export.rows_per_second"] == 200
+
+
+def test_logging_sink(caplog):
+    with override_settings(FEEDBACK_INSTRUMENTATION="logging"):
+        with caplog.at_level(logging.INFO, logger="feedback.instrumentation"):
+            instrumentation.increment("submissions")
+
+    assert "feedback.submissions: +1" in caplog.text
+
+
+def test_statsd_sink():
+    """Metrics are sent as StatsD datagrams."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(1)
+    with override_settings(
+        FEEDBACK_INSTRUMENTATION="statsd",
+        FEEDBACK_INSTRUMENTATION_PREFIX="lms.feedback",
+        FEEDBACK_STATSD_HOST="127.0.0.1",
+        FEEDBACK_STATSD_PORT=server.getsockname()[1],
+    ):
+        instrumentation.increment("submissions")
+        instrumentation.gauge("queue", 4)
+
+    try:
+        assert server.recv(512) == b"lms.feedback.submissions:1|c"
+        assert server.recv(512) == b"lms.feedback.queue:4|g"
+    finally:
+        server.close()
+
+
+def test_block_metrics(
+    memory_sink, feedback_xblock, db
+):  # pylint: disable=redefined-outer-name, unused-argument
+    """Handlers, database writes and cache lookups are measured."""
+    feedback_xblock.course_id = "course-v1:edX+Demo+V1"
+    feedback_xblock.xmodule_runtime = Mock(
+        user_id=User.objects.create(username="student").id
+    )
+    feedback_xblock.location = "block-v1:edX+Demo+V1+type@feedback+block@1"
+    feedback_xblock.runtime.publish = Mock()
+
+    feedback_xblock.feedback(Mock(method="POST", body=json.dumps({"vote": 1}).encode()))
+
+    assert len(memory_sink.timings["handler.feedback"]) == 1
+    assert len(memory_sink.timings["db.create_or_update"]) == 1
+
+    cache.clear()
+    memory_sink.clear()
+    feedback_xblock.get_vote_aggregate()
+    feedback_xblock.get_vote_aggregate()
+
+    assert memory_sink.hit_rate("cache.aggregate") == 0.5
+
+
+def test_dashboard_metrics(
+    memory_sink, synthetic_course
+):  # pylint: disable=redefined-outer-name
+    course = synthetic_course(learners=5, blocks=3)
+
+    with stub_platform(course):
+        load_blocks(None, stub_course_descriptor(course))
+
+    assert len(memory_sink.timings["dashboard.build"]) == 1
+    assert len(memory_sink.timings["dashboard.block"]) == 3
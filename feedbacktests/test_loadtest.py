@@ -0,0 +1,31 @@
+"""
+Tests for the load test harness of the feedback handler.
+"""
+
+from feedbacktests.loadtest import LoadTestConfig, format_report, percentile, run
+
+
+def test_single_thread(transactional_db):  # pylint: disable=unused-argument
+    """Without concurrency, the aggregate counts every voter."""
+    report = run(LoadTestConfig(learners=10, votes=2, threads=1, backend="workbench"))
+
+    assert report["requests"] == 20
+    assert report["errors"] == {}
+    assert report["voters"] == report["aggregate_total"] == 10
+    assert report["feedback_table_total"] == 10
+    assert report["lost_votes"] == 0
+    assert "10 voters, aggregate 10" in format_report(report)
+
+
+def test_threads(transactional_db):  # pylint: disable=unused-argument
+    report = run(LoadTestConfig(learners=20, threads=4, backend="memory"))
+
+    assert report["voters"] == 20
+    assert report["aggregate_total"] + report["lost_votes"] == 20
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([3], 99) == 3
+    assert percentile(list(range(1, 102)), 50) == 51
@@ -0,0 +1,23 @@
+"""
+Tests for the feedback models.
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.models import Feedback
+
+COURSE_KEY = CourseKey.from_string("course-v1:edX+Demo+V1")
+
+
+@pytest.mark.django_db
+def test_create_or_update_skips_unchanged_feedback():
+    """Submissions that change nothing do not save the record."""
+    user = User.objects.create(username="student")
+    arguments = (COURSE_KEY, user.id, "block", "Feedback", 1, "Great", True)
+    Feedback.create_or_update(*arguments)
+    modified = Feedback.objects.get().modified
+
+    Feedback.create_or_update(*arguments)
+    assert Feedback.objects.get().modified == modified
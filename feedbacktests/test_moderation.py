@@ -0,0 +1,61 @@
+"""
+Tests for the blocklist screening of the freeform feedback.
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import override_settings
+from opaque_keys.edx.keys import CourseKey
+
+from feedback import moderation
+from feedback.models import Feedback
+from feedback.moderation import BlocklistMatcher, find_blocked_terms, is_flagged
+
+COURSE_KEY = CourseKey.from_string("course-v1:edX+Demo+V1")
+
+
+def test_matcher_finds_overlapping_terms():
+    """Overlapping terms are all found, on whole words only."""
+    matcher = BlocklistMatcher(["he", "she", "his", "hers", "Buy  Now"])
+
+    assert matcher.find("Ushers: she, HIS, hers") == ["she", "his", "hers"]
+    assert matcher.find("buy\nnow!") == ["buy now"]
+    assert matcher.find("nothing here", first=True) == []
+    assert BlocklistMatcher(["ass"]).find("class ass!") == ["ass"]
+
+
+def test_matcher_is_rebuilt_when_the_list_changes(tmp_path):
+    """The matcher is kept until the setting or the file changes."""
+    with override_settings(FEEDBACK_BLOCKLIST=["spam"]):
+        matcher = moderation.get_matcher()
+        assert moderation.get_matcher() is matcher
+        assert is_flagged("Great SPAM")
+
+    blocklist = tmp_path / "blocklist.txt"
+    blocklist.write_text("scam\n\n")
+    with override_settings(FEEDBACK_BLOCKLIST=[], FEEDBACK_BLOCKLIST_FILE=blocklist):
+        assert find_blocked_terms("spam and scam") == ["scam"]
+        blocklist.write_text("spam\n")
+        # The file is only checked again after the interval.
+        assert find_blocked_terms("spam and scam") == ["scam"]
+        with override_settings(FEEDBACK_BLOCKLIST_FILE_CHECK_INTERVAL=0):
+            moderation._matcher_source = None  # mtime resolution can hide the write.
+            assert find_blocked_terms("spam and scam") == ["spam"]
+
+    with override_settings(FEEDBACK_BLOCKLIST=[], FEEDBACK_BLOCKLIST_FILE=None):
+        assert moderation.get_matcher() is None
+        assert not is_flagged("spam")
+
+
+@pytest.mark.django_db
+def test_create_or_update_flags_feedback():
+    """The flag is only updated when a text is submitted."""
+    user = User.objects.create(username="student")
+    arguments = (COURSE_KEY, user.id, "block", "Feedback", 1)
+
+    Feedback.create_or_update(*arguments, "Buy now", True, is_flagged=True)
+    Feedback.create_or_update(*arguments, None, True)
+    assert Feedback.objects.get().is_flagged
+
+    Feedback.create_or_update(*arguments, "Great course", True, is_flagged=False)
+    assert not Feedback.objects.get().is_flagged
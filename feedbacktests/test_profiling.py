@@ -0,0 +1,92 @@
+"""
+Tests for the opt-in profiling of the handlers and the dashboard.
+"""
+
+import json
+import pstats
+from unittest.mock import Mock
+
+from django.test import override_settings
+
+from feedback.extensions.filters import AddFeedbackTab
+from feedback.profiling import profiled, should_profile
+from feedbacktests.synthetic import stub_course_descriptor, stub_platform
+
+
+def _studio_submit(feedback_xblock):
+    request = Mock(
+        method="POST", body=json.dumps({"display_name": "Feedback"}).encode()
+    )
+    return feedback_xblock.studio_submit(request)
+
+
+def test_disabled(tmp_path, feedback_xblock):
+    with override_settings(FEEDBACK_PROFILING=False, FEEDBACK_PROFILING_DIR=tmp_path):
+        _studio_submit(feedback_xblock)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_handler_profile(tmp_path, feedback_xblock):
+    """A profile and its summary are written for each call."""
+    with override_settings(
+        FEEDBACK_PROFILING=True,
+        FEEDBACK_PROFILING_DIR=tmp_path,
+        FEEDBACK_PROFILING_TOP=5,
+    ):
+        response = _studio_submit(feedback_xblock)
+
+    assert response.json == {"result": "success"}
+    [profile] = tmp_path.glob("handler.studio_submit.*.prof")
+    assert pstats.Stats(str(profile)).total_calls > 0
+    summary = profile.with_suffix(".txt").read_text()
+    assert "cumulative" in summary and "studio_submit" in summary
+
+
+def test_should_profile():
+    with override_settings(
+        FEEDBACK_PROFILING_USERS=[1, 2],
+        FEEDBACK_PROFILING_COURSES=["course-v1:edX+Demo+V1"],
+    ):
+        assert should_profile(1, "course-v1:edX+Demo+V1")
+        assert should_profile("2", "course-v1:edX+Demo+V1")
+        assert not should_profile(3, "course-v1:edX+Demo+V1")
+        assert not should_profile(1, "course-v1:edX+Other+V1")
+
+    with override_settings(FEEDBACK_PROFILING_SAMPLE_RATE=0):
+        assert not should_profile(1, "course-v1:edX+Demo+V1")
+
+
+def test_nested_calls(tmp_path):
+    """Only the outermost profiled call is profiled."""
+
+    @profiled("inner")
+    def inner():
+        return 1
+
+    @profiled("outer")
+    def outer():
+        return inner() + 1
+
+    with override_settings(FEEDBACK_PROFILING=True, FEEDBACK_PROFILING_DIR=tmp_path):
+        assert outer() == 2
+
+    assert len(list(tmp_path.glob("outer.*.prof"))) == 1
+    assert not list(tmp_path.glob("inner.*"))
+
+
+@override_settings(FEATURES={"ENABLE_FEEDBACK_INSTRUCTOR_VIEW": True})
+def test_dashboard_profile(tmp_path, synthetic_course):
+    course = synthetic_course(learners=5, blocks=2)
+    step = AddFeedbackTab(filter_type=Mock(), running_pipeline=Mock())
+    context = {"course": stub_course_descriptor(course), "sections": []}
+
+    with override_settings(
+        FEEDBACK_PROFILING=True,
+        FEEDBACK_PROFILING_DIR=tmp_path,
+        FEEDBACK_PROFILING_COURSES=[str(course.course_key)],
+    ):
+        with stub_platform(course):
+            step.run_filter(context, "instructor_dashboard.html")
+
+    assert len(list(tmp_path.glob("run_filter.*.prof"))) == 1
@@ -0,0 +1,168 @@
+"""
+Query budgets of the entry points of the feedback block and app.
+
+Each entry point runs on synthetic courses of two sizes (see
+feedback.synthetic): it must run the same number of SQL queries on both,
+and no more than its budget. A failure means a query was added to the
+entry point, or a query now runs once per learner or per feedback row.
+
+The admin entry points run with the admin, session and message apps of
+feedback/settings/test.py, whose admin imports feedback.admin and the
+edx-platform modules it needs, as for the rest of the suite.
+"""
+
+import json
+from urllib.parse import urlencode
+from unittest.mock import Mock
+
+import pytest
+from django.contrib import admin
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from feedback.admin import FeedbackAdmin
+from feedback.extensions.filters import AddFeedbackTab
+from feedback.models import Feedback
+from feedbacktests.synthetic import stub_course_descriptor, stub_platform
+
+SIZES = (10, 40)
+BLOCKS = 3
+QUERY_BUDGETS = {
+    "student_view": 0,
+    "studio_submit": 0,
+    # The Feedback row, then its search terms, replaced in a savepoint.
+    "feedback": 6,
+    # One query for the backfill checkpoint, one for the answers of each
+    # block, and one for the themes.
+    "run_filter": BLOCKS + 2,
+    "admin_changelist": 8,
+    "export_as_csv": 2,
+}
+
+
+def count_queries(func):
+    with CaptureQueriesContext(connection) as context:
+        func()
+    return len(context.captured_queries)
+
+
+@pytest.fixture
+def assert_query_budget(synthetic_course):
+    """
+    Check the queries of an entry point against its budget.
+
+    Usage: `assert_query_budget("name", setup)`, where `setup(course)`
+    prepares the entry point for a synthetic course, and returns the
+    function running it.
+    """
+
+    def check(name, setup):
+        counts = {}
+        for learners in SIZES:
+            course = synthetic_course(learners=learners, blocks=BLOCKS)
+            counts[learners] = count_queries(setup(course))
+        message = "{}: {} queries by number of learners, budget {}".format(
+            name, counts, QUERY_BUDGETS[name]
+        )
+        assert len(set(counts.values())) == 1, message
+        assert max(counts.values()) <= QUERY_BUDGETS[name], message
+
+    return check
+
+
+def _learner_block(feedback_xblock, course):
+    """Set up the block for the first learner of a synthetic course."""
+    feedback_xblock.course_id = course.course_key
+    feedback_xblock.location = course.block_ids[0]
+    feedback_xblock.xmodule_runtime = Mock(
+        user_id=course.users.order_by("id").first().id, user_is_staff=False
+    )
+    feedback_xblock.user_vote = -1
+    feedback_xblock.user_freeform = ""
+    return feedback_xblock
+
+
+def test_student_view(
+    assert_query_budget, feedback_xblock
+):  # pylint: disable=redefined-outer-name
+    def setup(course):
+        block = _learner_block(feedback_xblock, course)
+        block.show_aggregate_to_students = True
+        return lambda: block.student_view({})
+
+    assert_query_budget("student_view", setup)
+
+
+def test_studio_submit(
+    assert_query_budget, feedback_xblock
+):  # pylint: disable=redefined-outer-name
+    def setup(course):
+        block = _learner_block(feedback_xblock, course)
+        request = Mock(
+            method="POST",
+            body=json.dumps({"display_name": "Feedback", "likert0": "Great"}).encode(),
+        )
+        return lambda: block.studio_submit(request)
+
+    assert_query_budget("studio_submit", setup)
+
+
+def test_feedback_handler(
+    assert_query_budget, feedback_xblock
+):  # pylint: disable=redefined-outer-name
+    def setup(course):
+        block = _learner_block(feedback_xblock, course)
+        block.runtime.publish = Mock()
+        request = Mock(
+            method="POST",
+            body=json.dumps(
+                {"vote": 1, "freeform": "Clear", "consent_to_share": True}
+            ).encode(),
+        )
+        return lambda: block.feedback(request)
+
+    assert_query_budget("feedback", setup)
+
+
+@override_settings(FEATURES={"ENABLE_FEEDBACK_INSTRUCTOR_VIEW": True})
+def test_run_filter(assert_query_budget):  # pylint: disable=redefined-outer-name
+    step = AddFeedbackTab(filter_type=Mock(), running_pipeline=Mock())
+
+    def setup(course):
+        stubs = stub_platform(course)
+        context = {"course": stub_course_descriptor(course), "sections": []}
+
+        def run():
+            with stubs:
+                step.run_filter(context, "instructor_dashboard.html")
+
+        return run
+
+    assert_query_budget("run_filter", setup)
+
+
+def test_admin_changelist(
+    admin_client, assert_query_budget
+):  # pylint: disable=redefined-outer-name
+
+    def setup(course):
+        url = "/admin/feedback/feedback/?" + urlencode(
+            {"course_key": str(course.course_key)}
+        )
+        return lambda: admin_client.get(url)
+
+    assert_query_budget("admin_changelist", setup)
+
+
+def test_export_as_csv(
+    assert_query_budget, admin_user
+):  # pylint: disable=redefined-outer-name
+    model_admin = FeedbackAdmin(Feedback, admin.site)
+    request = RequestFactory().post("/admin/feedback/feedback/")
+    request.user = admin_user
+
+    def setup(course):
+        return lambda: model_admin.export_as_csv(request, course.feedback)
+
+    assert_query_budget("export_as_csv", setup)
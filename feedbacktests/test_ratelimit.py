@@ -0,0 +1,83 @@
+"""
+Tests for the rate limiting of the feedback submissions.
+"""
+
+import json
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from mock import Mock, patch
+
+from feedback.ratelimit import allow_submission, claim_submission, release_submission
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with empty buckets."""
+    cache.clear()
+
+
+@override_settings(FEEDBACK_RATE_LIMIT_BURST=3, FEEDBACK_RATE_LIMIT_PER_MINUTE=60)
+def test_bucket_refills():
+    """A burst empties the bucket, which refills over time."""
+    assert [allow_submission(1, "block", now=100) for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert allow_submission(2, "block", now=100)
+    assert allow_submission(1, "other", now=100)
+    assert allow_submission(1, "block", now=101.5)
+    assert not allow_submission(1, "block", now=101.5)
+    assert [allow_submission(1, "block", now=200) for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+
+
+@override_settings(FEEDBACK_RATE_LIMIT_BURST=0)
+def test_limit_can_be_disabled():
+    """A burst of 0 disables the limit."""
+    assert all(allow_submission(1, "block", now=100) for _ in range(100))
+
+
+@override_settings(FEEDBACK_RATE_LIMIT_BURST=5, FEEDBACK_RATE_LIMIT_PER_MINUTE=1)
+def test_handler_burst(feedback_xblock):
+    """Submissions beyond the burst get a 429 response without any write."""
+    feedback_xblock.course_id = "course-v1:edX+Demo+V1"
+    feedback_xblock.xmodule_runtime = Mock(user_id=1)
+    feedback_xblock.location = "block-v1:edX+Demo+V1+type@feedback+block@1"
+    feedback_xblock.runtime.publish = Mock()
+
+    with patch("feedback.feedback.Feedback") as feedback_model:
+        statuses = [
+            feedback_xblock.submit(
+                Mock(
+                    method="POST",
+                    body=json.dumps(
+                        {"submission_id": str(index), "vote": index % 5}
+                    ).encode(),
+                )
+            ).status_code
+            for index in range(1000)
+        ]
+
+    assert statuses.count(200) == 5
+    assert statuses.count(429) == 995
+    assert feedback_model.create_or_update.call_count == 5
+    assert sum(feedback_xblock.vote_aggregate) == 1
+
+
+def test_claim_submission():
+    """A submission id is claimed once, until it is released."""
+    assert claim_submission(1, "block", "a")
+    assert not claim_submission(1, "block", "a")
+    assert claim_submission(2, "block", "a")
+    assert claim_submission(1, "other", "a")
+
+    release_submission(1, "block", "a")
+    assert claim_submission(1, "block", "a")
@@ -0,0 +1,82 @@
+"""
+Tests for the reconciliation of the vote aggregates with the Feedback rows.
+"""
+
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.aggregates import get_cached_aggregate, set_cached_aggregate
+from feedback.models import Feedback
+from feedback.reconcile import find_drift, repair
+from feedbacktests.models import UserStateSummaryField
+
+COURSE_KEY = CourseKey.from_string("course-v1:edX+Demo+V1")
+BLOCK_KEY = COURSE_KEY.make_usage_key("feedback", "one")
+
+
+@pytest.fixture
+def summary_model(db):  # pylint: disable=unused-argument
+    """Read the aggregates from the stand-in user state summary table."""
+    with override_settings(
+        FEEDBACK_USER_STATE_SUMMARY_MODEL="feedbacktests.UserStateSummaryField"
+    ):
+        yield UserStateSummaryField
+
+
+def test_reports_and_repairs_drift(
+    summary_model,
+):  # pylint: disable=redefined-outer-name,unused-argument
+    """Drifting aggregates are reported, then replaced with --repair."""
+    for index, rating in enumerate([0, 0, 3, None]):
+        Feedback.objects.create(
+            course_key=COURSE_KEY,
+            user=User.objects.create(username="user{}".format(index)),
+            block_id=str(BLOCK_KEY),
+            rating=rating,
+        )
+    UserStateSummaryField.objects.create(
+        field_name="vote_aggregate", usage_id=BLOCK_KEY, value="[3, 0, 0, 1, 0]"
+    )
+
+    out = StringIO()
+    call_command("reconcile_vote_aggregates", stdout=out)
+    assert "stored [3, 0, 0, 1, 0], expected [2, 0, 0, 1, 0]" in out.getvalue()
+
+    set_cached_aggregate(BLOCK_KEY, [3, 0, 0, 1, 0])
+    call_command("reconcile_vote_aggregates", "--repair", stdout=StringIO())
+    assert json.loads(UserStateSummaryField.objects.get().value) == [2, 0, 0, 1, 0]
+    assert get_cached_aggregate(BLOCK_KEY) is None
+
+    out = StringIO()
+    call_command("reconcile_vote_aggregates", stdout=out)
+    assert "0 drifting aggregates in 1 courses" in out.getvalue()
+
+
+def test_repair_counts_votes_cast_meanwhile(
+    summary_model,
+):  # pylint: disable=redefined-outer-name,unused-argument
+    """The repaired aggregate is recounted when it is saved."""
+    for index in range(2):
+        Feedback.objects.create(
+            course_key=COURSE_KEY,
+            user=User.objects.create(username="user{}".format(index)),
+            block_id=str(BLOCK_KEY),
+            rating=index,
+        )
+    (drift,) = find_drift(COURSE_KEY)
+    Feedback.objects.create(
+        course_key=COURSE_KEY,
+        user=User.objects.create(username="late"),
+        block_id=str(BLOCK_KEY),
+        rating=4,
+    )
+
+    repair(drift)
+
+    assert json.loads(UserStateSummaryField.objects.get().value) == [1, 1, 0, 0, 1]
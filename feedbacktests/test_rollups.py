@@ -0,0 +1,99 @@
+"""
+Tests for the daily feedback rollups.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import F
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.models import Feedback, FeedbackDailyRollup
+from feedback.rollups import rating_time_series
+
+COURSE_KEY = CourseKey.from_string("course-v1:edX+Demo+V1")
+
+
+def create_feedback(username, created, rating, comment=None):
+    """Create a feedback entry created on the given day."""
+    feedback = Feedback.objects.create(
+        course_key=COURSE_KEY,
+        user=User.objects.create(username=username),
+        block_id="block",
+        rating=rating,
+        feedback=comment,
+    )
+    Feedback.objects.filter(pk=feedback.pk).update(
+        created=datetime(*created, 12, tzinfo=timezone.utc)
+    )
+    feedback.refresh_from_db()
+    return feedback
+
+
+@pytest.mark.django_db
+def test_rollups_are_updated_incrementally():
+    """Only the buckets of the changed rows are recomputed."""
+    create_feedback("a", (2025, 1, 6), 0, "Great")
+    create_feedback("b", (2025, 1, 6), 1)
+    changed = create_feedback("c", (2025, 1, 8), 4, "Too hard")
+
+    call_command("rollup_feedback", stdout=StringIO())
+    assert FeedbackDailyRollup.objects.count() == 2
+
+    # Move the rows out of the overlap window of the watermark.
+    Feedback.objects.update(modified=F("modified") - timedelta(hours=1))
+    changed.rating = 3
+    changed.save()
+    FeedbackDailyRollup.objects.filter(day=date(2025, 1, 6)).update(total_count=99)
+    call_command("rollup_feedback", stdout=StringIO())
+
+    rollup = FeedbackDailyRollup.objects.get(day=date(2025, 1, 8))
+    assert (rollup.rating_3, rollup.rating_4, rollup.comment_count) == (1, 0, 1)
+    # Buckets without changed rows are left untouched.
+    assert FeedbackDailyRollup.objects.get(day=date(2025, 1, 6)).total_count == 99
+
+
+@pytest.mark.django_db
+def test_rating_time_series():
+    """Rollups are summed by period."""
+    create_feedback("a", (2025, 1, 6), 0, "Great")
+    create_feedback("b", (2025, 1, 7), 1)
+    create_feedback("c", (2025, 1, 14), 1)
+    call_command("rollup_feedback", stdout=StringIO())
+
+    series = rating_time_series(COURSE_KEY, period="week")
+
+    assert series == [
+        {
+            "period": date(2025, 1, 6),
+            "ratings": [1, 1, 0, 0, 0],
+            "total_count": 2,
+            "comment_count": 1,
+        },
+        {
+            "period": date(2025, 1, 13),
+            "ratings": [0, 1, 0, 0, 0],
+            "total_count": 1,
+            "comment_count": 0,
+        },
+    ]
+    assert len(rating_time_series(COURSE_KEY, "block", start=date(2025, 1, 7))) == 2
+
+
+@pytest.mark.django_db
+def test_deleted_feedback_is_removed_from_rollups(django_capture_on_commit_callbacks):
+    """The bucket of deleted feedback is recomputed on commit."""
+    deleted = create_feedback("a", (2025, 1, 6), 0, "Great")
+    create_feedback("b", (2025, 1, 6), 1)
+    alone = create_feedback("c", (2025, 1, 8), 4)
+    call_command("rollup_feedback", stdout=StringIO())
+
+    with django_capture_on_commit_callbacks(execute=True):
+        deleted.delete()
+        alone.delete()
+
+    rollup = FeedbackDailyRollup.objects.get()
+    assert (rollup.day, rollup.rating_0, rollup.rating_1) == (date(2025, 1, 6), 0, 1)
@@ -0,0 +1,84 @@
+"""
+Tests for the search of the freeform feedback text.
+"""
+
+from io import StringIO
+
+import pytest
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.admin import FeedbackAdmin
+from feedback.models import Feedback, FeedbackSearchTerm
+from feedback.search import search_feedback, tokenize
+
+COURSE_KEY = CourseKey.from_string("course-v1:edX+Demo+V1")
+
+
+def create_feedback(username, text, block_id="block"):
+    """Create a feedback entry with the given text."""
+    return Feedback.objects.create(
+        course_key=COURSE_KEY,
+        user=User.objects.create(username=username),
+        block_id=block_id,
+        feedback=text,
+    )
+
+
+def test_tokenize():
+    """Terms are lower cased, deduplicated, and stop words are dropped."""
+    assert tokenize("The quiz was TOO hard, the quiz!") == ["quiz", "too", "hard"]
+    assert tokenize(None) == []
+    # Terms shorter than the words of the MySQL full-text index are dropped.
+    assert tokenize("UI ok") == []
+
+
+@pytest.mark.django_db
+def test_search_matches_all_terms():
+    """Only feedback containing every term is returned, newest first."""
+    hard = create_feedback("a", "The quiz was too hard")
+    create_feedback("b", "The quiz was fun")
+    other_block = create_feedback("c", "Quiz too hard for me", block_id="other")
+
+    assert search_feedback(COURSE_KEY, "quiz too hard") == [other_block, hard]
+    assert search_feedback(COURSE_KEY, "hard QUIZ", block_id="block") == [hard]
+    assert search_feedback(COURSE_KEY, "the") == []
+
+
+@pytest.mark.django_db
+def test_index_follows_text_changes():
+    """The index is updated when the text changes."""
+    feedback = create_feedback("a", "Great video")
+    feedback.feedback = "Great reading"
+    feedback.save()
+
+    assert search_feedback(COURSE_KEY, "video") == []
+    assert search_feedback(COURSE_KEY, "reading") == [feedback]
+
+
+@pytest.mark.django_db
+def test_rebuild_index_command():
+    """The command indexes feedback written without signals."""
+    feedback = create_feedback("a", "Great video")
+    FeedbackSearchTerm.objects.all().delete()
+
+    call_command("index_feedback_search", stdout=StringIO())
+
+    assert search_feedback(COURSE_KEY, "video") == [feedback]
+
+
+@pytest.mark.django_db
+def test_admin_search(rf):
+    """The admin search also matches the feedback text."""
+    model_admin = FeedbackAdmin(Feedback, admin.site)
+    hard = create_feedback("a", "The quiz was too hard")
+    create_feedback("b", "Great video")
+    by_name = create_feedback("quiz", "Great reading")
+
+    results, _ = model_admin.get_search_results(
+        rf.get("/"), Feedback.objects.all(), "quiz"
+    )
+
+    assert set(results) == {hard, by_name}
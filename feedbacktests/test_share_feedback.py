@@ -0,0 +1,78 @@
+"""
+Tests for the bulk sharing of feedback with other course versions.
+"""
+
+from io import StringIO
+from itertools import count as counter
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.models import Feedback, ShareFeedbackWith
+
+SOURCE = CourseKey.from_string("course-v1:edX+Demo+V1")
+TARGETS = [
+    CourseKey.from_string("course-v1:edX+Demo+V2"),
+    CourseKey.from_string("course-v1:edX+Demo+V3"),
+]
+USER_IDS = counter()
+
+
+def create_feedback(count, **kwargs):
+    """Create `count` feedback entries in the source course."""
+    return [
+        Feedback.objects.create(
+            course_key=SOURCE,
+            user=User.objects.create(username="user{}".format(next(USER_IDS))),
+            block_id="block",
+            **kwargs
+        )
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_share_skips_existing_shares():
+    """Existing shares are kept and new ones are created in batches."""
+    feedback = create_feedback(5, is_approved=True)
+    ShareFeedbackWith.objects.create(feedback=feedback[0], course_key=TARGETS[0])
+    batches = []
+
+    processed = ShareFeedbackWith.bulk_share(
+        Feedback.objects.all(),
+        TARGETS + [SOURCE],
+        batch_size=2,
+        progress=batches.append,
+    )
+
+    assert processed == 5
+    assert batches == [2, 4, 5]
+    assert ShareFeedbackWith.objects.count() == 10
+    assert not ShareFeedbackWith.objects.filter(course_key=SOURCE).exists()
+
+
+@pytest.mark.django_db
+def test_command_shares_approved_feedback():
+    """Only approved feedback is shared by default."""
+    create_feedback(3, is_approved=True)
+    create_feedback(2, is_approved=False)
+
+    call_command("share_feedback", str(SOURCE), *map(str, TARGETS), stdout=StringIO())
+
+    assert ShareFeedbackWith.objects.count() == 6
+
+
+@pytest.mark.django_db
+def test_command_dry_run():
+    """A dry run only reports counts."""
+    create_feedback(3, is_approved=True)
+    out = StringIO()
+
+    call_command(
+        "share_feedback", str(SOURCE), str(TARGETS[0]), "--dry-run", stdout=out
+    )
+
+    assert "3 feedback entries to share with 1 courses" in out.getvalue()
+    assert not ShareFeedbackWith.objects.exists()
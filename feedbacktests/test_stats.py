@@ -0,0 +1,54 @@
+"""
+Tests for the rating statistics.
+"""
+
+import numpy as np
+import pytest
+
+from feedback.stats import (
+    compute_stats,
+    histograms_from_ratings,
+    rating_to_score,
+    summarize,
+)
+
+
+def test_rating_to_score():
+    """Vote 0 is the best score of the scale."""
+    assert rating_to_score(0) == 5
+    assert rating_to_score(4) == 1
+    assert rating_to_score(0, scale_length=3) == 3
+
+
+def test_compute_stats():
+    """Statistics are computed for every block at once."""
+    stats = compute_stats([[2, 0, 0, 0, 1], [0, 0, 0, 0, 0], [0, 1, 1, 0, 0]])
+
+    assert stats["count"].tolist() == [3, 0, 2]
+    assert stats["mean"] == pytest.approx([11 / 3, 0, 3.5])
+    assert stats["median"].tolist() == [5, 0, 3.5]
+    assert stats["std"] == pytest.approx(
+        [np.std([5, 5, 1], ddof=1), 0, np.std([4, 3], ddof=1)]
+    )
+    assert stats["top_box"] == pytest.approx([2 / 3, 0, 0])
+    assert stats["bottom_box"] == pytest.approx([1 / 3, 0, 0])
+    assert stats["ci_low"][0] < stats["mean"][0] < stats["ci_high"][0]
+
+
+def test_histograms_from_ratings():
+    """Raw votes are counted by group, ignoring votes out of the scale."""
+    histograms = histograms_from_ratings([0, 0, 1, 1], [0, 4, 2, 7], group_count=3)
+
+    assert histograms.tolist() == [
+        [1, 0, 0, 0, 1],
+        [0, 0, 1, 0, 0],
+        [0, 0, 0, 0, 0],
+    ]
+
+
+def test_summarize_mixed_scale_lengths():
+    """Blocks with different scale lengths are summarized in order."""
+    summaries = summarize([[1, 0, 0, 0, 0], [0, 1, 0], []])
+
+    assert [summary["mean"] for summary in summaries] == [5, 2, 0]
+    assert summaries[1]["count"] == 1
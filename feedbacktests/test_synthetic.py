@@ -0,0 +1,79 @@
+"""
+Tests for the synthetic feedback generator and its platform stubs.
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.extensions.filters import load_blocks
+from feedback.models import Feedback, ShareFeedbackWith
+from feedbacktests.synthetic import stub_course_descriptor, stub_platform
+
+SHARED_COURSE_KEY = CourseKey.from_string("course-v1:edX+Shared+1")
+
+
+def test_generate_course(synthetic_course):
+    """Every learner answers every block, with the given distribution."""
+    course = synthetic_course(
+        learners=50,
+        blocks=2,
+        rating_weights=[1, 0, 0, 0, 0],
+        comment_ratio=1,
+        comment_words=(3, 3),
+        approved_ratio=1,
+        shared_with=[SHARED_COURSE_KEY],
+    )
+
+    assert course.users.count() == 50
+    assert course.feedback.count() == 100
+    assert set(course.feedback.values_list("rating", flat=True)) == {0}
+    assert all(
+        len(text.split()) == 3
+        for text in course.feedback.values_list("feedback", flat=True)
+    )
+    approved = course.feedback.filter(is_approved=True).count()
+    assert approved == course.feedback.filter(consent_to_share=True).count()
+    assert (
+        ShareFeedbackWith.objects.filter(course_key=SHARED_COURSE_KEY).count()
+        == approved
+    )
+
+
+def test_stubbed_dashboard(synthetic_course):
+    """The dashboard loads the synthetic blocks through the stubs."""
+    course = synthetic_course(learners=20, blocks=3, comment_ratio=1)
+
+    with stub_platform(course):
+        blocks = load_blocks(None, stub_course_descriptor(course))
+
+    assert len(blocks) == 3
+    assert sum(vote["count"] for vote in blocks[0]["vote_aggregate"]) == 20
+    assert len(blocks[0]["answers"]) == 10
+
+
+@pytest.mark.django_db
+def test_command():
+    """The command generates, then deletes, the data of a course."""
+    out = StringIO()
+    with override_settings(DEBUG=True):
+        call_command(
+            "generate_synthetic_feedback",
+            "course-v1:edX+Synthetic+cmd",
+            "--learners=10",
+            "--blocks=2",
+            stdout=out,
+        )
+        assert "Generated 20 feedback entries for 2 blocks." in out.getvalue()
+
+        call_command(
+            "generate_synthetic_feedback",
+            "course-v1:edX+Synthetic+cmd",
+            "--delete",
+            stdout=out,
+        )
+    assert "Deleted 10 synthetic learners." in out.getvalue()
+    assert not Feedback.objects.exists()
@@ -0,0 +1,108 @@
+"""
+Tests for the public testimonials API.
+"""
+
+import json
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.models import Feedback, ShareFeedbackWith
+from feedback.views import course_testimonials
+
+COURSE_ID = "course-v1:edX+Demo+V2"
+OTHER_COURSE_ID = "course-v1:edX+Demo+V1"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache."""
+    cache.clear()
+
+
+def create_feedback(username, course_id=COURSE_ID, **kwargs):
+    """Create a feedback entry for a new user."""
+    user = User.objects.create(username=username)
+    defaults = {"block_id": "block", "feedback": "Great", "is_approved": True}
+    defaults.update(kwargs)
+    return Feedback.objects.create(
+        course_key=CourseKey.from_string(course_id), user=user, **defaults
+    )
+
+
+def get_testimonials(query="", **headers):
+    """Call the testimonials view and return the response."""
+    request = RequestFactory().get("/?" + query, **headers)
+    return course_testimonials(request, COURSE_ID)
+
+
+@pytest.mark.django_db
+def test_includes_own_and_shared_feedback():
+    """Approved feedback of the course and shared with it is returned."""
+    own = create_feedback("own")
+    shared = create_feedback("shared", OTHER_COURSE_ID, rating=0)
+    ShareFeedbackWith.objects.create(
+        feedback=shared, course_key=CourseKey.from_string(COURSE_ID)
+    )
+    create_feedback("not-shared", OTHER_COURSE_ID)
+    create_feedback("not-approved", is_approved=False)
+    create_feedback("no-consent", consent_to_share=False)
+
+    data = json.loads(get_testimonials().content)
+
+    assert [item["id"] for item in data["results"]] == [shared.id, own.id]
+    assert data["results"][0]["course_key"] == OTHER_COURSE_ID
+    # Vote index 0 is the best score.
+    assert [item["rating"] for item in data["results"]] == [5, None]
+    assert data["next"] is None
+
+
+@pytest.mark.django_db
+def test_cursor_pagination():
+    """Pages are linked by the `next` cursor."""
+    ids = [create_feedback("user{}".format(i)).id for i in range(5)]
+
+    first = json.loads(get_testimonials("page_size=3").content)
+    second = json.loads(
+        get_testimonials("page_size=3&cursor={}".format(first["next"])).content
+    )
+
+    assert [item["id"] for item in first["results"]] == ids[:1:-1]
+    assert [item["id"] for item in second["results"]] == ids[1::-1]
+    assert second["next"] is None
+
+
+@pytest.mark.django_db
+def test_cache_invalidated_on_approval_change(django_assert_num_queries):
+    """Cached pages are served until an approval changes."""
+    feedback = create_feedback("user", is_approved=False)
+    assert json.loads(get_testimonials().content)["results"] == []
+
+    with django_assert_num_queries(0):
+        get_testimonials()
+
+    feedback.is_approved = True
+    feedback.save()
+
+    assert len(json.loads(get_testimonials().content)["results"]) == 1
+
+
+@pytest.mark.django_db
+def test_etag_not_modified():
+    """A matching If-None-Match header gets a 304 response."""
+    create_feedback("user")
+    etag = get_testimonials()["ETag"]
+
+    assert get_testimonials(HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    create_feedback("other")
+    assert get_testimonials(HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_invalid_course_key():
+    """Invalid course keys are rejected."""
+    request = RequestFactory().get("/")
+    assert course_testimonials(request, "not-a-course").status_code == 404
@@ -0,0 +1,151 @@
+"""
+Tests for the extraction of the feedback themes.
+"""
+
+from io import StringIO
+from itertools import count
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from mock import patch
+from opaque_keys.edx.keys import CourseKey
+
+from feedback.models import Feedback, FeedbackThemeEntry, FeedbackThemeSummary
+from feedback.themes import (
+    ThemeCounters,
+    get_course_themes,
+    rating_bucket,
+    update_course_themes,
+)
+
+COURSE_KEY = CourseKey.from_string("course-v1:edX+Demo+V1")
+usernames = count()
+
+
+def create_feedback(text, rating=None):
+    """Create a feedback entry of a new user."""
+    return Feedback.objects.create(
+        course_key=COURSE_KEY,
+        user=User.objects.create(username="user{}".format(next(usernames))),
+        block_id="block",
+        rating=rating,
+        feedback=text,
+    )
+
+
+def age_feedback():
+    """Move the modification dates before the overlap of the next run."""
+    Feedback.objects.update(modified=timezone.now() - timezone.timedelta(hours=1))
+
+
+def test_rating_bucket():
+    """Vote 0 is the best rating of the default scale."""
+    assert [rating_bucket(rating) for rating in range(5)] == [
+        "positive",
+        "positive",
+        "neutral",
+        "negative",
+        "negative",
+    ]
+    assert rating_bucket(None) is None
+
+
+def test_counters():
+    """Terms and bigrams are counted once per comment."""
+    counters = ThemeCounters()
+    counters.add("Videos too long, videos too long", 4)
+    counters.add("The videos were too long", 3)
+    counters.add("Great examples", 0)
+    counters.add("Great examples and great videos", 0)
+
+    assert counters.comments == 4
+    assert counters.terms["videos"] == 3
+    assert counters.bigrams["too long"] == 2
+    assert counters.themes() == [
+        {"theme": "great examples", "count": 2},
+        {"theme": "too long", "count": 2},
+        {"theme": "videos too", "count": 2},
+    ]
+    distinctive = counters.distinctive_terms()
+    assert distinctive["negative"][:2] == ["too", "long"]
+    assert "great" in distinctive["positive"]
+
+    counters.trim(size=1)
+    assert len(counters.terms) == 1
+    assert ThemeCounters.from_dict(counters.to_dict()).to_dict() == counters.to_dict()
+
+
+@pytest.mark.django_db
+def test_update_is_incremental():
+    """Only new, modified and deleted rows are applied to the counters."""
+    create_feedback("Quiz too hard", 4)
+    create_feedback("Quiz too hard", 3)
+    create_feedback("", 0)
+
+    assert update_course_themes(COURSE_KEY) == 2
+    assert get_course_themes(COURSE_KEY)["themes"][0] == {
+        "theme": "quiz too",
+        "count": 2,
+    }
+
+    age_feedback()
+    create_feedback("Quiz too hard again", 4)
+    assert update_course_themes(COURSE_KEY) == 1
+    assert get_course_themes(COURSE_KEY)["comments"] == 3
+
+    age_feedback()
+
+    edited = Feedback.objects.get(feedback="Quiz too hard again")
+    edited.feedback = "Nice videos"
+    edited.save()
+    approved = Feedback.objects.filter(feedback="Quiz too hard").first()
+    approved.is_approved = True
+    approved.save()
+    assert update_course_themes(COURSE_KEY) == 2
+    summary = FeedbackThemeSummary.objects.get(course_key=COURSE_KEY)
+    assert summary.data["counters"]["comments"] == 3
+    assert summary.data["counters"]["terms"]["quiz"] == 2
+    assert summary.data["counters"]["bigrams"]["nice videos"] == 1
+    assert "again" not in summary.data["counters"]["terms"]
+
+    age_feedback()
+    approved.delete()
+    assert update_course_themes(COURSE_KEY) == 0
+    summary = FeedbackThemeSummary.objects.get(course_key=COURSE_KEY)
+    assert summary.data["counters"]["comments"] == 2
+    assert summary.data["counters"]["terms"]["quiz"] == 1
+    assert FeedbackThemeEntry.objects.filter(course_key=COURSE_KEY).count() == 2
+
+
+@pytest.mark.django_db
+def test_interrupted_update_resumes():
+    """Chunks counted before an interruption are kept, and not recounted."""
+    for text in ["Quiz too hard", "Quiz too long", "Nice videos"]:
+        create_feedback(text, 4)
+
+    with patch("feedback.themes.text_digest", side_effect=["digest", ValueError]):
+        with pytest.raises(ValueError):
+            update_course_themes(COURSE_KEY, batch_size=1)
+    summary = FeedbackThemeSummary.objects.get(course_key=COURSE_KEY)
+    assert summary.data["counters"]["comments"] == 1
+    assert FeedbackThemeEntry.objects.filter(course_key=COURSE_KEY).count() == 1
+
+    update_course_themes(COURSE_KEY, batch_size=1)
+    summary = FeedbackThemeSummary.objects.get(course_key=COURSE_KEY)
+    assert summary.data["counters"]["comments"] == 3
+    assert summary.data["counters"]["terms"]["quiz"] == 2
+
+
+@pytest.mark.django_db
+def test_command():
+    """The command updates the themes of every course."""
+    create_feedback("Quiz too hard")
+    out = StringIO()
+
+    call_command("compute_feedback_themes", stdout=out)
+
+    assert "Updated the themes of 1 courses." in out.getvalue()
+    assert get_course_themes(COURSE_KEY)["comments"] == 1
+    assert get_course_themes(CourseKey.from_string("course-v1:edX+Other+V1")) is None